@@ -1,17 +1,115 @@
-"""Binary search implementation. Expected performance O(lg(n))"""
+"""Binary search implementation. Expected performance O(lg(n))
+Search is iterative, lo/hi/key arguments and leftmost/rightmost semantics are same as in bisect module.
+Interpolation search is expected O(lg(lg(n))) on uniformly distributed numeric keys, exponential search is O(lg(i)),
+where i is found index, and works on sequences of unknown length
+"""
+import bisect
+import random
+import sys
+from datetime import datetime
+from math import isqrt
+from numbers import Number
+from time import perf_counter
 
+from utils.readable import readable_time
 
-def search(array, element):
-    """ Searches array for an element and returns its index
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def search(array, element, lo=0, hi=None, key=None):
+    """ Searches array for an element and returns index of its leftmost occurrence
 
     Args:
-        array: searched array
+        array: searched sorted array
+        element: element to search for
+        lo (int, optional): search range start index. Defaults to 0
+        hi (int, optional): search range end index. Defaults to len(array)
+        key (callable, optional): function extracting comparison key from array items, element is compared with
+            keys. Defaults to None
+
+    Returns:
+        int: element index if element is found, -1 otherwise
+    """
+    if hi is None:
+        hi = len(array)
+    index = bisect_left(array, element, lo, hi, key)
+    if index < hi and (array[index] if key is None else key(array[index])) == element:
+        return index
+    return -1
+
+
+def search_rightmost(array, element, lo=0, hi=None, key=None):
+    """ Searches array for an element and returns index of its rightmost occurrence
+
+    Args:
+        array: searched sorted array
         element: element to search for
+        lo (int, optional): search range start index. Defaults to 0
+        hi (int, optional): search range end index. Defaults to len(array)
+        key (callable, optional): function extracting comparison key from array items. Defaults to None
 
     Returns:
         int: element index if element is found, -1 otherwise
     """
-    return binary_search(array, element, 0, len(array) - 1)
+    index = bisect_right(array, element, lo, hi, key) - 1
+    if index >= lo and (array[index] if key is None else key(array[index])) == element:
+        return index
+    return -1
+
+
+def bisect_left(array, element, lo=0, hi=None, key=None):
+    """ Finds leftmost position element can be inserted at keeping array sorted. Same as bisect.bisect_left
+
+    Args:
+        array: searched sorted array
+        element: element to search position for
+        lo (int, optional): search range start index. Defaults to 0
+        hi (int, optional): search range end index. Defaults to len(array)
+        key (callable, optional): function extracting comparison key from array items. Defaults to None
+
+    Returns:
+        int: insertion position, all items before it are less than element
+    """
+    if lo < 0:
+        raise ValueError('lo must be non-negative')
+    if hi is None:
+        hi = len(array)
+    while lo < hi:
+        middle_index = (lo + hi) // 2
+        if (array[middle_index] if key is None else key(array[middle_index])) < element:
+            lo = middle_index + 1
+        else:
+            hi = middle_index
+    return lo
+
+
+def bisect_right(array, element, lo=0, hi=None, key=None):
+    """ Finds rightmost position element can be inserted at keeping array sorted. Same as bisect.bisect_right
+
+    Args:
+        array: searched sorted array
+        element: element to search position for
+        lo (int, optional): search range start index. Defaults to 0
+        hi (int, optional): search range end index. Defaults to len(array)
+        key (callable, optional): function extracting comparison key from array items. Defaults to None
+
+    Returns:
+        int: insertion position, all items after it are greater than element
+    """
+    if lo < 0:
+        raise ValueError('lo must be non-negative')
+    if hi is None:
+        hi = len(array)
+    while lo < hi:
+        middle_index = (lo + hi) // 2
+        if element < (array[middle_index] if key is None else key(array[middle_index])):
+            hi = middle_index
+        else:
+            lo = middle_index + 1
+    return lo
 
 
 def binary_search(array, element, min_index, max_index):
@@ -26,19 +124,296 @@ def binary_search(array, element, min_index, max_index):
     Returns:
         int: element index if element is found, -1 otherwise
     """
-    if min_index > max_index:
+    while min_index <= max_index:
+        middle_index = (max_index + min_index) // 2
+        if array[middle_index] < element:
+            min_index = middle_index + 1
+        elif array[middle_index] > element:
+            max_index = middle_index - 1
+        else:
+            return middle_index
+    return -1
+
+
+def search_many(sorted_array, queries, key=None):
+    """ Searches sorted array for each of queries. Queries are sorted and looked up in one pass over the array, each
+    search starts where previous one ended. If there are many queries compared to array length, the pass is a linear
+    merge, otherwise every query is bisected. NumPy arrays are searched with numpy.searchsorted
+
+    Args:
+        sorted_array: searched sorted array
+        queries: elements to search for
+        key (callable, optional): function extracting comparison key from array items. Defaults to None
+
+    Returns:
+        list: leftmost index of each query in sorted_array, -1 for queries that are not found. numpy.ndarray if both
+            sorted_array and queries are NumPy arrays
+    """
+    array_length = len(sorted_array)
+    if numpy is not None and key is None and isinstance(sorted_array, numpy.ndarray) and \
+            isinstance(queries, numpy.ndarray):
+        positions = numpy.searchsorted(sorted_array, queries)
+        if not array_length:
+            return numpy.full(len(queries), -1)
+        found = sorted_array[numpy.minimum(positions, array_length - 1)] == queries
+        return numpy.where(found & (positions < array_length), positions, -1)
+    results = [-1] * len(queries)
+    linear = len(queries) * array_length.bit_length() >= array_length
+    position = 0
+    for query_index in sorted(range(len(queries)), key=queries.__getitem__):
+        query = queries[query_index]
+        if linear:
+            while position < array_length and \
+                    (sorted_array[position] if key is None else key(sorted_array[position])) < query:
+                position += 1
+        else:
+            position = bisect_left(sorted_array, query, position, array_length, key)
+        if position < array_length and \
+                (sorted_array[position] if key is None else key(sorted_array[position])) == query:
+            results[query_index] = position
+    return results
+
+
+def interpolation_search(array, element, lo=0, hi=None, key=None):
+    """ Searches array of numeric keys for an element and returns index of its leftmost occurrence. Probe position
+    is interpolated from values at bounds of the range known to contain element, then a guard probe is made at
+    expected interpolation error distance on the other side of element, so the range shrinks from both sides.
+    If probes don't halve the range, next probe is plain bisection, so worst case stays O(lg(n))
+
+    Args:
+        array: searched sorted array of numbers
+        element: number to search for
+        lo (int, optional): search range start index. Defaults to 0
+        hi (int, optional): search range end index. Defaults to len(array)
+        key (callable, optional): function extracting comparison key from array items. Defaults to None
+
+    Returns:
+        int: element index if element is found, -1 otherwise
+    """
+    if hi is None:
+        hi = len(array)
+    if lo >= hi:
+        return -1
+    low_value = array[lo] if key is None else key(array[lo])
+    if not low_value < element:
+        return lo if low_value == element else -1
+    hi -= 1
+    high_value = array[hi] if key is None else key(array[hi])
+    if high_value < element:
+        return -1
+    bisect_next = False
+    while hi - lo > 1:  # array[lo] < element <= array[hi]
+        previous_range = hi - lo
+        if bisect_next:
+            probe = (lo + hi) // 2
+            guard = 0
+        else:
+            probe = lo + int((element - low_value) * (hi - lo) // (high_value - low_value))
+            probe = min(max(probe, lo + 1), hi - 1)
+            guard = isqrt(hi - lo)  # expected interpolation error on uniform keys
+        value = array[probe] if key is None else key(array[probe])
+        if value < element:
+            lo, low_value = probe, value
+            guard_probe = probe + guard
+            if guard and guard_probe < hi:
+                value = array[guard_probe] if key is None else key(array[guard_probe])
+                if value < element:
+                    lo, low_value = guard_probe, value
+                else:
+                    hi, high_value = guard_probe, value
+        else:
+            hi, high_value = probe, value
+            guard_probe = probe - guard
+            if guard and guard_probe > lo:
+                value = array[guard_probe] if key is None else key(array[guard_probe])
+                if value < element:
+                    lo, low_value = guard_probe, value
+                else:
+                    hi, high_value = guard_probe, value
+        bisect_next = not bisect_next and 2 * (hi - lo) > previous_range
+    return hi if high_value == element else -1
+
+
+def exponential_search(array, element, lo=0, hi=None, key=None):
+    """ Searches sorted indexable for an element and returns index of its leftmost occurrence. Range containing element
+    is found probing indexes lo, lo + 1, lo + 3, lo + 7, ..., then it is bisected. Length of array is never used,
+    indexes out of bounds must raise IndexError, so array can be lazily generated or paged source
+
+    Args:
+        array: searched sorted indexable
+        element: element to search for
+        lo (int, optional): search range start index. Defaults to 0
+        hi (int, optional): search range end index, probes never reach it. Defaults to None for unbounded search
+        key (callable, optional): function extracting comparison key from array items. Defaults to None
+
+    Returns:
+        int: element index if element is found, -1 otherwise
+    """
+    def is_less(index):
+        """Checks that index is in bounds and item at index is less than element"""
+        if hi is not None and index >= hi:
+            return False
+        try:
+            item = array[index]
+        except IndexError:
+            return False
+        return (item if key is None else key(item)) < element
+
+    bound = 1
+    while is_less(lo + bound - 1):
+        lo += bound
+        bound *= 2
+    high = lo + bound - 1 if hi is None else min(lo + bound - 1, hi)
+    while lo < high:
+        middle_index = (lo + high) // 2
+        if is_less(middle_index):
+            lo = middle_index + 1
+        else:
+            high = middle_index
+    if hi is not None and lo >= hi:
+        return -1
+    try:
+        item = array[lo]
+    except IndexError:
         return -1
-    middle_index = (max_index + min_index) // 2
-    if array[middle_index] < element:
-        return binary_search(array, element, middle_index + 1, max_index)
-    elif array[middle_index] > element:
-        return binary_search(array, element, min_index, middle_index)
-    else:
-        return middle_index
+    return lo if (item if key is None else key(item)) == element else -1
+
+
+def select_search(array, sample_size=64, key=None):
+    """ Selects search function best suited for array from a sample of its keys.
+    Arrays without length get exponential_search. For arrays of numeric keys which sample deviates from a straight
+    line by less than a tenth of key range, interpolation_search and search are timed looking up sampled keys, and
+    the faster one is selected, since fewer probes pay off only if probes are expensive. Other arrays get search
+
+    Args:
+        array: sorted indexable
+        sample_size (int, optional): number of sampled keys. Defaults to 64
+        key (callable, optional): function extracting comparison key from array items. Defaults to None
+
+    Returns:
+        callable: search function with same arguments as search
+    """
+    try:
+        array_length = len(array)
+    except TypeError:
+        return exponential_search
+    if array_length < 2 * sample_size:
+        return search
+    indexes = [index * (array_length - 1) // (sample_size - 1) for index in range(sample_size)]
+    sample = [array[index] if key is None else key(array[index]) for index in indexes]
+    if not all(isinstance(value, Number) for value in sample) or sample[0] == sample[-1]:
+        return search
+    value_range = sample[-1] - sample[0]
+    deviation = max(abs(value - sample[0] - value_range * index / (array_length - 1))
+                    for index, value in zip(indexes, sample))
+    if deviation >= value_range / 10:
+        return search
+    timings = {search: [], interpolation_search: []}
+    for _ in range(3):
+        for strategy, strategy_timings in timings.items():
+            start_time = perf_counter()
+            for value in sample:
+                strategy(array, value, key=key)
+            strategy_timings.append(perf_counter() - start_time)
+    return min(timings, key=lambda strategy: min(timings[strategy]))
+
 
 if __name__ == '__main__':
     array = [0, 1, 2, 3, 4, 5, 6]
     for element in array:
         assert search(array, element) == element
+        assert binary_search(array, element, 0, len(array) - 1) == element
 
     assert search(array, 7) == -1
+    assert binary_search(array, 7, 0, len(array) - 1) == -1
+    assert binary_search(array, -1, 0, len(array) - 1) == -1
+
+    # test leftmost, rightmost, lo, hi and key semantics against bisect module
+    array = sorted(random.randint(0, 50) for _ in range(200))
+    for element in range(-1, 52):
+        assert bisect_left(array, element) == bisect.bisect_left(array, element)
+        assert bisect_right(array, element) == bisect.bisect_right(array, element)
+        assert bisect_left(array, element, 10, 100) == bisect.bisect_left(array, element, 10, 100)
+        assert bisect_right(array, element, 10, 100) == bisect.bisect_right(array, element, 10, 100)
+        if element in array:
+            assert search(array, element) == array.index(element)
+            assert search_rightmost(array, element) == len(array) - 1 - array[::-1].index(element)
+        else:
+            assert search(array, element) == search_rightmost(array, element) == -1
+    records = [(value, str(value)) for value in array]
+    assert search(records, array[5], key=lambda record: record[0]) == array.index(array[5])
+    assert search([1, 2, 3], 1, lo=1) == -1
+
+    # test search_many function
+    for queries in ([], [3], random.sample(range(-5, 60), 40), [random.randint(-5, 60) for _ in range(1000)]):
+        assert search_many(array, queries) == [search(array, query) for query in queries]
+        assert search_many(records, queries, key=lambda record: record[0]) == \
+            [search(array, query) for query in queries]
+        if numpy is not None:
+            assert list(search_many(numpy.array(array), numpy.array(queries, dtype=int))) == search_many(array, queries)
+    assert search_many([], [1, 2]) == [-1, -1]
+
+    # test interpolation_search, exponential_search and select_search functions against search
+    class PagedSource:
+        """Sorted source without length which raises IndexError past its end"""
+
+        def __init__(self, values):
+            self.values = values
+
+        def __getitem__(self, index):
+            if index >= len(self.values):
+                raise IndexError(index)
+            return self.values[index]
+
+    for array in ([], [5], [1, 1, 1], sorted(random.randint(0, 100) for _ in range(300)),
+                  sorted(random.random() * 10 for _ in range(300)), [2 ** index for index in range(60)]):
+        for element in list(array[::7]) + [-1, 0.5, 50, 101, 2 ** 70]:
+            expected_index = search(array, element)
+            assert interpolation_search(array, element) == expected_index
+            assert exponential_search(array, element) == expected_index
+            assert exponential_search(PagedSource(array), element) == expected_index
+            assert interpolation_search(array, element, 3, len(array) // 2) == \
+                search(array, element, 3, len(array) // 2)
+            assert exponential_search(array, element, 3, len(array) // 2) == \
+                search(array, element, 3, len(array) // 2)
+            assert exponential_search(PagedSource(array), element, 2, len(array) - 1) == \
+                search(array, element, 2, len(array) - 1)
+    assert select_search(list(range(0, 3000, 3))) in (search, interpolation_search)
+    assert select_search([2 ** index for index in range(200)]) is search
+    assert select_search(PagedSource([1, 2])) is exponential_search
+
+    # benchmark search strategies on uniform and skewed keys
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    workloads = (('uniform', sorted(random.randrange(10 * size) for _ in range(size))),
+                 ('skewed', sorted(int(random.expovariate(1 / size) ** 2) for _ in range(size))))
+    for description, array in workloads:
+        queries = [array[random.randrange(size)] for _ in range(100000)]
+        for strategy in (search, interpolation_search, exponential_search):
+            start_time = datetime.now()
+            for query in queries:
+                strategy(array, query)
+            elapsed_time = (datetime.now() - start_time).total_seconds()
+            print('{} of 100 000 queries in {} {} keys: {} ({:.0f}ns per lookup)'.format(
+                strategy.__name__, size, description, readable_time(elapsed_time),
+                elapsed_time / len(queries) * 10 ** 9))
+        print('Selected strategy for {} keys: {}'.format(description, select_search(array).__name__))
+
+    # benchmark search strategies on lazily paged source with expensive probes
+    class SlowSource(PagedSource):
+        """Paged source which page access takes a microsecond"""
+
+        def __getitem__(self, index):
+            start_time = perf_counter()
+            while perf_counter() - start_time < 10 ** -6:
+                pass
+            return super().__getitem__(index)
+
+    array = SlowSource(workloads[0][1])
+    queries = [array.values[random.randrange(size)] for _ in range(10000)]
+    for strategy in (search, interpolation_search, exponential_search):
+        start_time = datetime.now()
+        for query in queries:
+            strategy(array, query, 0, size)
+        elapsed_time = (datetime.now() - start_time).total_seconds()
+        print('{} of 10 000 queries in {} paged uniform keys: {:.0f}ns per lookup'.format(
+            strategy.__name__, size, elapsed_time / len(queries) * 10 ** 9))
@@ -1,5 +1,42 @@
-""" Closest pair algorithm implementation. Finds closest coordinate pair"""
-from math import sqrt
+""" Closest pair algorithm implementation. Finds closest coordinate pair
+Points are split by x median, closest pairs are found in both halves recursively, then pairs split between halves are
+checked in a strip around median. Engine works on parallel coordinate arrays and arrays of point indexes, points are
+merged by y on the way up, so strip is scanned in y order without presorting. Squared distances are compared, so no
+square roots are taken. Index buffer is sorted by x in place, only one short run of indexes at a time is sorted with
+builtin sort, so apart from two index buffers allocated once no memory is allocated during search.
+If NumPy is installed, find_closest_pair_array runs same recursion over whole index arrays: halves are split with
+boolean masks, small ranges and strip are checked with vectorized distance computations.
+parallel_find_closest_pair splits points by x at sampled quantiles into slabs sorted and searched in worker processes,
+then checks points near slab boundaries
+Expected performance: O(nlog(n))
+"""
+import os
+import random
+import sys
+import tracemalloc
+from array import array as typed_array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from fractions import Fraction
+from itertools import accumulate
+from math import inf, sqrt
+from multiprocessing import shared_memory
+
+from algorithms.merge_sort import chunk_bounds
+from utils.readable import readable_size, readable_time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+ARRAY_BASE_CASE = 64  # ranges of that many points are solved with broadcasting by find_closest_pair_array
+STRIP_WINDOW = 7  # each strip point is compared with that many next points in y order
+PARALLEL_THRESHOLD = 100000  # point sets smaller than that are searched serially by parallel_find_closest_pair
+FLOAT_EXACT_INT = 2 ** 25  # squared distances between ints up to that magnitude are exact in float arithmetic
+SORT_RUN = 1024  # index runs of that length are sorted with builtin sort before they are merged in place
+SLAB_SAMPLE = 64  # number of x coordinates sampled per slab to pick slab boundaries
 
 
 class Point:
@@ -13,6 +50,7 @@ class Point:
         x: point x coordinate
         y: point y coordinate
     """
+    __slots__ = ('x', 'y')
 
     def __init__(self, x, y):
         self.x = x
@@ -38,7 +76,22 @@ def distance(first_point, second_point):
     Returns:
         distance between points
     """
-    return sqrt((first_point.x - second_point.x) ** 2 + (first_point.y - second_point.y) ** 2)
+    return sqrt(squared_distance(first_point, second_point))
+
+
+def squared_distance(first_point, second_point):
+    """ Finds the squared Euclidean distance between points. Preserves distance order without taking square root
+
+    Args:
+        first_point(Point): first point
+        second_point(Point): second point
+
+    Returns:
+        squared distance between points
+    """
+    x_difference = first_point.x - second_point.x
+    y_difference = first_point.y - second_point.y
+    return x_difference * x_difference + y_difference * y_difference
 
 
 def find_closest_pair(points):
@@ -50,7 +103,350 @@ def find_closest_pair(points):
     Returns:
         tuple: pair of closest points
     """
-    return closest_pair(sorted(points, key=lambda point: point.x), sorted(points, key=lambda point: point.y))
+    first_index, second_index = find_closest_pair_indexes(*coordinate_arrays(points))
+    return points[first_index], points[second_index]
+
+
+def coordinate_arrays(points):
+    """ Splits points into parallel coordinate arrays. Coordinates are packed into float arrays only if float
+    arithmetic compares their distances exactly, i.e. all of them are floats or small ints. Otherwise they are kept in
+    lists, so big ints, Fraction and Decimal coordinates stay exact
+
+    Args:
+        points: list of points
+
+    Returns:
+        tuple: x coordinates, y coordinates, both array.array('d') or both lists
+    """
+    xs = [point.x for point in points]
+    ys = [point.y for point in points]
+    if all(type(value) is float or (type(value) is int and -FLOAT_EXACT_INT <= value <= FLOAT_EXACT_INT)
+           for coordinates in (xs, ys) for value in coordinates):
+        return typed_array('d', xs), typed_array('d', ys)
+    return xs, ys
+
+
+def find_closest_pair_indexes(xs, ys):
+    """ Finds closest pair of points given as parallel coordinate arrays
+    Raises ValueError if there are less than two points
+
+    Args:
+        xs: sequence of points x coordinates, e.g. array.array('d')
+        ys: sequence of points y coordinates
+
+    Returns:
+        tuple: indexes of closest points, smaller index first
+    """
+    points_count = len(xs)
+    if points_count < 2:
+        raise ValueError('At least two points are required')
+    order = memoryview(typed_array('q', [0]) * points_count)
+    scratch = memoryview(typed_array('q', [0]) * points_count)
+    sort_indexes(xs, order, scratch)
+    best = [inf, 0, 1]
+    closest_pair_range(xs, ys, order, scratch, 0, points_count, best)
+    return min(best[1], best[2]), max(best[1], best[2])
+
+
+def sort_indexes(keys, order, scratch):
+    """ Fills buffer with indexes of keys sorted by key, equal keys keep index order. Runs of SORT_RUN indexes are
+    sorted with builtin sort, then runs are merged bottom-up ping-ponging between order and scratch
+
+    Args:
+        keys: sequence of sort keys
+        order: buffer of len(keys) indexes, filled in place
+        scratch: buffer of indexes used for merging, same length as order
+    """
+    points_count = len(keys)
+    for low in range(0, points_count, SORT_RUN):
+        high = min(low + SORT_RUN, points_count)
+        order[low:high] = typed_array('q', sorted(range(low, high), key=keys.__getitem__))
+    source, destination = order, scratch
+    width = SORT_RUN
+    while width < points_count:
+        for low in range(0, points_count, 2 * width):
+            middle, high = min(low + width, points_count), min(low + 2 * width, points_count)
+            i, j, k = low, middle, low
+            while i < middle and j < high:
+                if keys[source[j]] < keys[source[i]]:
+                    destination[k] = source[j]
+                    j += 1
+                else:
+                    destination[k] = source[i]
+                    i += 1
+                k += 1
+            if i < middle:
+                destination[k:high] = source[i:middle]
+            else:
+                destination[k:high] = source[j:high]
+        source, destination = destination, source
+        width *= 2
+    if source is not order:
+        order[:] = source
+
+
+def closest_pair_range(xs, ys, order, scratch, lo, hi, best):
+    """ Finds closest pair among points order[lo:hi] using divide and conquer method.
+    On call order[lo:hi] should be sorted by x, on return it is sorted by y
+
+    Args:
+        xs: points x coordinates
+        ys: points y coordinates
+        order: buffer of point indexes
+        scratch: buffer of point indexes used for merging, same length as order
+        lo: range start index
+        hi: range end index
+        best: list of best squared distance and indexes of best pair found so far, updated in place
+    """
+    if hi - lo <= 3:
+        for first in range(lo, hi):
+            i = order[first]
+            for second in range(first + 1, hi):
+                j = order[second]
+                x_difference, y_difference = xs[i] - xs[j], ys[i] - ys[j]
+                points_squared_distance = x_difference * x_difference + y_difference * y_difference
+                if points_squared_distance < best[0]:
+                    best[0], best[1], best[2] = points_squared_distance, i, j
+        for first in range(lo + 1, hi):  # insertion sort by y
+            index = order[first]
+            second = first
+            while second > lo and ys[index] < ys[order[second - 1]]:
+                order[second] = order[second - 1]
+                second -= 1
+            order[second] = index
+        return
+    middle = (lo + hi) // 2
+    middle_x = xs[order[middle]]
+    closest_pair_range(xs, ys, order, scratch, lo, middle, best)
+    closest_pair_range(xs, ys, order, scratch, middle, hi, best)
+
+    i, j, k = lo, middle, lo
+    while i < middle and j < hi:
+        if ys[order[j]] < ys[order[i]]:
+            scratch[k] = order[j]
+            j += 1
+        else:
+            scratch[k] = order[i]
+            i += 1
+        k += 1
+    if i < middle:
+        scratch[k:hi] = order[i:middle]
+    else:
+        scratch[k:hi] = order[j:hi]
+    order[lo:hi] = scratch[lo:hi]
+
+    strip_end = lo  # strip points are collected into scratch in y order
+    for k in range(lo, hi):
+        index = order[k]
+        x_difference = xs[index] - middle_x
+        if x_difference * x_difference < best[0]:
+            scratch[strip_end] = index
+            strip_end += 1
+    for first in range(lo, strip_end):
+        i = scratch[first]
+        x, y = xs[i], ys[i]
+        for second in range(first + 1, strip_end):
+            j = scratch[second]
+            y_difference = ys[j] - y
+            if y_difference * y_difference >= best[0]:
+                break
+            x_difference = xs[j] - x
+            points_squared_distance = x_difference * x_difference + y_difference * y_difference
+            if points_squared_distance < best[0]:
+                best[0], best[1], best[2] = points_squared_distance, i, j
+
+
+def find_closest_pair_array(xs, ys):
+    """ Finds closest pair of points given as coordinate arrays using NumPy. Points are split by x median like in
+    find_closest_pair_indexes, small ranges are solved by broadcasting all pairwise distances, strip is checked as
+    banded distance computation between each point and STRIP_WINDOW next points in y order.
+    Falls back to find_closest_pair_indexes if NumPy is not installed
+    Raises ValueError if there are less than two points
+
+    Args:
+        xs: points x coordinates, array-like
+        ys: points y coordinates, array-like
+
+    Returns:
+        tuple: indexes of closest points, smaller index first
+    """
+    if numpy is None:
+        return find_closest_pair_indexes(xs, ys)
+    xs = numpy.asarray(xs, dtype=numpy.float64)
+    ys = numpy.asarray(ys, dtype=numpy.float64)
+    points_count = len(xs)
+    if points_count < 2:
+        raise ValueError('At least two points are required')
+    order_x = numpy.argsort(xs, kind='stable')
+    ranks = numpy.empty(points_count, dtype=numpy.int64)
+    ranks[order_x] = numpy.arange(points_count)
+    best = [inf, 0, 1]
+    closest_pair_array_range(xs, ys, order_x, ranks, numpy.argsort(ys, kind='stable'), 0, points_count, best)
+    return int(min(best[1], best[2])), int(max(best[1], best[2]))
+
+
+def closest_pair_array_range(xs, ys, order_x, ranks, order_y, lo, hi, best):
+    """ Finds closest pair among points with x order ranks in [lo, hi) using NumPy
+
+    Args:
+        xs: numpy array of points x coordinates
+        ys: numpy array of points y coordinates
+        order_x: numpy array of point indexes sorted by x
+        ranks: numpy array of point positions in order_x
+        order_y: numpy array of indexes of points in range sorted by y
+        lo: range start rank
+        hi: range end rank
+        best: list of best squared distance and indexes of best pair found so far, updated in place
+    """
+    if hi - lo <= ARRAY_BASE_CASE:
+        range_xs, range_ys = xs[order_y], ys[order_y]
+        squared_distances = (range_xs[:, None] - range_xs) ** 2 + (range_ys[:, None] - range_ys) ** 2
+        squared_distances[numpy.tril_indices(hi - lo)] = inf
+        first, second = numpy.unravel_index(numpy.argmin(squared_distances), squared_distances.shape)
+        if squared_distances[first, second] < best[0]:
+            best[0], best[1], best[2] = float(squared_distances[first, second]), order_y[first], order_y[second]
+        return
+    middle = (lo + hi) // 2
+    middle_x = xs[order_x[middle]]
+    is_left = ranks[order_y] < middle
+    closest_pair_array_range(xs, ys, order_x, ranks, order_y[is_left], lo, middle, best)
+    closest_pair_array_range(xs, ys, order_x, ranks, order_y[~is_left], middle, hi, best)
+
+    strip = order_y[(xs[order_y] - middle_x) ** 2 < best[0]]
+    strip_xs, strip_ys = xs[strip], ys[strip]
+    for offset in range(1, min(STRIP_WINDOW, len(strip) - 1) + 1):
+        squared_distances = (strip_xs[offset:] - strip_xs[:-offset]) ** 2 + \
+                            (strip_ys[offset:] - strip_ys[:-offset]) ** 2
+        first = numpy.argmin(squared_distances)
+        if squared_distances[first] < best[0]:
+            best[0], best[1], best[2] = float(squared_distances[first]), strip[first], strip[first + offset]
+
+
+def parallel_find_closest_pair(points, workers=None, threshold=PARALLEL_THRESHOLD):
+    """ Finds closest pair of points splitting them by x into slabs which are sorted and searched in separate
+    processes. Slab boundaries are picked at quantiles of sampled x coordinates, so points are only grouped by slab
+    before they are handed to workers through shared memory. Workers also return points closer to slab boundaries than
+    closest pair of the slab, pairs straddling boundaries are searched among them.
+    Points which coordinates don't fit float arrays exactly are searched serially. Of several pairs at equal distance
+    the one with smallest indexes among slab and boundary candidates is returned, which may differ from the pair
+    returned by find_closest_pair
+    Raises ValueError if there are less than two points
+
+    Args:
+        points: list of points
+        workers (int, optional): number of worker processes. Defaults to number of CPUs
+        threshold (int, optional): point sets smaller than that are searched serially. Defaults to PARALLEL_THRESHOLD
+
+    Returns:
+        tuple: pair of closest points
+    """
+    workers = workers or os.cpu_count() or 1
+    points_count = len(points)
+    if points_count < threshold or workers == 1 or points_count < 4:
+        return find_closest_pair(points)
+    xs, ys = coordinate_arrays(points)
+    if not isinstance(xs, typed_array):
+        first_index, second_index = find_closest_pair_indexes(xs, ys)
+        return points[first_index], points[second_index]
+    slabs_count = min(workers, points_count // 2)
+    sample = sorted(xs[::max(1, points_count // (SLAB_SAMPLE * slabs_count))])
+    pivots = [sample[len(sample) * index // slabs_count] for index in range(1, slabs_count)]
+    memory = shared_memory.SharedMemory(create=True, size=2 * points_count * xs.itemsize)
+    view = memory.buf.cast('d')
+    try:
+        order, bounds = split_slabs(xs, ys, pivots, view)
+        edges = [-inf] + pivots + [inf]
+        strip = [low for low, high in bounds if high - low == 1]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(closest_pair_shared_slab, memory.name, points_count, low, high,
+                                       edges[index], edges[index + 1])
+                       for index, (low, high) in enumerate(bounds) if high - low > 1]
+            candidates = []
+            for future in futures:
+                pair, slab_strip = future.result()
+                candidates.append(pair)
+                strip.extend(slab_strip)
+        if len(strip) > 1:
+            strip.sort()
+            first, second = find_closest_pair_indexes(typed_array('d', [view[position] for position in strip]),
+                                                      typed_array('d', [view[points_count + position]
+                                                                        for position in strip]))
+            candidates.append((strip[first], strip[second]))
+        pairs = [tuple(sorted((int(order[first]), int(order[second])))) for first, second in candidates]
+        first_index, second_index = min(pairs, key=lambda pair: (squared_distance(points[pair[0]], points[pair[1]]),
+                                                                 pair))
+        return points[first_index], points[second_index]
+    finally:
+        view.release()
+        memory.close()
+        memory.unlink()
+
+
+def split_slabs(xs, ys, pivots, view):
+    """ Groups points into slabs separated by pivots, points with x equal to pivot belong to the slab on the right.
+    Coordinates grouped by slab are written to view, x coordinates followed by y coordinates. Uses NumPy if installed
+
+    Args:
+        xs: array.array('d') of points x coordinates
+        ys: array.array('d') of points y coordinates
+        pivots: sorted list of slab boundaries
+        view: memoryview of doubles twice as long as xs
+
+    Returns:
+        tuple: point indexes grouped by slab, list of (low, high) slab bounds in view
+    """
+    points_count = len(xs)
+    if numpy is not None:
+        all_xs, all_ys = numpy.frombuffer(xs), numpy.frombuffer(ys)
+        slabs = numpy.searchsorted(numpy.array(pivots), all_xs, side='right')
+        order = numpy.argsort(slabs, kind='stable')
+        grouped = numpy.frombuffer(view, dtype=numpy.float64)
+        numpy.take(all_xs, order, out=grouped[:points_count])
+        numpy.take(all_ys, order, out=grouped[points_count:])
+        ends = numpy.cumsum(numpy.bincount(slabs, minlength=len(pivots) + 1)).tolist()
+    else:
+        slab_orders = [typed_array('q') for _ in range(len(pivots) + 1)]
+        for index, x in enumerate(xs):
+            slab_orders[bisect_right(pivots, x)].append(index)
+        order = typed_array('q')
+        for slab_order in slab_orders:
+            order.extend(slab_order)
+        view[:points_count] = typed_array('d', map(xs.__getitem__, order))
+        view[points_count:] = typed_array('d', map(ys.__getitem__, order))
+        ends = list(accumulate(len(slab_order) for slab_order in slab_orders))
+    return order, list(zip([0] + ends[:-1], ends))
+
+
+def closest_pair_shared_slab(memory_name, points_count, low, high, left_x, right_x):
+    """ Finds closest pair in a slab of points located in shared memory and points closer to slab boundaries than
+    that pair. Runs in parallel_find_closest_pair worker processes
+
+    Args:
+        memory_name: name of shared memory block holding x coordinates followed by y coordinates of points grouped by
+            slab
+        points_count: number of points in shared memory
+        low: slab start index
+        high: slab end index, slab has at least two points
+        left_x: x coordinate of slab left boundary
+        right_x: x coordinate of slab right boundary
+
+    Returns:
+        tuple: indexes of closest points of the slab in shared memory, list of indexes of points near boundaries
+    """
+    memory = shared_memory.SharedMemory(name=memory_name)
+    view = memory.buf.cast('d')
+    try:
+        xs = typed_array('d', view[low:high])
+        ys = typed_array('d', view[points_count + low:points_count + high])
+    finally:
+        view.release()
+        memory.close()
+    first, second = find_closest_pair_indexes(xs, ys)
+    x_difference, y_difference = xs[first] - xs[second], ys[first] - ys[second]
+    best_distance = x_difference * x_difference + y_difference * y_difference
+    strip = [low + index for index, x in enumerate(xs)
+             if (x - left_x) * (x - left_x) < best_distance or (right_x - x) * (right_x - x) < best_distance]
+    return (low + first, low + second), strip
 
 
 def closest_pair_brute_force(points):
@@ -62,11 +458,11 @@ def closest_pair_brute_force(points):
     Returns:
         tuple: pair of closest points
     """
-    best_distance = distance(points[0], points[1])
+    best_distance = squared_distance(points[0], points[1])
     best_points_pair = (points[0], points[1])
     for i in range(len(points)):
         for j in range(i + 1, len(points)):
-            points_distance = distance(points[i], points[j])
+            points_distance = squared_distance(points[i], points[j])
             if points_distance < best_distance:
                 best_distance = points_distance
                 best_points_pair = (points[i], points[j])
@@ -78,32 +474,13 @@ def closest_pair(points_x, points_y):
 
     Args:
         points_x: list of points sorted by x coordinate
-        points_y: list of points sorted by y coordinate
+        points_y: list of points sorted by y coordinate, not needed since engine orders points by y while merging.
+            Kept for compatibility
 
     Returns:
         tuple: pair of closest points
     """
-    if len(points_x) <= 3:
-        return closest_pair_brute_force(points_x)
-    else:
-        points_x_length_half = len(points_x) // 2
-        points_x_left = points_x[:points_x_length_half]
-        points_x_right = points_x[points_x_length_half:]
-
-        point_y_length_half = len(points_y) // 2
-        points_y_left = points_y[:point_y_length_half]
-        points_y_right = points_y[point_y_length_half:]
-
-        first_closest_pair = closest_pair(points_x_left, points_y_left)
-        second_closest_pair = closest_pair(points_x_right, points_y_right)
-
-        delta = min((distance(*first_closest_pair)), distance(*second_closest_pair))
-        third_closest_pair = closest_split_pair(points_x, points_y, delta)
-
-        if third_closest_pair[0] is None:
-            return best_pair(first_closest_pair, second_closest_pair, second_closest_pair)
-        else:
-            return best_pair(first_closest_pair, second_closest_pair, third_closest_pair)
+    return find_closest_pair(points_x)
 
 
 def closest_split_pair(points_x, points_y, delta):
@@ -115,20 +492,19 @@ def closest_split_pair(points_x, points_y, delta):
         delta: minimal distance between unsplit points
 
     Returns:
-        tuple: pair of closest points
+        tuple: pair of closest points, (None, None) if there is no pair closer than delta
     """
-    biggest_left_x = points_x[:len(points_x) // 2][-1]
-    in_range_points = []
-    for point in points_y:
-        if (biggest_left_x.x - delta) <= point.x <= (biggest_left_x.x + delta):
-            in_range_points.append(point)
+    biggest_left_x = points_x[len(points_x) // 2 - 1].x
+    in_range_points = [point for point in points_y if (biggest_left_x - delta) <= point.x <= (biggest_left_x + delta)]
 
-    best_distance = delta
+    best_distance = delta * delta
     best_points_pair = (None, None)
-    for i in range(len(in_range_points) - 1):
-        for j in range(i + 1, min(7, len(in_range_points) - i)):
-            first_point, second_point = in_range_points[i], in_range_points[i + j]
-            points_distance = distance(first_point, second_point)
+    for i in range(len(in_range_points)):
+        for j in range(i + 1, len(in_range_points)):
+            first_point, second_point = in_range_points[i], in_range_points[j]
+            if (second_point.y - first_point.y) ** 2 >= best_distance:
+                break
+            points_distance = squared_distance(first_point, second_point)
             if points_distance < best_distance:
                 best_points_pair = (first_point, second_point)
                 best_distance = points_distance
@@ -147,7 +523,7 @@ def best_pair(first_pair, second_pair, third_pair):
     Returns:
         pair of points with lowest distance
     """
-    return min((first_pair, second_pair, third_pair), key=lambda pair: distance(*pair))
+    return min((first_pair, second_pair, third_pair), key=lambda pair: squared_distance(*pair))
 
 if __name__ == '__main__':
     # test distance function
@@ -165,3 +541,103 @@ if __name__ == '__main__':
         (Point(1, 1), Point(2, 2)),
         (Point(1, 1), Point(3, 3))
     ) == (Point(1, 1), Point(1, 1))
+
+    # test engine against brute force, including duplicates and points on one vertical line
+    for points in ([Point(0, 0), Point(0, 0)], [Point(0, index) for index in (5, 1, 9, 2)],
+                   [Point(random.randint(0, 20), random.randint(0, 20)) for _ in range(50)],
+                   [Point(random.random(), random.random()) for _ in range(500)],
+                   [Point(random.choice((0, 1)), random.random()) for _ in range(300)]):
+        assert distance(*find_closest_pair(points)) == distance(*closest_pair_brute_force(points))
+        points_x = sorted(points, key=lambda point: point.x)
+        assert distance(*closest_pair(points_x, sorted(points, key=lambda point: point.y))) == \
+            distance(*closest_pair_brute_force(points))
+
+    # test exact coordinates which don't fit float arrays
+    big = 10 ** 17
+    points = [Point(big, 0), Point(big + 1, 0), Point(big + 3, 0)]
+    assert find_closest_pair(points) == (Point(big, 0), Point(big + 1, 0))
+    assert parallel_find_closest_pair(points, workers=2, threshold=0) == (Point(big, 0), Point(big + 1, 0))
+    points = [Point(Fraction(1, 3), 0), Point(Fraction(1, 3) + Fraction(1, 10 ** 20), 0), Point(1, 1)]
+    assert find_closest_pair(points) == tuple(points[:2])
+    assert isinstance(coordinate_arrays([Point(1, 2.5), Point(-FLOAT_EXACT_INT, 0)])[0], typed_array)
+    assert isinstance(coordinate_arrays([Point(1, 2.5), Point(FLOAT_EXACT_INT + 1, 0)])[0], list)
+
+    # test closest split pair function
+    points_x = [Point(0, 0), Point(1, 0), Point(2, 5), Point(10, 10)]
+    assert closest_split_pair(points_x, sorted(points_x, key=lambda point: point.y), 2) == (Point(0, 0), Point(1, 0))
+
+    # test find_closest_pair_array function against find_closest_pair_indexes
+    for size in (2, 3, 65, 1000):
+        xs = [random.randint(0, 100) for _ in range(size)]
+        ys = [random.random() for _ in range(size)]
+        first_index, second_index = find_closest_pair_array(xs, ys)
+        expected_first_index, expected_second_index = find_closest_pair_indexes(xs, ys)
+        assert first_index < second_index
+        assert distance(Point(xs[first_index], ys[first_index]), Point(xs[second_index], ys[second_index])) == \
+            distance(Point(xs[expected_first_index], ys[expected_first_index]),
+                     Point(xs[expected_second_index], ys[expected_second_index]))
+
+    # test parallel_find_closest_pair function against find_closest_pair
+    for size, workers in ((4, 2), (10, 3), (1000, 4), (5000, 8)):
+        points = [Point(random.randint(0, 10 ** 4), random.random()) for _ in range(size)]
+        assert distance(*parallel_find_closest_pair(points, workers=workers, threshold=0)) == \
+            distance(*find_closest_pair(points))
+    points = [Point(index % 2, index // 2) for index in range(100)]  # slabs can't split equal x coordinates
+    assert distance(*parallel_find_closest_pair(points, workers=4, threshold=0)) == 1
+    points = [Point(index * 10, 0) for index in range(8)] + [Point(34.9, 0), Point(35.1, 0)]  # pivot 35.1 splits pair
+    assert parallel_find_closest_pair(points, workers=4, threshold=0) == (Point(34.9, 0), Point(35.1, 0))
+    for size, workers in ((20, 4), (300, 8)):
+        points = [Point(random.randint(0, 5), random.randint(0, 10 ** 3)) for _ in range(size)]
+        assert distance(*parallel_find_closest_pair(points, workers=workers, threshold=0)) == \
+            distance(*closest_pair_brute_force(points))
+
+    # test sort_indexes function against builtin sort
+    for size in (0, 1, SORT_RUN, 3 * SORT_RUN + 5):
+        keys = [random.randint(0, 100) for _ in range(size)]
+        order = memoryview(typed_array('q', [0]) * size)
+        sort_indexes(keys, order, memoryview(typed_array('q', [0]) * size))
+        assert order.tolist() == sorted(range(size), key=keys.__getitem__)
+
+    # benchmark engines against find_closest_pair and brute force, pass 10000000 as argument for 10^7 points
+    sizes = [int(size) for size in sys.argv[1:]] or [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+    for size in sizes:
+        xs = typed_array('d', (random.random() for _ in range(size)))
+        ys = typed_array('d', (random.random() for _ in range(size)))
+        start_time = datetime.now()
+        first_index, second_index = find_closest_pair_indexes(xs, ys)
+        print('find_closest_pair_indexes of {} points:'.format(size),
+              readable_time((datetime.now() - start_time).total_seconds()))
+        if numpy is not None:
+            start_time = datetime.now()
+            array_pair = find_closest_pair_array(xs, ys)
+            print('find_closest_pair_array of {} points:'.format(size),
+                  readable_time((datetime.now() - start_time).total_seconds()))
+            assert squared_distance(*(Point(xs[index], ys[index]) for index in array_pair)) == \
+                squared_distance(Point(xs[first_index], ys[first_index]), Point(xs[second_index], ys[second_index]))
+        if size <= 10 ** 5:  # tracing slows search down a lot
+            tracemalloc.start()
+            find_closest_pair_indexes(xs, ys)
+            print('find_closest_pair_indexes of {} points peak memory:'.format(size),
+                  readable_size(tracemalloc.get_traced_memory()[1]))
+            tracemalloc.stop()
+        if size <= 10 ** 6:
+            points = [Point(x, y) for x, y in zip(xs, ys)]
+            start_time = datetime.now()
+            find_closest_pair(points)
+            print('find_closest_pair of {} points:'.format(size),
+                  readable_time((datetime.now() - start_time).total_seconds()))
+        if size <= 2000:
+            start_time = datetime.now()
+            brute_force_pair = closest_pair_brute_force(points)
+            print('closest_pair_brute_force of {} points:'.format(size),
+                  readable_time((datetime.now() - start_time).total_seconds()))
+            assert distance(*brute_force_pair) == distance(points[first_index], points[second_index])
+
+    # benchmark parallel_find_closest_pair scaling
+    size = max(sizes)
+    points = [Point(random.random(), random.random()) for _ in range(size)]
+    for workers in (1, 2, 4, 8):
+        start_time = datetime.now()
+        parallel_find_closest_pair(points, workers=workers)
+        print('parallel_find_closest_pair of {} points with {} workers:'.format(size, workers),
+              readable_time((datetime.now() - start_time).total_seconds()))
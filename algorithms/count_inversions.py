@@ -2,8 +2,21 @@
 Basic idea is that input array is split into halves until base case is hit (array length equals 1) for all branches.
 Then all branches from bottom to top are merged to form sorted sub-arrays and inversions are counted
 Expected performance: O(nlog(n)),
-~ log(n) levels of recursion and ~ n operations done at each level
+~ log(n) levels of recursion and ~ n operations done at each level.
+Count-only variant merges bottom-up within one scratch buffer, InversionCounter keeps running count of a growing
+sequence in O(log(n)) per appended value
 """
+import os
+import random
+import sys
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from utils.readable import readable_time
+
+MIN_RUN = 64  # runs shorter than that are counted with binary insertion before merging
+PARALLEL_THRESHOLD = 100000  # inputs shorter than that are counted serially by parallel_count
 
 
 def sort_and_count(array):
@@ -48,7 +61,7 @@ def merge_and_count_inversions(first_array, second_array):
         elif j == len(second_array):
             result_array += first_array[i:]
             break
-        elif first_array[i] < second_array[j]:
+        elif not second_array[j] < first_array[i]:  # equal items are not an inversion
             result_array.append(first_array[i])
             i += 1
         else:
@@ -57,9 +70,289 @@ def merge_and_count_inversions(first_array, second_array):
             inversion_count += len(first_array) - i
     return result_array, inversion_count
 
+
+def count(array):
+    """Counts inversions without recursion using bottom-up merge sort
+
+    Args:
+        array: list object which inversions should be counted
+
+    Returns:
+        int: number of inversions
+    """
+    return sort_and_count_bottom_up(array)[1]
+
+
+def sort_and_count_bottom_up(array):
+    """Sorts an array object and counts inversions without recursion. Runs of MIN_RUN items are counted with binary
+    insertion, then runs are merged ping-ponging between a copy of array and one preallocated scratch buffer
+
+    Args:
+        array: list object that should be sorted
+
+    Returns:
+        tuple: first element is sorted list object, second element is number of inversions. E.g. ([1, 2, 3], 2)
+    """
+    array_length = len(array)
+    source = list(array)
+    inversion_count = 0
+    for low in range(0, array_length, MIN_RUN):
+        run = []
+        for item in source[low:low + MIN_RUN]:
+            position = bisect_right(run, item)
+            inversion_count += len(run) - position
+            run.insert(position, item)
+        source[low:low + len(run)] = run
+    destination = [None] * array_length
+    width = MIN_RUN
+    while width < array_length:
+        for low in range(0, array_length, 2 * width):
+            middle = min(low + width, array_length)
+            inversion_count += merge_and_count_runs(source, destination, low, middle, min(middle + width, array_length))
+        source, destination = destination, source
+        width *= 2
+    return source, inversion_count
+
+
+def merge_and_count_runs(source, destination, low, middle, high):
+    """Merges adjacent sorted runs source[low:middle] and source[middle:high] into destination[low:high] and counts
+    split inversions
+
+    Args:
+        source: buffer containing both runs
+        destination: buffer merged run is written to
+        low: first run start index
+        middle: first run end index, second run start index
+        high: second run end index
+
+    Returns:
+        int: number of split inversions
+    """
+    inversion_count = 0
+    i, j, k = low, middle, low
+    while i < middle and j < high:
+        if source[j] < source[i]:
+            destination[k] = source[j]
+            inversion_count += middle - i
+            j += 1
+        else:
+            destination[k] = source[i]
+            i += 1
+        k += 1
+    destination[k:high] = source[i:middle] if i < middle else source[j:high]
+    return inversion_count
+
+
+def parallel_count(array, workers=None, threshold=PARALLEL_THRESHOLD):
+    """Counts inversions in separate processes. Array is split into per-worker chunks which are sorted and counted in
+    parallel, then cross-chunk inversions are counted on sorted chunks without merging them
+
+    Args:
+        array: list object which inversions should be counted
+        workers (int, optional): number of worker processes. Defaults to number of CPUs
+        threshold (int, optional): arrays shorter than that are counted serially. Defaults to PARALLEL_THRESHOLD
+
+    Returns:
+        int: number of inversions
+    """
+    workers = workers or os.cpu_count() or 1
+    array_length = len(array)
+    if array_length < max(threshold, 2) or workers == 1:
+        return count(array)
+    chunks_count = min(workers, array_length)
+    bounds = [array_length * index // chunks_count for index in range(chunks_count + 1)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(sort_and_count_bottom_up,
+                                    [array[bounds[index]:bounds[index + 1]] for index in range(chunks_count)]))
+    runs = [run for run, _ in results]
+    return sum(run_inversion_count for _, run_inversion_count in results) + count_split_inversions(runs)
+
+
+def count_split_inversions(runs):
+    """Counts inversions between items of different sorted runs without merging them. Every item is located in each
+    preceding run with binary search starting where the previous item of its run was found
+
+    Args:
+        runs: list of sorted runs in original order of chunks they were sorted from
+
+    Returns:
+        int: number of inversions whose items belong to different runs
+    """
+    inversion_count = 0
+    for index, run in enumerate(runs):
+        for preceding_run in runs[:index]:
+            preceding_length = len(preceding_run)
+            position = 0
+            for item in run:
+                position = bisect_right(preceding_run, item, position)
+                if position == preceding_length:
+                    break  # rest of run is not less than any item of preceding run
+                inversion_count += preceding_length - position
+    return inversion_count
+
+
+class InversionCounter:
+    """Keeps number of inversions of a sequence values are appended to.
+    Seen values are stored in an order-statistics treap, so each append costs expected O(log(n))
+
+    Args:
+        values (iterable, optional): initial values. Defaults to empty sequence
+
+    Attributes:
+        root: treap root node
+        size: number of appended values
+        inversion_count: number of inversions among appended values
+    """
+
+    def __init__(self, values=()):
+        self.root = None
+        self.size = 0
+        self.inversion_count = 0
+        self.extend(values)
+
+    def __len__(self):
+        """Returns number of appended values
+
+        Returns:
+            int: number of appended values
+        """
+        return self.size
+
+    def append(self, value):
+        """Appends value to the sequence and updates inversion count
+
+        Args:
+            value: appended value
+        """
+        self.inversion_count += self.count_greater(value)
+        self.root = treap_insert(self.root, value)
+        self.size += 1
+
+    def extend(self, values):
+        """Appends batch of values to the sequence and updates inversion count
+
+        Args:
+            values: iterable of appended values
+        """
+        for value in values:
+            self.append(value)
+
+    def count_greater(self, value):
+        """Counts appended values greater than value
+
+        Args:
+            value: compared value
+
+        Returns:
+            int: number of appended values greater than value
+        """
+        greater_count = 0
+        node = self.root
+        while node is not None:
+            if value < node.value:
+                greater_count += 1 + (node.right.size if node.right else 0)
+                node = node.left
+            else:
+                node = node.right
+        return greater_count
+
+
+class TreapNode:
+    """Order-statistics treap node
+
+    Args:
+        value: node value
+
+    Attributes:
+        value: node value
+        priority: random heap priority
+        size: number of nodes in subtree
+        left: left child node
+        right: right child node
+    """
+    __slots__ = ('value', 'priority', 'size', 'left', 'right')
+
+    def __init__(self, value):
+        self.value = value
+        self.priority = random.random()
+        self.size = 1
+        self.left = None
+        self.right = None
+
+    def update_size(self):
+        """Recalculates subtree size from children sizes"""
+        self.size = 1 + (self.left.size if self.left else 0) + (self.right.size if self.right else 0)
+
+
+def treap_insert(node, value):
+    """Inserts value into treap. Equal values are inserted to the right
+
+    Args:
+        node: treap root node or None
+        value: inserted value
+
+    Returns:
+        TreapNode: new treap root node
+    """
+    if node is None:
+        return TreapNode(value)
+    node.size += 1
+    if value < node.value:
+        node.left = treap_insert(node.left, value)
+        if node.left.priority > node.priority:
+            child, node.left = node.left, node.left.right
+            node.update_size()
+            child.right = node
+            child.update_size()
+            return child
+    else:
+        node.right = treap_insert(node.right, value)
+        if node.right.priority > node.priority:
+            child, node.right = node.right, node.right.left
+            node.update_size()
+            child.left = node
+            child.update_size()
+            return child
+    return node
+
+
 if __name__ == "__main__":
     sorted_array, inversion_count = sort_and_count([6, 5, 4, 3, 2, 1])
     assert inversion_count == 15
 
     sorted_array, inversion_count = sort_and_count([1, 3, 5, 2, 4, 6])
     assert inversion_count == 3
+
+    sorted_array, inversion_count = sort_and_count([2, 2, 1, 1])
+    assert inversion_count == 4
+
+    # test count function and InversionCounter class against sort_and_count
+    for array in ([], [1], [2, 2, 1, 1], [random.randint(0, 50) for _ in range(1000)], list(range(500, 0, -1))):
+        inversion_count = sort_and_count(array)[1]
+        assert count(array) == inversion_count
+        assert InversionCounter(array).inversion_count == inversion_count
+
+    stream = [random.randint(0, 100) for _ in range(300)]
+    counter = InversionCounter()
+    for index, value in enumerate(stream):
+        counter.append(value)
+        assert counter.inversion_count == count(stream[:index + 1])
+    counter.extend(stream)
+    assert counter.inversion_count == count(stream + stream)
+    assert len(counter) == 600
+
+    # test parallel_count function
+    assert count_split_inversions([[2, 5, 7], [1, 5, 6], [0, 8]]) == 5 + 3 + 3
+    assert count_split_inversions([[1, 2], [2, 3]]) == 0
+    for array in ([], [1], [2, 2, 1, 1], [random.randint(0, 50) for _ in range(1001)]):
+        for workers in (1, 2, 3, 8):
+            assert parallel_count(array, workers=workers, threshold=0) == count(array)
+
+    # benchmark parallel_count scaling
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    permutation = random.sample(range(size), size)
+    for workers in (1, 2, 4, 8):
+        start_time = datetime.now()
+        parallel_count(permutation, workers=workers)
+        print('Parallel count of {} items permutation with {} workers:'.format(size, workers),
+              readable_time((datetime.now() - start_time).total_seconds()))
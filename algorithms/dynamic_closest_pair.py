@@ -0,0 +1,214 @@
+""" Dynamic closest pair of points which are inserted and removed one by one.
+Every point keeps a candidate neighbour found with nearest neighbour query of k-d tree SpatialIndex at the time it was
+inserted or its previous neighbour was removed. Candidate pairs are kept in a heap, pairs of removed points are dropped
+from heap top lazily. Closest pair is always among candidate pairs: of two closest points the one whose candidate was
+found later had the other one available then, so its candidate is not farther. Every candidate pair gets a serial
+number, so pairs of handles which SpatialIndex reused for new points are recognized as outdated
+Expected performance: O(lg(n)^2) amortized per insertion, O(lg(n)) amortized per removal times number of points which
+had removed point as a candidate, O(1) per closest pair query
+"""
+import random
+import sys
+from datetime import datetime
+from math import log
+from heapq import heapify, heappop, heappush
+from itertools import count
+
+from algorithms.closest_pair import Point, distance, find_closest_pair, closest_pair_brute_force
+from algorithms.spatial_index import SpatialIndex
+from utils.readable import readable_time
+
+
+class DynamicClosestPair:
+    """ Set of points which maintains its closest pair under insertions and removals
+
+    Usage:
+        pairs = DynamicClosestPair()
+        pairs.insert(Point(0, 0))
+        pairs.insert(Point(1, 1))
+        first_point, second_point = pairs.closest()
+
+    Args:
+        points (iterable, optional): initial points. Defaults to empty sequence
+
+    Attributes:
+        index: SpatialIndex of stored points
+        neighbours: candidate neighbour handle by point handle, None if point had no neighbour
+        owners: set of handles of points which have the point as candidate, by point handle
+        serials: serial number of current candidate pair by point handle
+        heap: (squared distance, serial, handle, neighbour handle) candidate pairs, some of them outdated
+    """
+
+    def __init__(self, points=()):
+        self.index = SpatialIndex()
+        self.neighbours = {}
+        self.owners = {}
+        self.serials = {}
+        self.heap = []
+        self.counter = count()
+        for point in points:
+            self.insert(point)
+
+    def __len__(self):
+        """Returns number of stored points
+
+        Returns:
+            int: number of stored points
+        """
+        return len(self.index)
+
+    def __iter__(self):
+        """Iterates through stored points
+
+        Returns:
+            Point: next stored point
+        """
+        return iter(self.index)
+
+    def insert(self, point):
+        """Adds point to the set
+
+        Args:
+            point (Point): added point
+
+        Returns:
+            int: handle of added point
+        """
+        handle = self.index.insert(point)
+        self.__find_neighbour(handle)
+        self.__drop_outdated()
+        return handle
+
+    def remove(self, point):
+        """Removes one point equal to point from the set
+        Raises ValueError if there is no such point
+
+        Args:
+            point (Point): removed point
+        """
+        for _, handle in self.index.within_handles(point, 0):
+            self.remove_handle(handle)
+            return
+        raise ValueError('{} is not in the set'.format(point))
+
+    def remove_handle(self, handle):
+        """Removes point with given handle from the set
+        Raises KeyError if handle is not stored
+
+        Args:
+            handle (int): handle of removed point
+        """
+        self.index.delete_handle(handle)
+        self.serials.pop(handle, None)
+        neighbour = self.neighbours.pop(handle)
+        if neighbour is not None:
+            self.owners[neighbour].discard(handle)
+        for owner in self.owners.pop(handle, ()):
+            self.__find_neighbour(owner)
+        self.__drop_outdated()
+
+    def closest(self):
+        """Returns closest pair of stored points
+        Raises ValueError if there are less than two points
+
+        Returns:
+            tuple: pair of closest points
+        """
+        if not self.heap:
+            raise ValueError('At least two points are required')
+        _, _, handle, neighbour = self.heap[0]
+        return self.index.points[handle], self.index.points[neighbour]
+
+    def __find_neighbour(self, handle):
+        """Finds candidate neighbour of stored point and adds their pair to the heap
+
+        Args:
+            handle (int): point handle
+        """
+        nearest = self.index.nearest_handles(self.index.points[handle], 1, exclude=handle)
+        if not nearest:
+            self.neighbours[handle] = None
+            self.serials.pop(handle, None)
+            return
+        squared_distance, neighbour = nearest[0]
+        serial = next(self.counter)
+        self.neighbours[handle] = neighbour
+        self.serials[handle] = serial
+        self.owners.setdefault(neighbour, set()).add(handle)
+        heappush(self.heap, (squared_distance, serial, handle, neighbour))
+
+    def __drop_outdated(self):
+        """Pops outdated pairs from heap top, compacts the heap if outdated pairs take most of it"""
+        if len(self.heap) > 2 * len(self.neighbours) + 16:
+            self.heap = [pair for pair in self.heap if self.serials.get(pair[2]) == pair[1]]
+            heapify(self.heap)
+        while self.heap and self.serials.get(self.heap[0][2]) != self.heap[0][1]:
+            heappop(self.heap)
+
+
+if __name__ == '__main__':
+    # randomized test of insertions and removals against closest_pair_brute_force
+    pairs = DynamicClosestPair()
+    points = []
+    for step in range(1000):
+        if points and random.random() < 0.4:
+            point = points.pop(random.randrange(len(points)))
+            pairs.remove(point)
+        else:
+            point = Point(random.randint(0, 300), random.randint(0, 300))
+            points.append(point)
+            pairs.insert(point)
+        assert len(pairs) == len(points)
+        if len(points) >= 2:
+            assert distance(*pairs.closest()) == distance(*closest_pair_brute_force(points))
+    assert distance(*DynamicClosestPair(points).closest()) == distance(*find_closest_pair(points))
+    try:
+        DynamicClosestPair([Point(0, 0)]).closest()
+        assert False
+    except ValueError:
+        pass
+    try:
+        DynamicClosestPair([Point(0, 0), Point(1, 1)]).remove(Point(2, 2))
+        assert False
+    except ValueError:
+        pass
+
+    # randomized sliding window test: stored state stays proportional to window size, not to number of arrivals
+    pairs = DynamicClosestPair()
+    window = []
+    for step in range(20000):
+        point = Point(step + random.random(), random.random())
+        window.append(point)
+        pairs.insert(point)
+        if len(window) > 100:
+            pairs.remove(window.pop(0))
+        if step % 1000 == 999:
+            assert distance(*pairs.closest()) == distance(*closest_pair_brute_force(window))
+        assert pairs.index.node_count <= 2 * len(pairs) + 1
+        assert len(pairs.index.points) <= 2 * len(pairs) + 1
+        assert len(pairs.heap) <= 2 * len(pairs) + 16
+    assert pairs.index.depth() <= 2 * log(pairs.index.node_count, 2) + 2
+
+    # benchmark stream of arrivals against recomputing find_closest_pair after every arrival
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    stream = [Point(random.random(), random.random()) for _ in range(size)]
+    start_time = datetime.now()
+    pairs = DynamicClosestPair()
+    for point in stream:
+        pairs.insert(point)
+        if len(pairs) > 1:
+            pairs.closest()
+    print('DynamicClosestPair insertions of {} points:'.format(size),
+          readable_time((datetime.now() - start_time).total_seconds()))
+    start_time = datetime.now()
+    for point in stream[:size // 2]:
+        pairs.remove(point)
+        pairs.closest()
+    print('DynamicClosestPair removals of {} points:'.format(size // 2),
+          readable_time((datetime.now() - start_time).total_seconds()))
+    recomputed_size = min(size, 1000)
+    start_time = datetime.now()
+    for arrived_count in range(2, recomputed_size + 1):
+        find_closest_pair(stream[:arrived_count])
+    print('find_closest_pair after every arrival of {} points:'.format(recomputed_size),
+          readable_time((datetime.now() - start_time).total_seconds()))
@@ -1,30 +1,203 @@
 """Merge sort algorithm implementation
-Basic idea is that input array is split into halves until base case is hit (array length equals 1) for all branches.
-Then all branches from bottom to top are merged to form sorted sub-arrays
+Basic idea is that input array is split into short runs, which are merged pairwise, level by level, from bottom
+to top to form sorted sub-arrays. Merges ping-pong between two buffers allocated once per sort
 Expected performance: O(nlog(n)),
-~ log(n) levels of recursion and ~ n operations done at each level
+~ log(n) levels of merging and ~ n operations done at each level, O(n) extra memory.
+Adaptive mode merges natural runs of the input instead, so presorted input is sorted in O(n)
 """
 
+import os
 import random
+import sys
+import tempfile
+import tracemalloc
+from array import array as typed_array
+from bisect import insort, bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import partial
+from heapq import heapify, heapreplace, heappop
+from multiprocessing import shared_memory
 from utils.readable import readable_time
 
+MIN_RUN = 64  # runs shorter than that are presorted with binary insertion before merging
+MIN_GALLOP = 7  # number of consecutive wins of one run after which merge switches to galloping
+PARALLEL_THRESHOLD = 100000  # inputs shorter than that are sorted serially by parallel_sort
+EXTERNAL_MEMORY_LIMIT = 64 * 1024 * 1024  # default memory budget of external_sort in bytes
+EXTERNAL_BUFFER_SIZE = 64 * 1024  # preferred read buffer size per run file, merge passes are sized to get it
 
-def sort(array):
-    """Sorts an array object using merge sort algorithm.
-    Splits array in two halves until base case is hit then merges them
+
+def sort(array, key=None, reverse=False, in_place=False, adaptive=False):
+    """Sorts an array object using bottom-up merge sort algorithm. Stable, key and reverse work same as in sorted()
 
     Args:
         array: list object that should be sorted
+        key (callable, optional): function extracting comparison key from each item. Defaults to None
+        reverse (bool, optional): if True items are sorted in descending order. Defaults to False
+        in_place (bool, optional): if True sorted result is written back to array. Defaults to False
+        adaptive (bool, optional): if True natural ascending and descending runs of array are merged instead of
+            fixed-width runs. Defaults to False
 
     Returns:
-        list: sorted list object
+        list: sorted list object. Same object as array if in_place is True
     """
-    array_length = len(array)
-    if array_length > 1:
-        return merge(sort(array[:(array_length // 2)]), sort(array[(array_length // 2):]))
+    if key is None and not reverse:
+        result = sort_buffer(array if in_place else list(array), adaptive)
     else:
+        items = list(array)
+        if reverse:
+            items.reverse()  # together with reversing the result keeps equal items in original order
+        if key is None:
+            result = sort_buffer(items, adaptive)
+        else:
+            decorated = sort_buffer([(key(item), index) for index, item in enumerate(items)], adaptive)
+            result = [items[index] for _, index in decorated]
+        if reverse:
+            result.reverse()
+    if in_place:
+        if result is not array:
+            array[:] = result
         return array
+    return result
+
+
+def sort_buffer(source, adaptive=False):
+    """Sorts list using bottom-up merge sort. Runs are merged ping-ponging between source and one preallocated
+    buffer, so no temporary lists are created per merge and no recursion is involved
+
+    Args:
+        source: list object that should be sorted. Its contents are overwritten
+        adaptive (bool, optional): if True merges natural runs, fixed-width runs otherwise. Defaults to False
+
+    Returns:
+        list: either source or the buffer, whichever holds sorted items
+    """
+    array_length = len(source)
+    if array_length < 2:
+        return source
+    if adaptive:
+        boundaries = find_runs(source)
+    else:
+        boundaries = list(range(0, array_length, MIN_RUN)) + [array_length]
+        for index in range(len(boundaries) - 1):
+            insertion_sort(source, boundaries[index], boundaries[index + 1])
+    if len(boundaries) == 2:
+        return source
+    destination = [None] * array_length
+    while len(boundaries) > 2:
+        merged_boundaries = [0]
+        runs_count = len(boundaries) - 1
+        for index in range(0, runs_count - 1, 2):
+            high = boundaries[index + 2]
+            merge_runs(source, destination, boundaries[index], boundaries[index + 1], high)
+            merged_boundaries.append(high)
+        if runs_count % 2:
+            low = boundaries[-2]
+            destination[low:] = source[low:]
+            merged_boundaries.append(array_length)
+        source, destination = destination, source
+        boundaries = merged_boundaries
+    return source
+
+
+def find_runs(array):
+    """Splits array into natural runs. Strictly descending runs are reversed in place, runs shorter than MIN_RUN are
+    extended with binary insertion
+
+    Args:
+        array: list object that should be split into runs
+
+    Returns:
+        list: run boundaries, starting with 0 and ending with array length. E.g. [0, 64, 200]
+    """
+    array_length = len(array)
+    boundaries = [0]
+    start = 0
+    while start < array_length:
+        end = start + 1
+        if end < array_length and array[end] < array[start]:
+            while end < array_length and array[end] < array[end - 1]:
+                end += 1
+            array[start:end] = array[start:end][::-1]
+        else:
+            while end < array_length and not array[end] < array[end - 1]:
+                end += 1
+        if end - start < MIN_RUN:
+            end = min(start + MIN_RUN, array_length)
+            insertion_sort(array, start, end)
+        boundaries.append(end)
+        start = end
+    return boundaries
+
+
+def insertion_sort(array, low, high):
+    """Sorts array[low:high] in place using binary insertion. Stable
+
+    Args:
+        array: list object containing sorted range
+        low: range start index
+        high: range end index
+    """
+    run = []
+    for item in array[low:high]:
+        insort(run, item)
+    array[low:high] = run
+
+
+def merge_runs(source, destination, low, middle, high):
+    """Merges two adjacent sorted runs source[low:middle] and source[middle:high] into destination[low:high].
+    Equal elements are taken from the first run first, so merge is stable. After MIN_GALLOP consecutive wins of
+    one run the rest of its winning items is found with binary search and copied at once
+
+    Args:
+        source: buffer containing both runs
+        destination: buffer merged run is written to
+        low: first run start index
+        middle: first run end index, second run start index
+        high: second run end index
+    """
+    if middle >= high or not source[middle] < source[middle - 1]:
+        destination[low:high] = source[low:high]  # runs are already in order
+        return
+    i, j, k = low, middle, low
+    first, second = source[i], source[j]
+    first_wins = second_wins = 0
+    while True:
+        if second < first:
+            destination[k] = second
+            k += 1
+            j += 1
+            if j == high:
+                break
+            second_wins += 1
+            first_wins = 0
+            if second_wins >= MIN_GALLOP:
+                gallop_end = bisect_left(source, first, j, high)
+                destination[k:k + gallop_end - j] = source[j:gallop_end]
+                k += gallop_end - j
+                j = gallop_end
+                second_wins = 0
+                if j == high:
+                    break
+            second = source[j]
+        else:
+            destination[k] = first
+            k += 1
+            i += 1
+            if i == middle:
+                break
+            first_wins += 1
+            second_wins = 0
+            if first_wins >= MIN_GALLOP:
+                gallop_end = bisect_right(source, second, i, middle)
+                destination[k:k + gallop_end - i] = source[i:gallop_end]
+                k += gallop_end - i
+                i = gallop_end
+                first_wins = 0
+                if i == middle:
+                    break
+            first = source[i]
+    destination[k:high] = source[i:middle] if i < middle else source[j:high]
 
 
 def merge(first_array, second_array):
@@ -38,69 +211,388 @@ def merge(first_array, second_array):
     Returns:
         list: sorted array containing elements from merged arrays
     """
-    result_array = []
-    i = j = 0
-    while i < len(first_array) or j < len(second_array):
-        if i == len(first_array):
-            result_array += second_array[j:]
+    first_length, second_length = len(first_array), len(second_array)
+    result_array = [None] * (first_length + second_length)
+    i = j = k = 0
+    while i < first_length and j < second_length:
+        if second_array[j] < first_array[i]:
+            result_array[k] = second_array[j]
+            j += 1
+        else:
+            result_array[k] = first_array[i]
+            i += 1
+        k += 1
+    result_array[k:] = first_array[i:] if i < first_length else second_array[j:]
+    return result_array
+
+
+def merge_many(arrays, key=None):
+    """Merges any number of sorted arrays into one sorted list. Equal items are taken from earlier arrays first
+
+    Args:
+        arrays: list of sorted arrays
+        key (callable, optional): function extracting comparison key from each item. Defaults to None
+
+    Returns:
+        list: sorted list containing items from all arrays
+    """
+    if len(arrays) == 2 and key is None:
+        return merge(arrays[0], arrays[1])
+    return list(iter_merge(arrays, key))
+
+
+def iter_merge(iterables, key=None):
+    """Lazily merges sorted iterables using k-way heap merge. Equal items are yielded from earlier iterables first
+
+    Args:
+        iterables: list of sorted iterables
+        key (callable, optional): function extracting comparison key from each item. Defaults to None
+
+    Yields:
+        Any: next item in sorted order
+    """
+    heap = []
+    for order, iterable in enumerate(iterables):
+        iterator = iter(iterable)
+        for item in iterator:
+            heap.append([item if key is None else key(item), order, item, iterator])
             break
-        elif j == len(second_array):
-            result_array += first_array[i:]
+    heapify(heap)
+    while heap:
+        entry = heap[0]
+        yield entry[2]
+        for item in entry[3]:
+            entry[0] = item if key is None else key(item)
+            entry[2] = item
+            heapreplace(heap, entry)
             break
-        elif first_array[i] < second_array[j]:
-            result_array.append(first_array[i])
-            i += 1
         else:
-            result_array.append(second_array[j])
-            j += 1
-    return result_array
+            heappop(heap)
+
+
+def chunk_bounds(array_length, chunks_count):
+    """Splits range of array indexes into nearly equal chunks
+
+    Args:
+        array_length: length of split array
+        chunks_count: number of chunks
+
+    Returns:
+        list: (low, high) index pairs. E.g. [(0, 3), (3, 5)]
+    """
+    chunks_count = max(1, min(chunks_count, array_length))
+    return [(array_length * index // chunks_count, array_length * (index + 1) // chunks_count)
+            for index in range(chunks_count)]
+
+
+def parallel_sort(array, workers=None, threshold=PARALLEL_THRESHOLD):
+    """Sorts an array object splitting it into chunks which are sorted in separate processes and merged with k-way
+    heap merge. array.array inputs are handed to workers through shared memory instead of pickling
+
+    Args:
+        array: list or array.array object that should be sorted
+        workers (int, optional): number of worker processes. Defaults to number of CPUs
+        threshold (int, optional): arrays shorter than that are sorted serially. Defaults to PARALLEL_THRESHOLD
+
+    Returns:
+        list: sorted list object, or array.array of the same type code if array is array.array
+    """
+    workers = workers or os.cpu_count() or 1
+    is_typed = isinstance(array, typed_array)
+    if len(array) < max(threshold, 2) or workers == 1:
+        result = sort(array)
+        return typed_array(array.typecode, result) if is_typed else result
+    bounds = chunk_bounds(len(array), workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        if not is_typed:
+            return merge_many(list(executor.map(sort, [array[low:high] for low, high in bounds])))
+        memory = shared_memory.SharedMemory(create=True, size=len(array) * array.itemsize)
+        view = memory.buf.cast(array.typecode)
+        try:
+            view[:] = array
+            futures = [executor.submit(sort_shared_chunk, memory.name, array.typecode, low, high)
+                       for low, high in bounds]
+            for future in futures:
+                future.result()
+            return typed_array(array.typecode, merge_many([view[low:high].tolist() for low, high in bounds]))
+        finally:
+            view.release()
+            memory.close()
+            memory.unlink()
+
+
+def sort_shared_chunk(memory_name, typecode, low, high):
+    """Sorts a chunk of typed array located in shared memory in place. Runs in parallel_sort worker processes
+
+    Args:
+        memory_name: name of shared memory block
+        typecode: array.array type code of items stored in shared memory
+        low: chunk start index
+        high: chunk end index
+    """
+    memory = shared_memory.SharedMemory(name=memory_name)
+    view = memory.buf.cast(typecode)
+    try:
+        view[low:high] = typed_array(typecode, sort(view[low:high].tolist(), in_place=True))
+    finally:
+        view.release()
+        memory.close()
+
+
+def external_sort(input_path, output_path, memory_limit=EXTERNAL_MEMORY_LIMIT, key=None, record_size=None,
+                  callback=None, temp_dir=None):
+    """Sorts records of a file that doesn't fit into memory. Chunks of records that fit memory budget are sorted and
+    spilled to temporary run files, which are then merged with buffered k-way heap merge. If there are more runs than
+    can be merged within budget, runs are merged in several passes
+
+    Args:
+        input_path: path to file containing records
+        output_path: path sorted records are written to
+        memory_limit (int, optional): approximate memory budget in bytes. Defaults to EXTERNAL_MEMORY_LIMIT
+        key (callable, optional): function extracting comparison key from record bytes. Defaults to None
+        record_size (int, optional): size of fixed-width binary records in bytes. If None, records are newline
+            delimited lines, last line gets newline appended if missing. Defaults to None
+        callback (callable, optional): called with every block of bytes written to output, e.g. FTPTracker.handle.
+            Defaults to None
+        temp_dir (str, optional): directory for temporary run files. Defaults to system temporary directory
+    """
+    fan_in = max(2, memory_limit // EXTERNAL_BUFFER_SIZE - 1)
+    runs, merged_runs = [], []
+    try:
+        with open(input_path, 'rb', buffering=max(1, min(EXTERNAL_BUFFER_SIZE, memory_limit // 4))) as input_file:
+            for chunk in read_chunks(input_file, memory_limit // 2, record_size):  # half is left for sort buffers
+                runs.append(write_run(sort(chunk, key=key, in_place=True), temp_dir))
+        while len(runs) > fan_in:
+            merged_runs = []
+            for index in range(0, len(runs), fan_in):
+                run_path = write_run([], temp_dir)
+                merge_files(runs[index:index + fan_in], run_path, memory_limit, key, record_size)
+                merged_runs.append(run_path)
+                for merged_run_path in runs[index:index + fan_in]:
+                    os.remove(merged_run_path)
+            runs = merged_runs
+        merge_files(runs, output_path, memory_limit, key, record_size, callback)
+    finally:
+        for run_path in runs + merged_runs:
+            if os.path.exists(run_path):
+                os.remove(run_path)
+
+
+def read_chunks(file, chunk_limit, record_size=None):
+    """Reads records from file in chunks which approximately fit into memory limit
+
+    Args:
+        file: binary file object
+        chunk_limit: approximate memory limit of each chunk in bytes
+        record_size (int, optional): size of fixed-width records, newline delimited records if None. Defaults to None
+
+    Yields:
+        list: next chunk of records
+    """
+    chunk = []
+    chunk_size = 0
+    for record in read_records(file, record_size):
+        chunk.append(record)
+        chunk_size += sys.getsizeof(record) + 16  # list slot in chunk and in sort buffer
+        if chunk_size >= chunk_limit:
+            yield chunk
+            chunk = []
+            chunk_size = 0
+    if chunk:
+        yield chunk
+
+
+def read_records(file, record_size=None):
+    """Iterates over records of a binary file
+
+    Args:
+        file: binary file object
+        record_size (int, optional): size of fixed-width records, newline delimited records if None. Defaults to None
+
+    Yields:
+        bytes: next record
+    """
+    if record_size is not None:
+        for record in iter(partial(file.read, record_size), b''):
+            if len(record) != record_size:
+                raise ValueError('Truncated record of {} bytes at the end of file, expected {} bytes'.format(
+                    len(record), record_size))
+            yield record
+    else:
+        for line in file:
+            yield line if line.endswith(b'\n') else line + b'\n'
+
+
+def write_run(records, temp_dir=None):
+    """Writes records to a new temporary run file
+
+    Args:
+        records: list of records bytes
+        temp_dir (str, optional): directory for temporary file. Defaults to system temporary directory
+
+    Returns:
+        str: path to run file
+    """
+    descriptor, run_path = tempfile.mkstemp(suffix='.run', dir=temp_dir)
+    with open(descriptor, 'wb', buffering=EXTERNAL_BUFFER_SIZE) as run_file:
+        run_file.writelines(records)
+    return run_path
+
+
+def merge_files(input_paths, output_path, memory_limit, key=None, record_size=None, callback=None):
+    """Merges sorted record files into one sorted file using buffered reads and writes
+
+    Args:
+        input_paths: paths to sorted record files
+        output_path: path merged records are written to
+        memory_limit: memory budget in bytes, split evenly between read buffers and write buffer
+        key (callable, optional): function extracting comparison key from record bytes. Defaults to None
+        record_size (int, optional): size of fixed-width records, newline delimited records if None. Defaults to None
+        callback (callable, optional): called with every block of bytes written to output. Defaults to None
+    """
+    buffer_size = max(1, memory_limit // (len(input_paths) + 1))
+    input_files = [open(input_path, 'rb', buffering=buffer_size) for input_path in input_paths]
+    try:
+        with open(output_path, 'wb') as output_file:
+            block = []
+            block_size = 0
+            for record in iter_merge([read_records(file, record_size) for file in input_files], key):
+                block.append(record)
+                block_size += len(record)
+                if block_size >= buffer_size:
+                    write_block(output_file, block, callback)
+                    block = []
+                    block_size = 0
+            if block:
+                write_block(output_file, block, callback)
+    finally:
+        for file in input_files:
+            file.close()
+
+
+def write_block(file, records, callback=None):
+    """Writes records to file as one block
+
+    Args:
+        file: binary file object
+        records: list of records bytes
+        callback (callable, optional): called with written block of bytes. Defaults to None
+    """
+    block = b''.join(records)
+    file.write(block)
+    if callback:
+        callback(block)
+
 
 if __name__ == '__main__':
 
-    # test sorted 1 000 000 items list
-    sorted_list = list(range(0, 1000000))
-    start_time = datetime.now()
-    sort(sorted_list)
-    print('Sorted 1 000 000 items list:', readable_time((datetime.now() - start_time).total_seconds()))
-
-    # test reversed 1 000 000 items list
-    reversed_list = list(range(1000000, 0, -1))
-    start_time = datetime.now()
-    sort(reversed_list)
-    print('Reversed 1 000 000 items list:', readable_time((datetime.now() - start_time).total_seconds()))
-
-    # test shuffled 1 000 000 items list
-    random.shuffle(sorted_list)
-    shuffled_list = sorted_list
-    start_time = datetime.now()
-    sort(shuffled_list)
-    print('Shuffled 1 000 000 items list:', readable_time((datetime.now() - start_time).total_seconds()))
-
-    # test random 1 000 000 items list in range from -500 000 to 499 999
-    random_list = random.sample(range(-500000, 500000), 1000000)
-    start_time = datetime.now()
-    sort(random_list)
-    print('Random 1 000 000 items list in range from -500 000 to 499 999:',
-          readable_time((datetime.now() - start_time).total_seconds()))
-
-    # test sorted 1 000 000 items list in range from -500 000 to 499 999
-    sorted_random_list = sorted(random.sample(range(-500000, 500000), 1000000))
-    start_time = datetime.now()
-    sort(sorted_random_list)
-    print('Sorted random 1 000 000 items list in range from -500 000 to 499 999:',
-          readable_time((datetime.now() - start_time).total_seconds()))
-
-    # test reversed 1 000 000 items list in range from -500 000 to 499 999
-    reversed_random_list = list(reversed(random.sample(range(-500000, 500000), 1000000)))
-    start_time = datetime.now()
-    sort(reversed_random_list)
-    print('Reversed random 1 000 000 items list in range from -500 000 to 499 999:',
-          readable_time((datetime.now() - start_time).total_seconds()))
-
-    # test list containing one item repeated 1 000 000 times
+    # test sort and merge functions
+    assert sort([]) == []
+    assert sort([1]) == [1]
+    assert sort([3, 1, 2]) == [1, 2, 3]
+    assert sort([5, 4, 3, 2, 1, 0]) == [0, 1, 2, 3, 4, 5]
+    assert merge([1, 3, 5], [2, 4]) == [1, 2, 3, 4, 5]
+    assert merge([], [1]) == [1]
+
+    unsorted_list = [random.randint(-100, 100) for _ in range(1001)]
+    assert sort(unsorted_list) == sorted(unsorted_list)
+    in_place_list = list(unsorted_list)
+    assert sort(in_place_list, in_place=True) is in_place_list
+    assert in_place_list == sorted(unsorted_list)
+
+    # test key, reverse and adaptive arguments
+    records = [(random.randint(0, 10), index) for index in range(1001)]
+    for adaptive in (False, True):
+        assert sort(unsorted_list, adaptive=adaptive) == sorted(unsorted_list)
+        assert sort(records, key=lambda record: record[0], adaptive=adaptive) == \
+            sorted(records, key=lambda record: record[0])
+        assert sort(records, key=lambda record: record[0], reverse=True, adaptive=adaptive) == \
+            sorted(records, key=lambda record: record[0], reverse=True)
+        assert sort(unsorted_list, reverse=True, adaptive=adaptive) == sorted(unsorted_list, reverse=True)
+    assert find_runs([1, 2, 3] + [3, 2, 1] * 30) == [0, 64, 93]
+    mostly_sorted_list = list(range(1000)) + list(range(1000, 500, -1)) + list(range(2000, 3000))
+    assert sort(mostly_sorted_list, adaptive=True) == sorted(mostly_sorted_list)
+
+    # test merge_many and parallel_sort functions
+    assert merge_many([[1, 4], [2, 5], [0, 3, 6]]) == [0, 1, 2, 3, 4, 5, 6]
+    assert merge_many([[(1, 'a')], [(1, 'b')]], key=lambda pair: pair[0]) == [(1, 'a'), (1, 'b')]
+    assert merge_many([[], [1], []]) == [1]
+    assert parallel_sort(unsorted_list, workers=3, threshold=0) == sorted(unsorted_list)
+    typed_list = typed_array('q', unsorted_list)
+    assert parallel_sort(typed_list, workers=3, threshold=0) == typed_array('q', sorted(unsorted_list))
+    assert parallel_sort(typed_array('d', [2.5, 1.5]), workers=2, threshold=0) == typed_array('d', [1.5, 2.5])
+    assert parallel_sort(typed_array('q'), workers=2, threshold=0) == typed_array('q')
+    assert parallel_sort(typed_array('q', [7]), workers=2, threshold=0) == typed_array('q', [7])
+    assert parallel_sort([], workers=2, threshold=0) == []
+
+    # test external_sort function
+    with tempfile.TemporaryDirectory() as directory:
+        input_path = os.path.join(directory, 'input')
+        output_path = os.path.join(directory, 'output')
+        lines = [str(random.randint(0, 1000)).encode() + b'\n' for _ in range(5000)]
+        with open(input_path, 'wb') as file:
+            file.writelines(lines)
+            file.write(b'1001')
+        lines.append(b'1001\n')
+        external_sort(input_path, output_path, memory_limit=4096)
+        with open(output_path, 'rb') as file:
+            assert file.read() == b''.join(sorted(lines))
+        written_blocks = []
+        external_sort(input_path, output_path, memory_limit=4096, key=int, callback=written_blocks.append)
+        with open(output_path, 'rb') as file:
+            assert file.read() == b''.join(sorted(lines, key=int)) == b''.join(written_blocks)
+
+        records = [random.randint(0, 1000).to_bytes(4, 'little') + b'data' for _ in range(5000)]
+        with open(input_path, 'wb') as file:
+            file.writelines(records)
+        external_sort(input_path, output_path, memory_limit=4096, record_size=8,
+                      key=lambda record: int.from_bytes(record[:4], 'little'))
+        with open(output_path, 'rb') as file:
+            assert file.read() == b''.join(sorted(records, key=lambda record: int.from_bytes(record[:4], 'little')))
+        with open(input_path, 'ab') as file:
+            file.write(b'tail')
+        try:
+            external_sort(input_path, output_path, memory_limit=4096, record_size=8)
+            assert False
+        except ValueError:
+            pass
+
+        # test merge read buffers are sized from memory limit
+        run_paths = [write_run([b'%05d\n' % number for number in range(index, 2000, 64)], directory)
+                     for index in range(64)]
+        tracemalloc.start()
+        merge_files(run_paths, output_path, 64 * 1024)
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert peak_memory < 1024 * 1024
+        with open(output_path, 'rb') as file:
+            assert file.read() == b''.join(b'%05d\n' % number for number in range(2000))
+
     random_item = random.randint(-500000, 499999)
-    repeated_list = [random_item] * 1000000
-    start_time = datetime.now()
-    sort(repeated_list)
-    print('List containing one item repeated 1 000 000 times:',
-          readable_time((datetime.now() - start_time).total_seconds()))
+    workloads = (
+        ('Sorted 1 000 000 items list', list(range(0, 1000000))),
+        ('Reversed 1 000 000 items list', list(range(1000000, 0, -1))),
+        ('Shuffled 1 000 000 items list', random.sample(range(0, 1000000), 1000000)),
+        ('Random 1 000 000 items list in range from -500 000 to 499 999',
+         random.sample(range(-500000, 500000), 1000000)),
+        ('Sorted random 1 000 000 items list in range from -500 000 to 499 999',
+         sorted(random.sample(range(-500000, 500000), 1000000))),
+        ('Reversed random 1 000 000 items list in range from -500 000 to 499 999',
+         sorted(random.sample(range(-500000, 500000), 1000000), reverse=True)),
+        ('List containing one item repeated 1 000 000 times', [random_item] * 1000000),
+    )
+    for description, workload in workloads:
+        for adaptive in (False, True):
+            start_time = datetime.now()
+            sort(workload, adaptive=adaptive)
+            print(description + (' (adaptive):' if adaptive else ':'),
+                  readable_time((datetime.now() - start_time).total_seconds()))
+
+    # benchmark parallel_sort scaling
+    random_list = random.sample(range(-500000, 500000), 1000000)
+    for workers in (1, 2, 4, 8):
+        for workload in (random_list, typed_array('q', random_list)):
+            start_time = datetime.now()
+            parallel_sort(workload, workers=workers)
+            print('Parallel sort of random 1 000 000 items {} with {} workers:'.format(
+                type(workload).__name__, workers), readable_time((datetime.now() - start_time).total_seconds()))
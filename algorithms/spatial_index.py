@@ -0,0 +1,465 @@
+""" Spatial index of points. Answers repeated closest pair, nearest neighbours and radius queries over one point set.
+Nearest neighbours and radius queries walk a k-d tree: points are split by median of alternating coordinates,
+subtrees which can't contain closer points than already found are skipped. Expected performance: O(lg(n)) per query.
+Insertions hang new nodes under leaves, a subtree which gets too unbalanced is rebuilt by median like in a scapegoat
+tree, so depth stays O(lg(n)) and insertions take O(lg(n)^2) amortized time. Deletions leave tombstones, whole tree is
+rebuilt when tombstones outnumber stored points, so tree size stays proportional to number of stored points
+Closest pair is found with randomized grid hashing: points are added to a grid of cells of current closest distance
+in random order, each new point is compared to points of neighbouring cells only, grid is rebuilt when closer pair is
+found. Expected performance: O(n)
+"""
+import random
+from heapq import heappush, heappushpop
+from math import floor, inf, log, sqrt
+
+from algorithms.closest_pair import Point, distance, squared_distance, find_closest_pair, closest_pair_brute_force
+
+BALANCE = 0.7  # largest allowed share of child subtree in its parent subtree
+
+
+class SpatialIndex:
+    """ Index of points supporting bulk build, insertion and deletion.
+    Each stored point gets integer handle, deleted points leave a tombstone in k-d tree until their subtree is rebuilt.
+    Handles of deleted points are reused by later insertions once their tombstones are dropped
+
+    Args:
+        points (iterable, optional): initial points. Defaults to empty sequence
+
+    Attributes:
+        points: list of stored points by handle, None for deleted handles
+        root: k-d tree root node
+        size: number of stored points
+        node_count: number of k-d tree nodes, including tombstones
+        free: handles which are not stored in k-d tree and can be reused
+    """
+
+    def __init__(self, points=()):
+        self.points = list(points)
+        self.size = len(self.points)
+        self.root = None
+        self.node_count = 0
+        self.free = []
+        self.rebuild()
+
+    def __len__(self):
+        """Returns number of stored points
+
+        Returns:
+            int: number of stored points
+        """
+        return self.size
+
+    def __iter__(self):
+        """Iterates through stored points
+
+        Returns:
+            Point: next stored point
+        """
+        for point in self.points:
+            if point is not None:
+                yield point
+
+    def rebuild(self):
+        """Rebuilds balanced k-d tree from stored points dropping tombstones"""
+        while self.points and self.points[-1] is None:
+            self.points.pop()
+        handles = [handle for handle, point in enumerate(self.points) if point is not None]
+        self.free = [handle for handle, point in enumerate(self.points) if point is None]
+        self.root = self.__build(handles, 0)
+        self.node_count = len(handles)
+
+    def depth(self):
+        """Returns k-d tree depth
+
+        Returns:
+            int: number of nodes on the longest root to leaf path, 0 for empty tree
+        """
+        depth = 0
+        stack = [(self.root, 1)] if self.root else []
+        while stack:
+            node, node_depth = stack.pop()
+            depth = max(depth, node_depth)
+            stack.extend((child, node_depth + 1) for child in (node.left, node.right) if child is not None)
+        return depth
+
+    def insert(self, point):
+        """Adds point to the index
+
+        Args:
+            point (Point): added point
+
+        Returns:
+            int: handle of added point
+        """
+        if self.free:
+            handle = self.free.pop()
+            self.points[handle] = point
+        else:
+            handle = len(self.points)
+            self.points.append(point)
+        self.size += 1
+        self.node_count += 1
+        new_node = KDNode(handle, point, 0)
+        if self.root is None:
+            self.root = new_node
+            return handle
+        path = []
+        node = self.root
+        while True:
+            path.append(node)
+            node.count += 1
+            if (point.x < node.x) if node.axis == 0 else (point.y < node.y):
+                if node.left is None:
+                    node.left = new_node
+                    break
+                node = node.left
+            else:
+                if node.right is None:
+                    node.right = new_node
+                    break
+                node = node.right
+        new_node.axis = 1 - node.axis
+        if len(path) > log(self.node_count) / log(1 / BALANCE):
+            self.__rebalance(path, new_node)
+        return handle
+
+    def delete(self, point):
+        """Removes one point equal to point from the index
+        Raises ValueError if there is no such point
+
+        Args:
+            point (Point): removed point
+        """
+        for _, handle in self.within_handles(point, 0):
+            self.delete_handle(handle)
+            return
+        raise ValueError('{} is not in the index'.format(point))
+
+    def delete_handle(self, handle):
+        """Removes point with given handle from the index
+        Raises KeyError if handle is not stored
+
+        Args:
+            handle (int): handle of removed point
+        """
+        if handle >= len(self.points) or self.points[handle] is None:
+            raise KeyError(handle)
+        self.points[handle] = None
+        self.size -= 1
+        if self.node_count - self.size > self.size:
+            self.rebuild()
+
+    def nearest(self, point, k=1):
+        """Finds k stored points nearest to point
+
+        Args:
+            point (Point): query point
+            k (int, optional): number of neighbours. Defaults to 1
+
+        Returns:
+            list: up to k nearest points, nearest first
+        """
+        return [self.points[handle] for _, handle in self.nearest_handles(point, k)]
+
+    def nearest_handles(self, point, k=1, exclude=None):
+        """Finds handles of k stored points nearest to point
+
+        Args:
+            point (Point): query point
+            k (int, optional): number of neighbours. Defaults to 1
+            exclude (int, optional): handle which is skipped, e.g. handle of query point itself. Defaults to None
+
+        Returns:
+            list: up to k (squared distance, handle) tuples, nearest first
+        """
+        heap = []  # max-heap of k best as (-squared distance, -handle)
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if isinstance(node, tuple):  # deferred far subtree with its squared distance to splitting line
+                line_squared_distance, node = node
+                if len(heap) == k and line_squared_distance > -heap[0][0]:
+                    continue
+            stored_point = self.points[node.handle]
+            if stored_point is not None and node.handle != exclude:
+                entry = (-squared_distance(point, stored_point), -node.handle)
+                if len(heap) < k:
+                    heappush(heap, entry)
+                elif entry > heap[0]:
+                    heappushpop(heap, entry)
+            line_difference = (point.x - node.x) if node.axis == 0 else (point.y - node.y)
+            near, far = (node.left, node.right) if line_difference < 0 else (node.right, node.left)
+            if far is not None:
+                stack.append((line_difference * line_difference, far))
+            stack.append(near)
+        return sorted((-negative_distance, -negative_handle) for negative_distance, negative_handle in heap)
+
+    def within(self, point, radius):
+        """Finds stored points not farther than radius from point
+
+        Args:
+            point (Point): query point
+            radius: search radius
+
+        Returns:
+            list: points within radius
+        """
+        return [self.points[handle] for _, handle in self.within_handles(point, radius)]
+
+    def within_handles(self, point, radius):
+        """Finds handles of stored points not farther than radius from point
+
+        Args:
+            point (Point): query point
+            radius: search radius
+
+        Returns:
+            list: (squared distance, handle) tuples of points within radius
+        """
+        squared_radius = radius * radius
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            stored_point = self.points[node.handle]
+            if stored_point is not None:
+                point_squared_distance = squared_distance(point, stored_point)
+                if point_squared_distance <= squared_radius:
+                    found.append((point_squared_distance, node.handle))
+            line_difference = (point.x - node.x) if node.axis == 0 else (point.y - node.y)
+            if node.left is not None and line_difference <= radius:
+                stack.append(node.left)
+            if node.right is not None and line_difference >= -radius:
+                stack.append(node.right)
+        return found
+
+    def closest_pair(self):
+        """Finds closest pair of stored points using randomized grid hashing
+        Raises ValueError if there are less than two points
+
+        Returns:
+            tuple: pair of closest points
+        """
+        handles = [handle for handle, point in enumerate(self.points) if point is not None]
+        if len(handles) < 2:
+            raise ValueError('At least two points are required')
+        random.shuffle(handles)
+        points = self.points
+        best_pair = (points[handles[0]], points[handles[1]])
+        best_distance = squared_distance(*best_pair)
+        if best_distance == 0:
+            return best_pair
+        cell_size = sqrt(best_distance)
+        grid = build_grid(points, handles[:2], cell_size)
+        for index in range(2, len(handles)):
+            point = points[handles[index]]
+            cell_x, cell_y = floor(point.x / cell_size), floor(point.y / cell_size)
+            closest_distance, closest_point = inf, None
+            for neighbour_x in (cell_x - 1, cell_x, cell_x + 1):
+                for neighbour_y in (cell_y - 1, cell_y, cell_y + 1):
+                    for handle in grid.get((neighbour_x, neighbour_y), ()):
+                        point_squared_distance = squared_distance(point, points[handle])
+                        if point_squared_distance < closest_distance:
+                            closest_distance, closest_point = point_squared_distance, points[handle]
+            if closest_distance < best_distance:
+                best_distance, best_pair = closest_distance, (closest_point, point)
+                if best_distance == 0:
+                    break
+                cell_size = sqrt(best_distance)
+                grid = build_grid(points, handles[:index + 1], cell_size)
+            else:
+                grid.setdefault((cell_x, cell_y), []).append(handles[index])
+        return best_pair
+
+    def pairs_within(self, radius):
+        """Finds all pairs of stored points not farther than radius from each other
+        Raises ValueError if radius is not positive
+
+        Args:
+            radius: search radius
+
+        Returns:
+            list: pairs of points
+        """
+        if radius <= 0:
+            raise ValueError('radius must be positive')
+        handles = [handle for handle, point in enumerate(self.points) if point is not None]
+        grid = build_grid(self.points, handles, radius)
+        squared_radius = radius * radius
+        pairs = []
+        for (cell_x, cell_y), cell_handles in grid.items():
+            for neighbour_x, neighbour_y in ((cell_x, cell_y), (cell_x + 1, cell_y - 1), (cell_x + 1, cell_y),
+                                             (cell_x + 1, cell_y + 1), (cell_x, cell_y + 1)):
+                neighbour_handles = grid.get((neighbour_x, neighbour_y), ())
+                same_cell = neighbour_x == cell_x and neighbour_y == cell_y
+                for first_index, first_handle in enumerate(cell_handles):
+                    first_point = self.points[first_handle]
+                    for second_handle in neighbour_handles[first_index + 1:] if same_cell else neighbour_handles:
+                        if squared_distance(first_point, self.points[second_handle]) <= squared_radius:
+                            pairs.append((first_point, self.points[second_handle]))
+        return pairs
+
+    def __rebalance(self, path, new_node):
+        """Rebuilds the highest unbalanced subtree on the path to new node
+
+        Args:
+            path: nodes from root to new node parent
+            new_node: inserted node
+        """
+        child = new_node
+        for index in range(len(path) - 1, -1, -1):
+            if child.count > BALANCE * path[index].count:
+                scapegoat = path[index]
+                break
+            child = path[index]
+        else:
+            return
+        handles = []
+        stack = [scapegoat]
+        while stack:
+            node = stack.pop()
+            if self.points[node.handle] is None:
+                self.free.append(node.handle)
+            else:
+                handles.append(node.handle)
+            stack.extend(child for child in (node.left, node.right) if child is not None)
+        subtree = self.__build(handles, scapegoat.axis)
+        dropped_count = scapegoat.count - len(handles)
+        self.node_count -= dropped_count
+        for node in path[:index]:
+            node.count -= dropped_count
+        if index == 0:
+            self.root = subtree
+        elif path[index - 1].left is scapegoat:
+            path[index - 1].left = subtree
+        else:
+            path[index - 1].right = subtree
+
+    def __build(self, handles, axis):
+        """Builds balanced k-d tree splitting points by median
+
+        Args:
+            handles: list of point handles
+            axis: 0 to split by x, 1 to split by y
+
+        Returns:
+            KDNode: subtree root node
+        """
+        if not handles:
+            return None
+        points = self.points
+        handles.sort(key=(lambda handle: points[handle].x) if axis == 0 else (lambda handle: points[handle].y))
+        middle = len(handles) // 2
+        node = KDNode(handles[middle], self.points[handles[middle]], axis)
+        node.left = self.__build(handles[:middle], 1 - axis)
+        node.right = self.__build(handles[middle + 1:], 1 - axis)
+        node.count = len(handles)
+        return node
+
+
+class KDNode:
+    """ K-d tree node
+
+    Args:
+        handle: handle of point stored in node
+        point: point stored in node
+        axis: 0 if node splits by x, 1 if by y
+
+    Attributes:
+        handle: handle of point stored in node
+        x: point x coordinate
+        y: point y coordinate
+        axis: 0 if node splits by x, 1 if by y
+        left: subtree of points not greater than node point on axis
+        right: subtree of points not less than node point on axis
+        count: number of nodes in subtree, including tombstones
+    """
+    __slots__ = ('handle', 'x', 'y', 'axis', 'left', 'right', 'count')
+
+    def __init__(self, handle, point, axis):
+        self.handle = handle
+        self.x = point.x
+        self.y = point.y
+        self.axis = axis
+        self.left = None
+        self.right = None
+        self.count = 1
+
+
+def build_grid(points, handles, cell_size):
+    """Puts points into grid of square cells
+
+    Args:
+        points: list of points by handle
+        handles: handles of points put into grid
+        cell_size: cell side length
+
+    Returns:
+        dict: lists of handles by (cell x, cell y) tuple
+    """
+    grid = {}
+    for handle in handles:
+        point = points[handle]
+        grid.setdefault((floor(point.x / cell_size), floor(point.y / cell_size)), []).append(handle)
+    return grid
+
+
+if __name__ == '__main__':
+    points = [Point(random.randint(0, 1000), random.randint(0, 1000)) for _ in range(500)]
+    index = SpatialIndex(points)
+    assert len(index) == 500
+
+    # test closest pair against find_closest_pair
+    assert distance(*index.closest_pair()) == distance(*find_closest_pair(points))
+    float_points = [Point(random.random(), random.random()) for _ in range(300)]
+    assert distance(*SpatialIndex(float_points).closest_pair()) == distance(*closest_pair_brute_force(float_points))
+
+    # test nearest and within against brute force
+    for query in [Point(random.randint(0, 1000), random.randint(0, 1000)) for _ in range(20)] + points[:5]:
+        expected_distances = sorted(squared_distance(query, point) for point in points)
+        assert [squared_distance(query, point) for point in index.nearest(query, 5)] == expected_distances[:5]
+        assert sorted(squared_distance(query, point) for point in index.within(query, 100)) == \
+            [point_distance for point_distance in expected_distances if point_distance <= 100 ** 2]
+
+    # test pairs within radius against brute force
+    expected_pairs_count = sum(1 for i in range(len(points)) for j in range(i + 1, len(points))
+                               if squared_distance(points[i], points[j]) <= 30 ** 2)
+    assert len(index.pairs_within(30)) == expected_pairs_count
+
+    # test insert and delete
+    for point in points[:250]:
+        index.delete(point)
+    assert len(index) == 250
+    assert sorted(map(str, index)) == sorted(map(str, points[250:]))
+    for point in float_points:
+        index.insert(Point(point.x * 1000, point.y * 1000))
+    remaining_points = list(index)
+    assert distance(*index.closest_pair()) == distance(*find_closest_pair(remaining_points))
+    query = Point(500, 500)
+    assert squared_distance(query, index.nearest(query)[0]) == \
+        min(squared_distance(query, point) for point in remaining_points)
+    try:
+        SpatialIndex([Point(0, 0)]).delete(Point(1, 1))
+        assert False
+    except ValueError:
+        pass
+
+    # test tree size and depth stay bounded under sliding window of insertions and deletions
+    index = SpatialIndex()
+    window = []
+    for step in range(20000):
+        window.append(index.insert(Point(step + random.random(), random.random())))
+        if len(window) > 100:
+            index.delete_handle(window.pop(0))
+        assert index.node_count <= 2 * len(index) + 1
+    assert len(index.points) <= 2 * len(index) + 1
+    assert index.depth() <= log(index.node_count) / log(1 / BALANCE) + 2
+    query = Point(19950, 0.5)
+    assert squared_distance(query, index.nearest(query)[0]) == \
+        min(squared_distance(query, index.points[handle]) for handle in window)
+    index = SpatialIndex()
+    for step in range(3000):
+        index.insert(Point(step, step))
+    assert index.depth() <= log(3000) / log(1 / BALANCE) + 2
@@ -0,0 +1,129 @@
+"""Static search index over sorted sequence in Eytzinger (breadth-first) layout.
+Items are stored in order of breadth-first traversal of implicit binary search tree: root at index 1, children of
+index k at 2k and 2k + 1. First levels of the tree are stored next to each other, so consecutive probes of a lookup
+touch nearby memory instead of jumping across whole array. Integer and float keys are stored in typed arrays
+Expected performance: O(lg(n)) per lookup, O(n) build
+"""
+import random
+import sys
+from array import array as typed_array
+from datetime import datetime
+
+from algorithms.binary_search import search
+from utils.readable import readable_time
+
+
+class StaticSearchIndex:
+    """Read-only search index built from sorted sequence. Lookups return same indexes as binary_search.search
+
+    Args:
+        sorted_array: sorted sequence of keys
+
+    Attributes:
+        size: number of keys
+        layout: keys in Eytzinger order, index 0 is unused
+        positions: index of every layout key in sorted_array
+    """
+
+    def __init__(self, sorted_array):
+        self.size = len(sorted_array)
+        self.layout = self.__allocate(sorted_array)
+        self.positions = typed_array('q', bytes(8 * (self.size + 1)))
+        sorted_index = 0
+        layout_index = 1
+        stack = []
+        while stack or layout_index <= self.size:  # in-order traversal of implicit tree fills it in sorted order
+            while layout_index <= self.size:
+                stack.append(layout_index)
+                layout_index *= 2
+            layout_index = stack.pop()
+            self.layout[layout_index] = sorted_array[sorted_index]
+            self.positions[layout_index] = sorted_index
+            sorted_index += 1
+            layout_index = 2 * layout_index + 1
+
+    def __len__(self):
+        """Returns number of keys in the index
+
+        Returns:
+            int: number of keys
+        """
+        return self.size
+
+    def __contains__(self, element):
+        """Checks whether index contains element
+
+        Args:
+            element: checked element
+
+        Returns:
+            bool: True if index contains element, False otherwise
+        """
+        return self.search(element) != -1
+
+    def search(self, element):
+        """Searches index for an element and returns its leftmost index in original sorted sequence
+
+        Args:
+            element: element to search for
+
+        Returns:
+            int: element index if element is found, -1 otherwise
+        """
+        layout = self.layout
+        size = self.size
+        layout_index = 1
+        while layout_index <= size:
+            layout_index = 2 * layout_index + (layout[layout_index] < element)
+        layout_index >>= (layout_index ^ (layout_index + 1)).bit_length()  # go up past right turns and one left turn
+        if layout_index and layout[layout_index] == element:
+            return self.positions[layout_index]
+        return -1
+
+    def __allocate(self, sorted_array):
+        """Allocates layout storage, typed array for integer and float keys, list otherwise
+
+        Args:
+            sorted_array: sorted sequence of keys
+
+        Returns:
+            array.array or list: storage for size + 1 keys
+        """
+        if isinstance(sorted_array, typed_array):
+            return typed_array(sorted_array.typecode, bytes(sorted_array.itemsize * (self.size + 1)))
+        if self.size and all(type(item) is int for item in sorted_array) and \
+                -2 ** 63 <= sorted_array[0] and sorted_array[-1] < 2 ** 63:
+            return typed_array('q', bytes(8 * (self.size + 1)))
+        if self.size and all(type(item) is float for item in sorted_array):
+            return typed_array('d', bytes(8 * (self.size + 1)))
+        return [None] * (self.size + 1)
+
+
+if __name__ == '__main__':
+    # test search against binary_search.search
+    for array in ([], [1], [1, 1], [0, 1, 2, 3, 4, 5, 6], sorted(random.randint(0, 100) for _ in range(1000)),
+                  sorted(random.random() for _ in range(100)), ['a', 'b', 'b', 'c'], [2 ** 70, 2 ** 71]):
+        index = StaticSearchIndex(array)
+        assert len(index) == len(array)
+        for element in set(array) | {-1, 101, 50, 'z', 2 ** 72}:
+            if not isinstance(element, type(array[0] if array else element)):
+                continue
+            assert index.search(element) == search(array, element)
+            assert (element in index) == (element in array)
+    assert isinstance(StaticSearchIndex([1, 2]).layout, typed_array)
+    assert isinstance(StaticSearchIndex([2 ** 70]).layout, list)
+
+    # benchmark lookup latency against binary_search.search, pass 100000000 as argument for 10^8 keys
+    sizes = [int(size) for size in sys.argv[1:]] or [10 ** 4, 10 ** 6]
+    for size in sizes:
+        array = typed_array('q', range(0, 2 * size, 2))
+        index = StaticSearchIndex(array)
+        queries = [random.randrange(2 * size) for _ in range(100000)]
+        for description, lookup in (('binary_search.search', lambda query: search(array, query)),
+                                    ('StaticSearchIndex.search', index.search)):
+            start_time = datetime.now()
+            for query in queries:
+                lookup(query)
+            elapsed_time = (datetime.now() - start_time).total_seconds()
+            print('{} of 100 000 queries in {} keys: {} ({:.0f}ns per lookup)'.format(
+                description, size, readable_time(elapsed_time), elapsed_time / len(queries) * 10 ** 9))
@@ -0,0 +1,193 @@
+"""Typed array backend for merge sort and inversion counting.
+Works on array.array and NumPy arrays, which store unboxed numbers, instead of lists of Python ints.
+If NumPy is installed, sorting and inversion counting are vectorized:
+inversions are counted level by level of bottom-up merge sort over rank compressed values with numpy.searchsorted.
+Otherwise inversions are counted with a Fenwick tree pass over rank compressed values
+Expected performance: O(nlog(n)) for sorting, O(nlog(n)^2) vectorized operations or O(nlog(n)) Fenwick tree
+operations for inversion counting
+"""
+import random
+import sys
+import tracemalloc
+from array import array as typed_array
+from datetime import datetime
+
+from algorithms import merge_sort, count_inversions
+from utils.readable import readable_size, readable_time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def sort(array):
+    """Sorts typed array. Same result as merge_sort.sort
+
+    Args:
+        array: array.array or numpy.ndarray object that should be sorted
+
+    Returns:
+        sorted array of the same type as array
+    """
+    if numpy is None:
+        return typed_array(array.typecode, merge_sort.sort(array))
+    values = as_numpy(array)
+    return from_numpy(numpy.sort(values, kind='stable'), array)
+
+
+def sort_and_count(array):
+    """Sorts typed array and counts inversions. Same result as count_inversions.sort_and_count
+
+    Args:
+        array: array.array or numpy.ndarray object that should be sorted
+
+    Returns:
+        tuple: first element is sorted array of the same type as array, second element is number of inversions
+    """
+    if numpy is None:
+        return typed_array(array.typecode, merge_sort.sort(array)), count_with_fenwick_tree(array)
+    values = as_numpy(array)
+    order = numpy.argsort(values, kind='stable')
+    return from_numpy(values[order], array), count_with_searchsorted(order)
+
+
+def count(array):
+    """Counts inversions of typed array
+
+    Args:
+        array: array.array or numpy.ndarray object
+
+    Returns:
+        int: number of inversions
+    """
+    if numpy is None:
+        return count_with_fenwick_tree(array)
+    return count_with_searchsorted(numpy.argsort(as_numpy(array), kind='stable'))
+
+
+def count_with_searchsorted(order):
+    """Counts inversions using vectorized bottom-up merge sort over ranks.
+    Equal values get increasing ranks in order of appearance, so they don't form inversions.
+    Ranks are padded with increasing values to a power of two length, so every level is a 2D array of block pairs.
+    For every block pair left blocks are shifted by row offsets, so one searchsorted call over the flattened array
+    finds for every right block item the number of left block items smaller than it
+
+    Args:
+        order: numpy array of indexes that stable sorts the counted array
+
+    Returns:
+        int: number of inversions
+    """
+    array_length = len(order)
+    if array_length < 2:
+        return 0
+    size = 1 << (array_length - 1).bit_length()
+    blocks = numpy.arange(size, dtype=numpy.int64)
+    blocks[order] = numpy.arange(array_length, dtype=numpy.int64)
+    inversion_count = 0
+    width = 1
+    while width < size:
+        pairs = blocks.reshape(-1, 2 * width)
+        rows = numpy.arange(pairs.shape[0], dtype=numpy.int64)[:, None]
+        offsets = rows * size
+        positions = numpy.searchsorted((pairs[:, :width] + offsets).ravel(), (pairs[:, width:] + offsets).ravel())
+        inversion_count += int((width - (positions.reshape(-1, width) - rows * width)).sum())
+        blocks = numpy.sort(pairs, axis=1, kind='stable').ravel()
+        width *= 2
+    return inversion_count
+
+
+def count_with_fenwick_tree(array):
+    """Counts inversions with a Fenwick tree over dense ranks of values.
+    For every item number of previously seen items with bigger rank is added to the count
+
+    Args:
+        array: sequence of comparable values
+
+    Returns:
+        int: number of inversions
+    """
+    ranks = {value: rank for rank, value in enumerate(sorted(set(array)), 1)}
+    tree = typed_array('q', bytes(8 * (len(ranks) + 1)))
+    tree_size = len(ranks)
+    inversion_count = 0
+    for seen_count, value in enumerate(array):
+        rank = ranks[value]
+        index = rank
+        not_bigger_count = 0
+        while index > 0:
+            not_bigger_count += tree[index]
+            index &= index - 1
+        inversion_count += seen_count - not_bigger_count
+        index = rank
+        while index <= tree_size:
+            tree[index] += 1
+            index += index & -index
+    return inversion_count
+
+
+def as_numpy(array):
+    """Returns NumPy view of array without copying
+
+    Args:
+        array: array.array or numpy.ndarray object
+
+    Returns:
+        numpy.ndarray: array view
+    """
+    if isinstance(array, typed_array):
+        return numpy.frombuffer(array, dtype=array.typecode) if len(array) else numpy.empty(0, dtype=array.typecode)
+    return numpy.asarray(array)
+
+
+def from_numpy(values, origin):
+    """Converts NumPy array to type of origin array
+
+    Args:
+        values: numpy.ndarray object
+        origin: array.array or numpy.ndarray object which type is used
+
+    Returns:
+        values as array.array if origin is array.array, values otherwise
+    """
+    if isinstance(origin, typed_array):
+        return typed_array(origin.typecode, values.tobytes())
+    return values
+
+
+if __name__ == '__main__':
+    # test sort and sort_and_count functions against list implementations
+    for values in ([], [1], [6, 5, 4, 3, 2, 1], [1, 3, 5, 2, 4, 6], [2, 2, 1, 1, 3],
+                   [random.randint(-50, 50) for _ in range(1000)]):
+        for typecode in ('q', 'd'):
+            array = typed_array(typecode, values)
+            sorted_list, inversion_count = count_inversions.sort_and_count(values)
+            assert sort(array) == typed_array(typecode, merge_sort.sort(values))
+            assert sort_and_count(array) == (typed_array(typecode, sorted_list), inversion_count)
+            assert count(array) == count_with_fenwick_tree(values) == inversion_count
+            if numpy is not None:
+                assert list(sort(numpy.array(values, dtype=typecode))) == merge_sort.sort(values)
+                assert sort_and_count(numpy.array(values, dtype=typecode))[1] == inversion_count
+
+    # benchmark memory and time against list implementations
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10000000
+    values = [random.randint(-size, size) for _ in range(size)]
+    print('list of {} items: {}, array.array: {}'.format(
+        size, readable_size(sys.getsizeof(values) + sum(map(sys.getsizeof, values))),
+        readable_size(sys.getsizeof(typed_array('q', values)))))
+    benchmarks = (
+        ('merge_sort.sort', lambda: merge_sort.sort(values)),
+        ('typed_backend.sort', lambda: sort(typed_array('q', values))),
+        ('count_inversions.sort_and_count', lambda: count_inversions.sort_and_count(values)),
+        ('typed_backend.sort_and_count', lambda: sort_and_count(typed_array('q', values))),
+    )
+    for description, benchmark in benchmarks:
+        tracemalloc.start()
+        start_time = datetime.now()
+        benchmark()
+        elapsed_time = (datetime.now() - start_time).total_seconds()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print('{} of {} items: {}, peak memory {}'.format(description, size, readable_time(elapsed_time),
+                                                        readable_size(peak_memory)))
@@ -0,0 +1,742 @@
+"""Enumerable integer sets for functional_sets. Unlike predicate sets they can be counted, iterated and serialized.
+IntervalSet stores sorted disjoint intervals of integers, so long ranges take constant memory.
+BitmapSet is compressed bitmap in roaring style: elements are split by their high 16 bits into containers, sparse
+containers store sorted arrays of low 16 bits, dense ones store 65536-bit bitmaps.
+Set operations between enumerable sets and finite sets of integers produce enumerable sets, functional_sets union,
+intersection and difference use them, other sets are combined as predicates
+Expected performance: O(lg(n)) contains and O(n) set operations for IntervalSet of n intervals,
+O(1) contains and O(n / 65536 + n) set operations for BitmapSet of n elements
+"""
+import operator
+import random
+import struct
+import sys
+import tracemalloc
+from array import array as typed_array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import groupby
+
+from data_structures.functional_sets import FiniteSet, contains, contains_many, union, intersection, difference, \
+    filter_set, generate_set
+from utils.readable import readable_size, readable_time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+CONTAINER_BITS = 16  # number of low element bits stored in BitmapSet containers
+CONTAINER_SIZE = 1 << CONTAINER_BITS
+ARRAY_CONTAINER_LIMIT = 4096  # containers with more elements are stored as bitmaps, which take 8KB
+BITMAP_LIMIT = 1 << 32  # BitmapSet stores integers from 0 to 2^32 - 1
+INTERVAL_LOW, INTERVAL_LIMIT = -(1 << 63), (1 << 63) - 1  # IntervalSet stores integers from -2^63 to 2^63 - 2
+BIT_POSITIONS = [[bit for bit in range(8) if byte >> bit & 1] for byte in range(256)]
+
+
+class IntervalSet:
+    """Set of integers stored as sorted disjoint half-open intervals [start, end) in typed arrays
+
+    Args:
+        intervals: iterable of (start, end) tuples, may overlap
+
+    Attributes:
+        starts: array of interval starts
+        ends: array of interval ends
+        size: number of elements
+    """
+    __slots__ = ('starts', 'ends', 'size')
+
+    def __init__(self, intervals=()):
+        self.starts = typed_array('q')
+        self.ends = typed_array('q')
+        for start, end in sorted(interval for interval in intervals if interval[0] < interval[1]):
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+        self.size = sum(self.ends) - sum(self.starts)
+
+    @classmethod
+    def from_iterable(cls, elements):
+        """Creates set of integers joining consecutive ones into intervals
+
+        Args:
+            elements: iterable of integers
+
+        Returns:
+            IntervalSet: new set
+        """
+        intervals = []
+        for element in sorted(set(map(operator.index, elements))):
+            if intervals and intervals[-1][1] == element:
+                intervals[-1][1] += 1
+            else:
+                intervals.append([element, element + 1])
+        return cls(intervals)
+
+    def __call__(self, element):
+        element = as_integer(element)
+        if element is None:
+            return False
+        position = bisect_right(self.starts, element) - 1
+        return position >= 0 and element < self.ends[position]
+
+    def __len__(self):
+        """Returns number of elements
+
+        Returns:
+            int: number of elements
+        """
+        return self.size
+
+    def __iter__(self):
+        """Iterates through elements in ascending order
+
+        Returns:
+            int: next element
+        """
+        for start, end in zip(self.starts, self.ends):
+            yield from range(start, end)
+
+    def __eq__(self, other):
+        return isinstance(other, IntervalSet) and self.starts == other.starts and self.ends == other.ends
+
+    def __str__(self):
+        """Returns string representation of set
+
+        Returns:
+            str: set string representation. Eg: 'IntervalSet([0, 3), [5, 6))'
+        """
+        return 'IntervalSet({})'.format(', '.join('[{}, {})'.format(*interval) for interval in self.intervals()))
+
+    def intervals(self):
+        """Iterates through intervals in ascending order
+
+        Returns:
+            tuple: next (start, end) tuple
+        """
+        return zip(self.starts, self.ends)
+
+    def union(self, other):
+        """Unions set with enumerable set
+
+        Args:
+            other: IntervalSet, BitmapSet or FiniteSet of integers
+
+        Returns:
+            IntervalSet: union, NotImplemented if other set is not enumerable set of integers
+        """
+        other = as_interval_set(other)
+        if other is None:
+            return NotImplemented
+        return IntervalSet(merge_intervals(self.intervals(), other.intervals()))
+
+    def intersection(self, other):
+        """Intersects set with enumerable set
+
+        Args:
+            other: IntervalSet, BitmapSet or FiniteSet of integers
+
+        Returns:
+            IntervalSet: intersection, NotImplemented if other set is not enumerable set of integers
+        """
+        other = as_interval_set(other)
+        if other is None:
+            return NotImplemented
+        intervals = []
+        i = j = 0
+        while i < len(self.starts) and j < len(other.starts):
+            start, end = max(self.starts[i], other.starts[j]), min(self.ends[i], other.ends[j])
+            if start < end:
+                intervals.append((start, end))
+            if self.ends[i] < other.ends[j]:
+                i += 1
+            else:
+                j += 1
+        return IntervalSet(intervals)
+
+    def difference(self, other):
+        """Subtracts enumerable set from set
+
+        Args:
+            other: IntervalSet, BitmapSet or FiniteSet of integers
+
+        Returns:
+            IntervalSet: difference, NotImplemented if other set is not enumerable set of integers
+        """
+        other = as_interval_set(other)
+        if other is None:
+            return NotImplemented
+        intervals = []
+        j = 0
+        for start, end in self.intervals():
+            while j < len(other.starts) and other.ends[j] <= start:
+                j += 1
+            current = start
+            k = j
+            while k < len(other.starts) and other.starts[k] < end:
+                if other.starts[k] > current:
+                    intervals.append((current, other.starts[k]))
+                current = max(current, other.ends[k])
+                k += 1
+            if current < end:
+                intervals.append((current, end))
+        return IntervalSet(intervals)
+
+    def evaluate_many(self, elements):
+        """Checks elements with one binary search per element, NumPy arrays are searched at once
+
+        Args:
+            elements: list of elements or NumPy array
+
+        Returns:
+            list of check results, NumPy boolean array if elements is NumPy array
+        """
+        if numpy is None or not isinstance(elements, numpy.ndarray):
+            return [self(element) for element in elements]
+        if elements.dtype.kind not in 'biuf':
+            return numpy.fromiter((self(element) for element in elements.tolist()), dtype=bool, count=len(elements))
+        if not self.starts:
+            return numpy.zeros(len(elements), dtype=bool)
+        starts = numpy.frombuffer(self.starts, dtype=numpy.int64)
+        ends = numpy.frombuffer(self.ends, dtype=numpy.int64)
+        positions = numpy.searchsorted(starts, elements, side='right') - 1
+        mask = (positions >= 0) & (elements < ends[positions.clip(0)])
+        if elements.dtype.kind == 'f':
+            mask &= elements == numpy.floor(elements)
+        return mask
+
+    def to_bytes(self):
+        """Serializes set: b'I', number of intervals, starts and ends as little-endian 64-bit integers
+
+        Returns:
+            bytes: serialized set
+        """
+        return b'I' + struct.pack('<I', len(self.starts)) + little_endian(self.starts) + little_endian(self.ends)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Deserializes set serialized with to_bytes
+
+        Args:
+            data (bytes): serialized set
+
+        Returns:
+            IntervalSet: deserialized set
+        """
+        count, = struct.unpack_from('<I', data, 1)
+        interval_set = cls()
+        interval_set.starts.frombytes(data[5:5 + 8 * count])
+        interval_set.ends.frombytes(data[5 + 8 * count:5 + 16 * count])
+        if sys.byteorder == 'big':
+            interval_set.starts.byteswap()
+            interval_set.ends.byteswap()
+        interval_set.size = sum(interval_set.ends) - sum(interval_set.starts)
+        return interval_set
+
+
+class BitmapSet:
+    """Compressed bitmap set of integers from 0 to 2^32 - 1 in roaring style. Elements with the same high 16 bits are
+    stored in one container: sorted typed array of low 16 bits if there are at most ARRAY_CONTAINER_LIMIT of them,
+    8KB bitmap otherwise
+
+    Args:
+        elements: iterable of integers
+
+    Attributes:
+        keys: sorted list of high 16 bits of stored elements
+        containers: containers by key, array.array or bytearray
+        size: number of elements
+    """
+    __slots__ = ('keys', 'containers', 'size')
+
+    def __init__(self, elements=()):
+        self.keys = []
+        self.containers = {}
+        self.size = 0
+        elements = sorted(set(map(operator.index, elements)))
+        if elements and (elements[0] < 0 or elements[-1] >= BITMAP_LIMIT):
+            raise ValueError('BitmapSet elements should be from 0 to 2^32 - 1')
+        for key, key_elements in groupby(elements, lambda element: element >> CONTAINER_BITS):
+            self.__put(key, container_from_lows([element & (CONTAINER_SIZE - 1) for element in key_elements]))
+
+    @classmethod
+    def from_intervals(cls, intervals):
+        """Creates set of integers of intervals filling bitmap containers without enumerating elements
+
+        Args:
+            intervals: iterable of (start, end) tuples
+
+        Returns:
+            BitmapSet: new set
+        """
+        bitmaps = {}
+        for start, end in intervals:
+            if start >= end:
+                continue
+            if start < 0 or end > BITMAP_LIMIT:
+                raise ValueError('BitmapSet elements should be from 0 to 2^32 - 1')
+            for key in range(start >> CONTAINER_BITS, ((end - 1) >> CONTAINER_BITS) + 1):
+                low = max(start - (key << CONTAINER_BITS), 0)
+                high = min(end - (key << CONTAINER_BITS), CONTAINER_SIZE)
+                bitmaps[key] = bitmaps.get(key, 0) | ((1 << (high - low)) - 1) << low
+        bitmap_set = cls()
+        for key in sorted(bitmaps):
+            bitmap_set.__put(key, container_from_int(bitmaps[key]))
+        return bitmap_set
+
+    def __call__(self, element):
+        element = as_integer(element)
+        if element is None or element < 0:
+            return False
+        container = self.containers.get(element >> CONTAINER_BITS)
+        return container is not None and container_contains(container, element & (CONTAINER_SIZE - 1))
+
+    def __len__(self):
+        """Returns number of elements
+
+        Returns:
+            int: number of elements
+        """
+        return self.size
+
+    def __iter__(self):
+        """Iterates through elements in ascending order
+
+        Returns:
+            int: next element
+        """
+        for key in self.keys:
+            base = key << CONTAINER_BITS
+            for low in iterate_container(self.containers[key]):
+                yield base + low
+
+    def __eq__(self, other):
+        return isinstance(other, BitmapSet) and self.keys == other.keys and all(
+            container_to_int(self.containers[key]) == container_to_int(other.containers[key]) for key in self.keys)
+
+    def union(self, other):
+        """Unions set with enumerable set
+
+        Args:
+            other: BitmapSet, IntervalSet or FiniteSet of integers
+
+        Returns:
+            BitmapSet: union, NotImplemented if other set is not enumerable set of integers from 0 to 2^32 - 1
+        """
+        other = as_bitmap_set(other)
+        if other is None:
+            return NotImplemented
+        result = BitmapSet()
+        for key in sorted(set(self.keys) | set(other.keys)):
+            first, second = self.containers.get(key), other.containers.get(key)
+            if first is None or second is None:
+                result.__put(key, first if second is None else second)
+            elif isinstance(first, typed_array) and isinstance(second, typed_array):
+                result.__put(key, container_from_lows(sorted(set(first) | set(second))))
+            else:
+                result.__put(key, container_from_int(container_to_int(first) | container_to_int(second)))
+        return result
+
+    def intersection(self, other):
+        """Intersects set with enumerable set
+
+        Args:
+            other: BitmapSet, IntervalSet or FiniteSet of integers
+
+        Returns:
+            BitmapSet: intersection, NotImplemented if other set is not enumerable set of integers
+        """
+        other = as_bitmap_set(other)
+        if other is None:
+            return NotImplemented
+        result = BitmapSet()
+        for key in self.keys:
+            first, second = self.containers[key], other.containers.get(key)
+            if second is None:
+                continue
+            if isinstance(first, typed_array) or isinstance(second, typed_array):
+                lows, bitmap = (first, second) if isinstance(first, typed_array) else (second, first)
+                result.__put(key, container_from_lows([low for low in lows if container_contains(bitmap, low)]))
+            else:
+                result.__put(key, container_from_int(container_to_int(first) & container_to_int(second)))
+        return result
+
+    def difference(self, other):
+        """Subtracts enumerable set from set
+
+        Args:
+            other: BitmapSet, IntervalSet or FiniteSet of integers
+
+        Returns:
+            BitmapSet: difference, NotImplemented if other set is not enumerable set of integers
+        """
+        other = as_bitmap_set(other)
+        if other is None:
+            return NotImplemented
+        result = BitmapSet()
+        for key in self.keys:
+            first, second = self.containers[key], other.containers.get(key)
+            if second is None:
+                result.__put(key, first)
+            elif isinstance(first, typed_array):
+                result.__put(key, container_from_lows([low for low in first if not container_contains(second, low)]))
+            else:
+                result.__put(key, container_from_int(container_to_int(first) & ~container_to_int(second)))
+        return result
+
+    def to_bytes(self):
+        """Serializes set: b'B', number of containers, then for every container its key, number of elements minus one
+        and either little-endian 16-bit array of low bits or 8KB bitmap
+
+        Returns:
+            bytes: serialized set
+        """
+        parts = [b'B', struct.pack('<I', len(self.keys))]
+        for key in self.keys:
+            container = self.containers[key]
+            parts.append(struct.pack('<HH', key, container_cardinality(container) - 1))
+            parts.append(little_endian(container) if isinstance(container, typed_array) else bytes(container))
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Deserializes set serialized with to_bytes
+
+        Args:
+            data (bytes): serialized set
+
+        Returns:
+            BitmapSet: deserialized set
+        """
+        count, = struct.unpack_from('<I', data, 1)
+        offset = 5
+        bitmap_set = cls()
+        for _ in range(count):
+            key, cardinality = struct.unpack_from('<HH', data, offset)
+            cardinality += 1
+            offset += 4
+            if cardinality <= ARRAY_CONTAINER_LIMIT:
+                container = typed_array('H', data[offset:offset + 2 * cardinality])
+                if sys.byteorder == 'big':
+                    container.byteswap()
+                offset += 2 * cardinality
+            else:
+                container = bytearray(data[offset:offset + CONTAINER_SIZE // 8])
+                offset += CONTAINER_SIZE // 8
+            bitmap_set.__put(key, container)
+        return bitmap_set
+
+    def __put(self, key, container):
+        """Appends container with key greater than existing keys, skips empty containers
+
+        Args:
+            key (int): high 16 bits of container elements
+            container: array.array or bytearray container
+        """
+        cardinality = container_cardinality(container)
+        if cardinality:
+            self.keys.append(key)
+            self.containers[key] = container
+            self.size += cardinality
+
+
+def as_integer(element):
+    """Converts integral element to int
+
+    Args:
+        element: converted element
+
+    Returns:
+        int: integer equal to element, None if there is no such integer
+    """
+    try:
+        return operator.index(element)
+    except TypeError:
+        if isinstance(element, float) and element.is_integer():
+            return int(element)
+        return None
+
+
+def integer_elements(set, low, limit):
+    """Converts elements of finite set to ints if all of them are integers in range
+
+    Args:
+        set (FiniteSet): converted set
+        low (int): smallest allowed integer
+        limit (int): end of allowed range, not included
+
+    Returns:
+        list: ints equal to set elements, None if some element is not an integer from low to limit - 1
+    """
+    elements = []
+    for element in set.elements:
+        integer = as_integer(element)
+        if integer is None or integer != element or not low <= integer < limit:
+            return None
+        elements.append(integer)
+    return elements
+
+
+def as_interval_set(set):
+    """Converts enumerable set of integers to IntervalSet
+
+    Args:
+        set: IntervalSet, BitmapSet or FiniteSet
+
+    Returns:
+        IntervalSet: converted set, None if set is not enumerable set of integers which fit 64-bit interval bounds
+    """
+    if isinstance(set, IntervalSet):
+        return set
+    if isinstance(set, BitmapSet):
+        return IntervalSet.from_iterable(set)
+    if isinstance(set, FiniteSet):
+        elements = integer_elements(set, INTERVAL_LOW, INTERVAL_LIMIT)
+        if elements is not None:
+            return IntervalSet.from_iterable(elements)
+    return None
+
+
+def as_bitmap_set(set):
+    """Converts enumerable set of integers to BitmapSet
+
+    Args:
+        set: BitmapSet, IntervalSet or FiniteSet
+
+    Returns:
+        BitmapSet: converted set, None if set is not enumerable set of integers from 0 to 2^32 - 1
+    """
+    if isinstance(set, BitmapSet):
+        return set
+    if isinstance(set, IntervalSet):
+        if set.size and (set.starts[0] < 0 or set.ends[-1] > BITMAP_LIMIT):
+            return None
+        return BitmapSet.from_intervals(set.intervals())
+    if isinstance(set, FiniteSet):
+        elements = integer_elements(set, 0, BITMAP_LIMIT)
+        if elements is not None:
+            return BitmapSet(elements)
+    return None
+
+
+def merge_intervals(first_intervals, second_intervals):
+    """Merges two sorted sequences of intervals into one sorted list
+
+    Args:
+        first_intervals: sorted iterable of (start, end) tuples
+        second_intervals: sorted iterable of (start, end) tuples
+
+    Returns:
+        list: sorted (start, end) tuples
+    """
+    return sorted(list(first_intervals) + list(second_intervals))
+
+
+def container_from_lows(lows):
+    """Creates container of sorted low 16 bits of elements
+
+    Args:
+        lows: sorted list of distinct integers from 0 to 65535
+
+    Returns:
+        array.array if there are at most ARRAY_CONTAINER_LIMIT elements, bytearray bitmap otherwise
+    """
+    if len(lows) <= ARRAY_CONTAINER_LIMIT:
+        return typed_array('H', lows)
+    bitmap = bytearray(CONTAINER_SIZE // 8)
+    for low in lows:
+        bitmap[low >> 3] |= 1 << (low & 7)
+    return bitmap
+
+
+def container_from_int(bits):
+    """Creates container from integer with bits of elements set
+
+    Args:
+        bits (int): integer below 2^65536
+
+    Returns:
+        array.array if there are at most ARRAY_CONTAINER_LIMIT elements, bytearray bitmap otherwise
+    """
+    bitmap = bytearray(bits.to_bytes(CONTAINER_SIZE // 8, 'little'))
+    if bin(bits).count('1') > ARRAY_CONTAINER_LIMIT:
+        return bitmap
+    return typed_array('H', iterate_container(bitmap))
+
+
+def container_to_int(container):
+    """Converts container to integer with bits of elements set
+
+    Args:
+        container: array.array or bytearray container
+
+    Returns:
+        int: integer below 2^65536
+    """
+    if isinstance(container, typed_array):
+        bitmap = bytearray(CONTAINER_SIZE // 8)
+        for low in container:
+            bitmap[low >> 3] |= 1 << (low & 7)
+        container = bitmap
+    return int.from_bytes(container, 'little')
+
+
+def container_contains(container, low):
+    """Checks whether container contains low 16 bits of element
+
+    Args:
+        container: array.array or bytearray container
+        low (int): low 16 bits of element
+
+    Returns:
+        bool: True if container contains element, False otherwise
+    """
+    if isinstance(container, typed_array):
+        position = bisect_left(container, low)
+        return position < len(container) and container[position] == low
+    return bool(container[low >> 3] >> (low & 7) & 1)
+
+
+def container_cardinality(container):
+    """Returns number of container elements
+
+    Args:
+        container: array.array or bytearray container
+
+    Returns:
+        int: number of elements
+    """
+    if isinstance(container, typed_array):
+        return len(container)
+    return bin(int.from_bytes(container, 'little')).count('1')
+
+
+def iterate_container(container):
+    """Iterates through low 16 bits of container elements in ascending order
+
+    Args:
+        container: array.array or bytearray container
+
+    Returns:
+        int: next low 16 bits
+    """
+    if isinstance(container, typed_array):
+        yield from container
+        return
+    for byte_index, byte in enumerate(container):
+        if byte:
+            base = byte_index << 3
+            for bit in BIT_POSITIONS[byte]:
+                yield base + bit
+
+
+def little_endian(array):
+    """Returns bytes of typed array in little-endian order
+
+    Args:
+        array: array.array object
+
+    Returns:
+        bytes: array bytes
+    """
+    if sys.byteorder == 'big':
+        array = typed_array(array.typecode, array)
+        array.byteswap()
+    return array.tobytes()
+
+
+def load_set(data):
+    """Deserializes IntervalSet or BitmapSet serialized with to_bytes
+
+    Args:
+        data (bytes): serialized set
+
+    Returns:
+        IntervalSet or BitmapSet: deserialized set
+    """
+    if data[:1] == b'I':
+        return IntervalSet.from_bytes(data)
+    if data[:1] == b'B':
+        return BitmapSet.from_bytes(data)
+    raise ValueError('Unknown set format')
+
+
+if __name__ == '__main__':
+    # test set operations against builtin sets
+    for _ in range(8):
+        first_elements = {random.randrange(300000) for _ in range(random.choice((10, 5000, 100000)))}
+        first_elements |= set(range(random.randrange(300000), random.randrange(300000)))
+        second_elements = {random.randrange(300000) for _ in range(random.choice((10, 5000, 100000)))}
+        for first_set in (IntervalSet.from_iterable(first_elements), BitmapSet(first_elements)):
+            assert len(first_set) == len(first_elements) and list(first_set) == sorted(first_elements)
+            for second_set in (IntervalSet.from_iterable(second_elements), BitmapSet(second_elements),
+                               generate_set(second_elements)):
+                assert list(union(first_set, second_set)) == sorted(first_elements | second_elements)
+                assert list(intersection(first_set, second_set)) == sorted(first_elements & second_elements)
+                assert list(difference(first_set, second_set)) == sorted(first_elements - second_elements)
+                assert type(union(first_set, second_set)) is type(first_set)
+            for element in list(first_elements)[:100] + [-1, 300000, 2 ** 40, 'a', 2.5]:
+                assert contains(first_set, element) == (element in first_elements)
+            assert type(load_set(first_set.to_bytes())) is type(first_set)
+            assert load_set(first_set.to_bytes()) == first_set
+    assert contains(IntervalSet([(0, 10)]), 3.0) and not contains(IntervalSet([(0, 10)]), 3.5)
+    assert list(IntervalSet([(5, 8), (0, 3), (2, 4), (8, 9)]).intervals()) == [(0, 4), (5, 9)]
+    assert str(IntervalSet([(0, 3), (5, 6)])) == 'IntervalSet([0, 3), [5, 6))'
+    assert len(BitmapSet.from_intervals([(0, 2 ** 20), (2 ** 32 - 5, 2 ** 32)])) == 2 ** 20 + 5
+    assert len(IntervalSet([(-2 ** 40, 2 ** 40)]).intersection(BitmapSet([1, 2 ** 31]))) == 2
+    try:
+        BitmapSet([-1])
+        assert False
+    except ValueError:
+        pass
+
+    # test fallback to predicates for opaque sets
+    even = lambda element: element % 2 == 0
+    composed_set = filter_set(union(IntervalSet([(0, 10)]), generate_set(['a'])), lambda element: element != 'a')
+    assert [element for element in range(12) if contains(composed_set, element)] == list(range(10))
+    assert not contains(composed_set, 'a')
+    composed_set = difference(BitmapSet(range(10)), even)
+    assert not isinstance(composed_set, BitmapSet)
+    assert [element for element in range(12) if contains(composed_set, element)] == [1, 3, 5, 7, 9]
+    assert contains_many(intersection(IntervalSet([(0, 10)]), even), [1, 2, 12]) == [False, True, False]
+    for huge in (2 ** 70, -2 ** 63 - 1, 2 ** 63 - 1, float(2 ** 70)):
+        composed_set = union(IntervalSet([(0, 10)]), generate_set([huge]))
+        assert not isinstance(composed_set, IntervalSet)
+        assert contains(composed_set, huge) and contains(composed_set, 5) and not contains(composed_set, 10)
+        assert contains(difference(BitmapSet([1, 2]), generate_set([huge])), 1)
+    assert isinstance(union(IntervalSet([(0, 10)]), generate_set([2 ** 63 - 2])), IntervalSet)
+    if numpy is not None:
+        for array in (numpy.arange(-5, 20), numpy.arange(-5, 20) / 2):
+            assert contains_many(IntervalSet([(0, 3), (10, 15)]), array).tolist() == \
+                [contains(IntervalSet([(0, 3), (10, 15)]), element) for element in array.tolist()]
+
+    # benchmark memory, serialized size and set operations against builtin sets
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    workloads = (
+        ('ranges', set(range(0, size // 2)) | set(range(size, size + size // 2))),
+        ('dense ids', set(random.sample(range(2 * size), size))),
+        ('sparse ids', set(random.sample(range(1000 * size), size))),
+    )
+    for description, elements in workloads:
+        other_elements = set(random.sample(range(2 * size), size // 10))
+        builds = (('set', set), ('IntervalSet', IntervalSet.from_iterable), ('BitmapSet', BitmapSet))
+        for set_type, build in builds:
+            tracemalloc.start()
+            built_set = build(elements)
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            other_set = build(other_elements)
+            start_time = datetime.now()
+            if set_type == 'set':
+                built_set | other_set, built_set & other_set, built_set - other_set
+                serialized_size = len(repr(built_set))
+            else:
+                built_set.union(other_set), built_set.intersection(other_set), built_set.difference(other_set)
+                serialized_size = len(built_set.to_bytes())
+            elapsed_time = (datetime.now() - start_time).total_seconds()
+            print('{} of {} {}: memory {}, serialized {}, union, intersection and difference in {} ({:.1f}ms)'.format(
+                set_type, size, description, readable_size(memory), readable_size(serialized_size),
+                readable_time(elapsed_time), elapsed_time * 1000))
@@ -1,8 +1,331 @@
-"""Set data-structure in functional style and related functions. Requires python 3.6"""
+"""Set data-structure in functional style and related functions. Requires python 3.6
+Sets are predicates which check whether element is in set. Sets of known elements are backed by hash sets, sets built
+with set operations remember their operands. When such set is checked for the first time its nested operations are
+flattened into one evaluation plan: finite operands of the same operation are merged into one hash set, empty operands
+are dropped, finite operands are checked before other predicates.
+Many elements are checked in one walk through evaluation plan: every operand is checked only against elements which
+can still change the result, NumPy arrays of elements are checked with boolean masks if NumPy is installed.
+Opaque predicates get whole arrays only if they are wrapped with vectorized, others are called once per element,
+since NumPy arithmetic differs from Python one, e.g. int64 overflows.
+Any set, including composed one, can be wrapped into memoized set which keeps check results in bounded LRU cache.
+Sets which implement union, intersection or difference methods, like enumerable_sets, are combined by these methods
+Expected performance: O(1) contains for sets of known elements
+"""
+import random
+import re
+import sys
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+from decimal import Decimal
+from fractions import Fraction
+from numbers import Number
+from time import monotonic, sleep
 from typing import NewType, Callable, Any
 
+from utils.readable import readable_time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 Set = NewType('Set', Callable[[Any], bool])
 Property = NewType('Property', Callable[[Any], bool])
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+DEFAULT_CACHE_SIZE = 1024  # default maximum number of check results kept by memoized set
+EXACT_FLOAT_INT = 2 ** 53  # ints up to that magnitude convert to float64 exactly
+
+
+class FiniteSet:
+    """Set of known hashable elements backed by frozenset
+
+    Args:
+        elements: iterable of hashable elements
+
+    Attributes:
+        elements: frozenset of set elements
+        array: sorted NumPy array of numeric elements, False if they don't convert to NumPy array exactly,
+            None until numeric array is checked
+    """
+    __slots__ = ('elements', 'array')
+
+    def __init__(self, elements):
+        self.elements = frozenset(elements)
+        self.array = None
+
+    def __call__(self, element: Any) -> bool:
+        try:
+            return element in self.elements
+        except TypeError:  # unhashable element still may be equal to some set element
+            return any(element == member for member in self.elements)
+
+    def __len__(self):
+        """Returns number of elements
+
+        Returns:
+            int: number of elements
+        """
+        return len(self.elements)
+
+    def __iter__(self):
+        """Iterates through elements
+
+        Returns:
+            Any: next element
+        """
+        return iter(self.elements)
+
+
+EMPTY_SET = FiniteSet(())
+
+
+class VectorizedProperty:
+    """Property which also accepts NumPy arrays and returns boolean array of check results. contains_many passes whole
+    arrays to it instead of calling it once per element
+
+    Args:
+        property (Property): property which accepts both elements and arrays of elements
+
+    Attributes:
+        property: wrapped property
+    """
+    __slots__ = ('property',)
+
+    def __init__(self, property):
+        self.property = property
+
+    def __call__(self, element: Any) -> bool:
+        return self.property(element)
+
+
+class SetExpression:
+    """Set built with set operation. Evaluation plan is compiled when set is checked for the first time
+
+    Args:
+        operation (str): 'union', 'intersection', 'difference' or 'filter'
+        operands (list): operand sets
+        properties (list, optional): properties filtered set elements should hold. Defaults to None
+
+    Attributes:
+        operation: set operation
+        operands: operand sets
+        properties: properties filtered set elements should hold
+        plan: compiled evaluation plan, None until set is checked
+    """
+    __slots__ = ('operation', 'operands', 'properties', 'plan')
+
+    def __init__(self, operation, operands, properties=None):
+        self.operation = operation
+        self.operands = operands
+        self.properties = properties
+        self.plan = None
+
+    def __call__(self, element: Any) -> bool:
+        if self.plan is None:
+            self.plan = compile_set(self)
+        return self.plan(element)
+
+
+class UnionPlan:
+    """Evaluation plan of union: elements of finite operands are merged into one set checked before predicates
+
+    Args:
+        finite_set (FiniteSet): merged finite operands
+        predicates (list): other compiled operands
+    """
+    __slots__ = ('finite_set', 'predicates')
+
+    def __init__(self, finite_set, predicates):
+        self.finite_set = finite_set
+        self.predicates = predicates
+
+    def __call__(self, element: Any) -> bool:
+        return self.finite_set(element) or any(predicate(element) for predicate in self.predicates)
+
+
+class IntersectionPlan:
+    """Evaluation plan of intersection: finite operands are intersected into one set checked before predicates
+
+    Args:
+        finite_set (FiniteSet): intersected finite operands, None if there are no finite operands
+        predicates (list): other compiled operands
+    """
+    __slots__ = ('finite_set', 'predicates')
+
+    def __init__(self, finite_set, predicates):
+        self.finite_set = finite_set
+        self.predicates = predicates
+
+    def __call__(self, element: Any) -> bool:
+        if self.finite_set is not None and not self.finite_set(element):
+            return False
+        return all(predicate(element) for predicate in self.predicates)
+
+
+class DifferencePlan:
+    """Evaluation plan of difference
+
+    Args:
+        minuend: compiled origin set
+        subtrahend: compiled union of subtracted sets
+    """
+    __slots__ = ('minuend', 'subtrahend')
+
+    def __init__(self, minuend, subtrahend):
+        self.minuend = minuend
+        self.subtrahend = subtrahend
+
+    def __call__(self, element: Any) -> bool:
+        return bool(self.minuend(element)) and not self.subtrahend(element)
+
+
+class FilterPlan:
+    """Evaluation plan of nested filters: properties are checked in order they were applied
+
+    Args:
+        source: compiled origin set
+        properties (list): properties subset elements should hold
+    """
+    __slots__ = ('source', 'properties')
+
+    def __init__(self, source, properties):
+        self.source = source
+        self.properties = properties
+
+    def __call__(self, element: Any) -> bool:
+        return bool(self.source(element)) and all(property(element) for property in self.properties)
+
+
+class MemoizedSet:
+    """Set which keeps check results of wrapped set in LRU cache. Least recently used results are evicted when cache
+    is full, results older than ttl are checked again. Cache is safe to use from several threads, wrapped set is
+    checked outside of the lock, so the same element may be checked by several threads at once.
+    Unhashable elements are checked without cache
+
+    Args:
+        set (Set): wrapped set
+        maxsize (int, optional): maximum number of cached results, None for unbounded cache.
+            Defaults to DEFAULT_CACHE_SIZE
+        ttl (float, optional): seconds cached result is valid for, None if results don't expire. Defaults to None
+
+    Attributes:
+        set: wrapped set
+        cache: OrderedDict of (result, expiration time) tuples by element, least recently used first
+        hits: number of checks answered from cache
+        misses: number of checks of wrapped set
+        evictions: number of results evicted because cache was full
+    """
+    __slots__ = ('set', 'maxsize', 'ttl', 'cache', 'lock', 'hits', 'misses', 'evictions')
+
+    def __init__(self, set, maxsize=DEFAULT_CACHE_SIZE, ttl=None):
+        self.set = set
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def __call__(self, element: Any) -> bool:
+        try:
+            is_cached, result = self.lookup(element)
+        except TypeError:  # unhashable element
+            return bool(self.set(element))
+        if not is_cached:
+            result = bool(self.set(element))
+            self.store(element, result)
+        return result
+
+    def lookup(self, element: Any) -> tuple:
+        """Finds cached check result of element counting hit or miss
+        Raises TypeError if element is unhashable
+
+        Args:
+            element (Any): checked element
+
+        Returns:
+            tuple: True and cached result if result is cached and not expired, False and None otherwise
+        """
+        with self.lock:
+            entry = self.cache.get(element)
+            if entry is not None and (entry[1] is None or entry[1] > monotonic()):
+                self.cache.move_to_end(element)
+                self.hits += 1
+                return True, entry[0]
+            if entry is not None:
+                del self.cache[element]
+            self.misses += 1
+            return False, None
+
+    def store(self, element: Any, result: bool):
+        """Caches check result evicting least recently used results if cache is full
+
+        Args:
+            element (Any): checked hashable element
+            result (bool): check result
+        """
+        with self.lock:
+            self.cache[element] = (result, None if self.ttl is None else monotonic() + self.ttl)
+            self.cache.move_to_end(element)
+            while self.maxsize is not None and len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+                self.evictions += 1
+
+    def evaluate_many(self, elements) -> list:
+        """Checks elements taking cached results and checking the rest against wrapped set at once.
+        Repeated elements are checked once
+
+        Args:
+            elements: list of elements or NumPy array
+
+        Returns:
+            list of check results, NumPy boolean array if elements is NumPy array
+        """
+        keys = elements.tolist() if is_array(elements) else elements
+        mask = numpy.zeros(len(keys), dtype=bool) if is_array(elements) else [False] * len(keys)
+        pending = {}  # positions of missed hashable elements by element
+        unhashable_positions = []
+        for position, element in enumerate(keys):
+            try:
+                if element in pending:
+                    pending[element].append(position)
+                    with self.lock:
+                        self.hits += 1
+                    continue
+                is_cached, result = self.lookup(element)
+            except TypeError:
+                unhashable_positions.append(position)
+                continue
+            if is_cached:
+                mask[position] = result
+            else:
+                pending[element] = [position]
+        missed_positions = [positions[0] for positions in pending.values()] + unhashable_positions
+        if missed_positions:
+            results = evaluate_many(compile_set(self.set), take(elements, missed_positions))
+            for (element, positions), result in zip(pending.items(), results):
+                self.store(element, bool(result))
+                for position in positions:
+                    mask[position] = result
+            for position, result in zip(unhashable_positions, results[len(pending):]):
+                mask[position] = result
+        return mask
+
+    def cache_info(self) -> CacheInfo:
+        """Returns cache statistics
+
+        Returns:
+            CacheInfo: hits, misses, evictions, maximum and current cache size
+        """
+        with self.lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self.cache))
+
+    def cache_clear(self):
+        """Clears cache and statistics"""
+        with self.lock:
+            self.cache.clear()
+            self.hits = self.misses = self.evictions = 0
 
 
 def empty_set() -> Set:
@@ -11,7 +334,7 @@ def empty_set() -> Set:
     Returns:
         Set: empty set
     """
-    return (lambda other_element: False)
+    return EMPTY_SET
 
 
 def singleton_set(element: Any) -> Set:
@@ -23,7 +346,10 @@ def singleton_set(element: Any) -> Set:
     Returns:
         Set: function that checks whether other_element is in set
     """
-    return (lambda other_element: element == other_element)
+    try:
+        return FiniteSet((element,))
+    except TypeError:
+        return (lambda other_element: element == other_element)
 
 
 def contains(set: Set, element: Any) -> bool:
@@ -49,7 +375,8 @@ def union(first_set: Set, second_set: Set) -> Set:
     Returns:
         Set: set created from union of two sets
     """
-    return (lambda other_element: first_set(other_element) or second_set(other_element))
+    combined = combine('union', first_set, second_set)
+    return SetExpression('union', [first_set, second_set]) if combined is None else combined
 
 
 def intersection(first_set: Set, second_set: Set) -> Set:
@@ -62,7 +389,8 @@ def intersection(first_set: Set, second_set: Set) -> Set:
     Returns:
         Set: set created from intersection of two sets
     """
-    return (lambda other_element: first_set(other_element) and second_set(other_element))
+    combined = combine('intersection', first_set, second_set)
+    return SetExpression('intersection', [first_set, second_set]) if combined is None else combined
 
 
 def difference(first_set: Set, second_set: Set) -> Set:
@@ -75,7 +403,8 @@ def difference(first_set: Set, second_set: Set) -> Set:
     Returns:
         Set: set created from difference of two sets
     """
-    return (lambda other_element: first_set(other_element) and not second_set(other_element))
+    combined = combine('difference', first_set, second_set)
+    return SetExpression('difference', [first_set, second_set]) if combined is None else combined
 
 
 def filter_set(set: Set, property: Property) -> Set:
@@ -88,11 +417,11 @@ def filter_set(set: Set, property: Property) -> Set:
     Returns:
         Set: subset of origin set for which property holds
     """
-    return (lambda other_element: set(other_element) and property(other_element))
+    return SetExpression('filter', [set], [property])
 
 
 def generate_set(elements_list: list) -> Set:
-    """Generates set from a list of elements
+    """Generates set from a list of elements. Set of hashable elements is backed by hash set
 
     Args:
         elements_list: list of elements
@@ -100,10 +429,407 @@ def generate_set(elements_list: list) -> Set:
     Returns:
         Set: set generated from a list of elements
     """
-    set = empty_set()
-    for element in elements_list:
-        set = union(set, singleton_set(element))
-    return set
+    elements = list(elements_list)
+    try:
+        return FiniteSet(elements)
+    except TypeError:
+        return (lambda other_element: any(element == other_element for element in elements))
+
+
+def combine(operation: str, first_set: Set, second_set: Set) -> Set:
+    """Combines sets with their own operation method, e.g. enumerable sets. Union and intersection are tried
+    with methods of both sets
+
+    Args:
+        operation (str): 'union', 'intersection' or 'difference'
+        first_set (Set): first operand
+        second_set (Set): second operand
+
+    Returns:
+        Set: combined set, None if sets don't implement operation for each other
+    """
+    for operand, other in ((first_set, second_set), (second_set, first_set))[:1 if operation == 'difference' else 2]:
+        method = getattr(operand, operation, None)
+        if method is not None and not isinstance(operand, SetExpression):
+            combined = method(other)
+            if combined is not NotImplemented:
+                return combined
+    return None
+
+
+def vectorized(property: Property) -> Property:
+    """Marks property as accepting NumPy arrays of elements, so contains_many checks arrays with one call
+
+    Args:
+        property (Property): property which returns boolean array of check results when called with array
+
+    Returns:
+        Property: property marked as vectorized
+    """
+    return VectorizedProperty(property)
+
+
+def memoized(set: Set, maxsize: int = DEFAULT_CACHE_SIZE, ttl: float = None) -> Set:
+    """Returns set which caches check results of set. Composed sets are cached as a whole,
+    parts of composed set can be wrapped separately before they are composed
+
+    Args:
+        set (Set): cached set
+        maxsize (int, optional): maximum number of cached results, None for unbounded cache.
+            Defaults to DEFAULT_CACHE_SIZE
+        ttl (float, optional): seconds cached result is valid for, None if results don't expire. Defaults to None
+
+    Returns:
+        Set: memoized set, its cache_info method returns cache statistics
+    """
+    return MemoizedSet(set, maxsize, ttl)
+
+
+def contains_many(set: Set, elements, subset: bool = False):
+    """Indicates which elements set contains walking set evaluation plan once for all elements
+
+    Args:
+        set (Set): set that is being checked
+        elements: iterable of elements or NumPy array
+        subset (bool, optional): return contained elements instead of mask. Defaults to False
+
+    Returns:
+        list of check results or contained elements, NumPy arrays if elements is NumPy array
+    """
+    if not is_array(elements):
+        elements = list(elements)
+    mask = evaluate_many(compile_set(set), elements)
+    if not subset:
+        return mask
+    if is_array(elements):
+        return elements[mask]
+    return [element for element, is_contained in zip(elements, mask) if is_contained]
+
+
+def evaluate_many(plan: Set, elements) -> list:
+    """Checks elements against compiled evaluation plan. Operands are checked only against elements which can
+    change the result: union operands against elements not found yet, other operands against elements found so far
+
+    Args:
+        plan (Set): compiled evaluation plan
+        elements: list of elements or NumPy array
+
+    Returns:
+        list of check results, NumPy boolean array if elements is NumPy array
+    """
+    if isinstance(plan, FiniteSet):
+        return evaluate_finite(plan, elements)
+    if isinstance(plan, UnionPlan):
+        mask = evaluate_finite(plan.finite_set, elements)
+        for predicate in plan.predicates:
+            positions = mask_positions(mask, False)
+            put(mask, positions, evaluate_many(predicate, take(elements, positions)))
+        return mask
+    if isinstance(plan, IntersectionPlan):
+        if plan.finite_set is not None:
+            mask = evaluate_finite(plan.finite_set, elements)
+        else:
+            mask = evaluate_many(plan.predicates[0], elements)
+        for predicate in plan.predicates[plan.finite_set is None:]:
+            positions = mask_positions(mask, True)
+            put(mask, positions, evaluate_many(predicate, take(elements, positions)))
+        return mask
+    if isinstance(plan, DifferencePlan):
+        mask = evaluate_many(plan.minuend, elements)
+        positions = mask_positions(mask, True)
+        subtracted = evaluate_many(plan.subtrahend, take(elements, positions))
+        put(mask, positions, ~subtracted if is_array(subtracted) else [not value for value in subtracted])
+        return mask
+    if hasattr(plan, 'evaluate_many'):  # memoized and enumerable sets
+        return plan.evaluate_many(elements)
+    if isinstance(plan, FilterPlan):
+        mask = evaluate_many(plan.source, elements)
+        for property in plan.properties:
+            positions = mask_positions(mask, True)
+            put(mask, positions, evaluate_predicate(property, take(elements, positions)))
+        return mask
+    return evaluate_predicate(plan, elements)
+
+
+def evaluate_finite(finite_set: FiniteSet, elements) -> list:
+    """Checks elements against finite set. Numeric arrays are checked with sorted array of numeric set elements if
+    both convert to common dtype exactly, otherwise every element is looked up in hash set
+
+    Args:
+        finite_set (FiniteSet): checked set
+        elements: list of elements or NumPy array
+
+    Returns:
+        list of check results, NumPy boolean array if elements is NumPy array
+    """
+    if not is_array(elements):
+        return [finite_set(element) for element in elements]
+    if elements.dtype.kind in 'biuf':
+        if finite_set.array is None:
+            finite_set.array = numeric_array(finite_set.elements)
+        array = finite_set.array
+        if array is not False and (array.dtype.kind == 'i' and elements.dtype.kind in 'bi' + 'u' * (
+                elements.dtype.itemsize < 8) or fits_float(array) and fits_float(elements)):
+            return numpy.isin(elements, array)
+    return numpy.fromiter((finite_set(element) for element in elements.tolist()), dtype=bool, count=len(elements))
+
+
+def numeric_array(elements):
+    """Converts numeric elements to sorted NumPy array, non-numeric elements are skipped since they can't be equal
+    to elements of numeric arrays
+
+    Args:
+        elements: set elements
+
+    Returns:
+        sorted int64 or float64 array, False if some numeric element doesn't convert to it exactly
+    """
+    numbers = []
+    for element in elements:
+        if isinstance(element, float) or isinstance(element, int) and -2 ** 63 <= element < 2 ** 63:
+            numbers.append(element)
+        elif isinstance(element, Number):  # ints beyond int64, Decimal, Fraction, complex
+            return False
+    if any(isinstance(number, float) for number in numbers):
+        if any(not isinstance(number, float) and abs(number) > EXACT_FLOAT_INT for number in numbers):
+            return False
+        return numpy.unique(numpy.array(numbers, dtype=numpy.float64))
+    return numpy.unique(numpy.array(numbers, dtype=numpy.int64))
+
+
+def fits_float(array) -> bool:
+    """Checks whether array values convert to float64 exactly
+
+    Args:
+        array: NumPy array of numbers
+
+    Returns:
+        bool: True if all values are floats up to 64 bits, booleans or ints up to EXACT_FLOAT_INT in magnitude
+    """
+    if array.dtype.kind in 'bf':
+        return array.dtype.itemsize <= 8
+    return not array.size or -EXACT_FLOAT_INT <= array.min() and array.max() <= EXACT_FLOAT_INT
+
+
+def evaluate_predicate(predicate: Property, elements) -> list:
+    """Checks elements against opaque predicate. Arrays are passed to vectorized predicates as a whole, other
+    predicates are called with every element converted to Python object, same as contains does
+    Raises ValueError if vectorized predicate doesn't return mask of the same shape as elements
+
+    Args:
+        predicate (Property): checked predicate or property
+        elements: list of elements or NumPy array
+
+    Returns:
+        list of check results, NumPy boolean array if elements is NumPy array
+    """
+    if not is_array(elements):
+        return [bool(predicate(element)) for element in elements]
+    if isinstance(predicate, VectorizedProperty):
+        mask = numpy.asarray(predicate.property(elements), dtype=bool)
+        if mask.shape != elements.shape:
+            raise ValueError('Vectorized property returned mask of shape {} for elements of shape {}'.format(
+                mask.shape, elements.shape))
+        return mask
+    return numpy.fromiter((bool(predicate(element)) for element in elements.tolist()), dtype=bool,
+                          count=len(elements))
+
+
+def is_array(elements) -> bool:
+    """Checks whether elements are NumPy array
+
+    Args:
+        elements: checked elements
+
+    Returns:
+        bool: True if NumPy is installed and elements are NumPy array
+    """
+    return numpy is not None and isinstance(elements, numpy.ndarray)
+
+
+def mask_positions(mask, value: bool):
+    """Finds positions of mask values equal to value
+
+    Args:
+        mask: list of booleans or NumPy boolean array
+        value (bool): searched value
+
+    Returns:
+        list of positions, NumPy array if mask is NumPy array
+    """
+    if is_array(mask):
+        return numpy.flatnonzero(mask if value else ~mask)
+    return [position for position, mask_value in enumerate(mask) if mask_value == value]
+
+
+def take(elements, positions):
+    """Selects elements at positions
+
+    Args:
+        elements: list of elements or NumPy array
+        positions: list of positions or NumPy array
+
+    Returns:
+        list of selected elements, NumPy array if elements is NumPy array
+    """
+    if is_array(elements):
+        return elements[positions]
+    return [elements[position] for position in positions]
+
+
+def put(mask, positions, values):
+    """Sets mask values at positions
+
+    Args:
+        mask: list of booleans or NumPy boolean array
+        positions: list of positions or NumPy array
+        values: list of booleans or NumPy boolean array
+    """
+    if is_array(mask):
+        mask[positions] = values
+        return
+    for position, value in zip(positions, values):
+        mask[position] = value
+
+
+def compile_set(set: Set) -> Set:
+    """Compiles evaluation plan of set built with set operations. Plans of nested sets are cached in them
+
+    Args:
+        set (Set): compiled set
+
+    Returns:
+        Set: evaluation plan, FiniteSet if all operands are finite, set itself if it is not SetExpression
+    """
+    if not isinstance(set, SetExpression):
+        return set
+    if set.plan is not None:
+        return set.plan
+    if set.operation == 'union':
+        plan = compile_union(flatten(set))
+    elif set.operation == 'intersection':
+        plan = compile_intersection(flatten(set))
+    elif set.operation == 'difference':
+        minuend, subtrahends = set, []
+        while isinstance(minuend, SetExpression) and minuend.operation == 'difference' and minuend.plan is None:
+            subtrahends.append(minuend.operands[1])
+            minuend = minuend.operands[0]
+        plan = compile_difference(compile_set(minuend), compile_union(subtrahends))
+    else:
+        source, properties = set, []
+        while isinstance(source, SetExpression) and source.operation == 'filter' and source.plan is None:
+            properties.extend(reversed(source.properties))
+            source = source.operands[0]
+        source = compile_set(source)
+        plan = EMPTY_SET if source is EMPTY_SET else FilterPlan(source, properties[::-1])
+    set.plan = plan
+    return plan
+
+
+def flatten(set: SetExpression) -> list:
+    """Collects operands of nested sets built with the same operation as set without recursion
+
+    Args:
+        set (SetExpression): union or intersection
+
+    Returns:
+        list: operands which are not built with the same operation
+    """
+    operands = []
+    stack = [set]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, SetExpression) and current.operation == set.operation and current.plan is None:
+            stack.extend(reversed(current.operands))
+        else:
+            operands.append(current)
+    return operands
+
+
+def compile_union(operands: list) -> Set:
+    """Compiles union of operands merging finite operands into one set
+
+    Args:
+        operands (list): united sets
+
+    Returns:
+        Set: evaluation plan
+    """
+    finite_sets = []
+    predicates = []
+    for operand in operands:
+        plan = compile_set(operand)
+        if isinstance(plan, FiniteSet):
+            finite_sets.append(plan.elements)
+        elif isinstance(plan, UnionPlan):
+            finite_sets.append(plan.finite_set.elements)
+            predicates.extend(plan.predicates)
+        else:
+            predicates.append(plan)
+    elements = frozenset().union(*finite_sets)
+    if not predicates:
+        return FiniteSet(elements) if elements else EMPTY_SET
+    if not elements and len(predicates) == 1:
+        return predicates[0]
+    return UnionPlan(FiniteSet(elements), predicates)
+
+
+def compile_intersection(operands: list) -> Set:
+    """Compiles intersection of operands intersecting finite operands into one set
+
+    Args:
+        operands (list): intersected sets
+
+    Returns:
+        Set: evaluation plan
+    """
+    finite_sets = []
+    predicates = []
+    for operand in operands:
+        plan = compile_set(operand)
+        if isinstance(plan, FiniteSet):
+            if not plan.elements:
+                return EMPTY_SET
+            finite_sets.append(plan.elements)
+        else:
+            predicates.append(plan)
+    finite_set = None
+    if finite_sets:
+        finite_sets.sort(key=len)
+        finite_set = FiniteSet(finite_sets[0].intersection(*finite_sets[1:]))
+        if not finite_set.elements:
+            return EMPTY_SET
+    if not predicates:
+        return finite_set
+    if finite_set is None and len(predicates) == 1:
+        return predicates[0]
+    return IntersectionPlan(finite_set, predicates)
+
+
+def compile_difference(minuend: Set, subtrahend: Set) -> Set:
+    """Compiles difference of compiled sets subtracting finite parts of subtrahend from finite minuend
+
+    Args:
+        minuend (Set): compiled origin set
+        subtrahend (Set): compiled union of subtracted sets
+
+    Returns:
+        Set: evaluation plan
+    """
+    if minuend is EMPTY_SET or subtrahend is EMPTY_SET:
+        return minuend
+    if isinstance(minuend, FiniteSet):
+        if isinstance(subtrahend, FiniteSet):
+            elements = minuend.elements - subtrahend.elements
+            return FiniteSet(elements) if elements else EMPTY_SET
+        if isinstance(subtrahend, UnionPlan):
+            minuend = FiniteSet(minuend.elements - subtrahend.finite_set.elements)
+            subtrahend = subtrahend.predicates[0] if len(subtrahend.predicates) == 1 else \
+                UnionPlan(EMPTY_SET, subtrahend.predicates)
+            if not minuend.elements:
+                return EMPTY_SET
+    return DifferencePlan(minuend, subtrahend)
+
 
 if __name__ == '__main__':
 
@@ -157,3 +883,177 @@ if __name__ == '__main__':
     assert not contains(set_filter, 1)
     assert contains(set_filter, 2)
     assert contains(set_filter, 3)
+
+    # test sets of many elements and long operation chains
+    set = generate_set(range(100000))
+    assert contains(set, 0) and contains(set, 99999) and not contains(set, 100000)
+    set = empty_set()
+    for i in range(10000):
+        set = union(set, singleton_set(i))
+    assert contains(set, 9999) and not contains(set, 10000)
+    assert isinstance(compile_set(set), FiniteSet)
+    set = generate_set(range(10000))
+    for i in range(5000):
+        set = filter_set(set, lambda element, i=i: element != i)
+    assert not contains(set, 5) and contains(set, 5000)
+
+    # test mixed finite and predicate operands
+    even = lambda element: element % 2 == 0
+    set = union(union(generate_set([1, 3]), even), difference(generate_set([5, 7, 9]), singleton_set(7)))
+    assert [element for element in range(12) if contains(set, element)] == [0, 1, 2, 3, 4, 5, 6, 8, 9, 10]
+    set = intersection(intersection(even, generate_set(range(10))), generate_set([2, 3, 4, 20]))
+    assert [element for element in range(30) if contains(set, element)] == [2, 4]
+    set = difference(difference(generate_set(range(10)), even), union(generate_set([1]), lambda element: element > 6))
+    assert [element for element in range(30) if contains(set, element)] == [3, 5]
+    set = difference(even, generate_set([2]))
+    assert contains(set, 4) and not contains(set, 2) and not contains(set, 3)
+
+    # test known empty operands short circuit predicates
+    calls = []
+    counting = lambda element: calls.append(element) or True
+    assert not contains(intersection(counting, empty_set()), 1)
+    assert not contains(filter_set(difference(generate_set([1]), generate_set([1])), counting), 1)
+    assert not contains(intersection(generate_set([1]), counting), 2)
+    assert calls == []
+
+    # test unhashable elements
+    set = generate_set([[1], [2]])
+    assert contains(set, [1]) and not contains(set, [3])
+    assert contains(singleton_set({1: 2}), {1: 2})
+    assert contains(generate_set([1, 2]), 1) and not contains(generate_set([1, 2]), [1])
+    set = generate_set(element for element in [1, [2], 3])
+    assert contains(set, 1) and contains(set, [2]) and contains(set, 3) and not contains(set, 4)
+
+    # test contains_many against contains
+    set = union(filter_set(difference(generate_set(range(0, 100, 3)), generate_set([9, 'a'])),
+                           lambda element: element % 2 == 0),
+                intersection(lambda element: element > 90, lambda element: element % 5 == 0))
+    elements = list(range(-5, 120)) + [2.0, 12.5]
+    expected_mask = [bool(contains(set, element)) for element in elements]
+    assert contains_many(set, elements) == expected_mask
+    assert contains_many(set, iter(elements), subset=True) == \
+        [element for element in elements if contains(set, element)]
+    assert contains_many(generate_set(['a']), ['a', 'b', [1]]) == [True, False, False]
+    assert contains_many(generate_set([[1]]), [[1], [2]]) == [True, False]
+    assert contains_many(empty_set(), []) == []
+    if numpy is not None:
+        for dtype in (numpy.int64, numpy.float64):
+            array = numpy.array(elements, dtype=dtype)
+            assert contains_many(set, array).tolist() == [bool(contains(set, element)) for element in array.tolist()]
+            assert contains_many(set, array, subset=True).tolist() == \
+                [element for element in array.tolist() if contains(set, element)]
+        words = numpy.array(['a', 'b', 'c'])
+        assert contains_many(union(generate_set(['a', 1]), lambda word: word == 'c'), words).tolist() == \
+            [True, False, True]
+        assert contains_many(generate_set(['a', 1, 2 ** 70]), numpy.array([1, 2])).tolist() == [True, False]
+        unsized = filter_set(generate_set(range(10)), lambda element: len(str(element)) == 1)  # scalar for arrays
+        assert contains_many(unsized, numpy.arange(12)).tolist() == [True] * 10 + [False] * 2
+        for finite_set, array, expected_mask in (
+                (generate_set([2 ** 53, 0.5]), numpy.array([2 ** 53 + 1, 2 ** 53]), [False, True]),
+                (generate_set([2 ** 53 + 1]), numpy.array([float(2 ** 53)]), [False]),
+                (generate_set([2 ** 53 + 1, 3]), numpy.array([2 ** 53 + 1, 3, 4], dtype=numpy.uint64),
+                 [True, True, False]),
+                (generate_set([2 ** 70, 1]), numpy.array([1, 2]), [True, False]),
+                (generate_set([Decimal('0.5'), Fraction(1, 4)]), numpy.array([0.5, 0.25, 1.0]), [True, True, False]),
+                (generate_set([0.5, 3]), numpy.array([3, 2 ** 53 + 1]), [True, False])):
+            assert contains_many(finite_set, array).tolist() == expected_mask == \
+                [contains(finite_set, element) for element in array.tolist()]
+        huge_squares = filter_set(generate_set([3500000000, 5]), lambda element: element * element > 10 ** 18)
+        assert contains(huge_squares, 3500000000)
+        assert contains_many(huge_squares, numpy.array([3500000000, 5])).tolist() == [True, False]
+        calls = []
+        recording = filter_set(generate_set(range(5)), lambda element: calls.append(element) or True)
+        contains_many(recording, numpy.arange(3))
+        assert calls == [0, 1, 2] and all(type(element) is int for element in calls)
+        even = vectorized(lambda element: element % 2 == 0)
+        assert contains(even, 4) and not contains(even, 3)
+        assert contains_many(filter_set(generate_set(range(5)), even), numpy.arange(6)).tolist() == \
+            [True, False, True, False, True, False]
+        try:
+            contains_many(vectorized(lambda elements: True), numpy.arange(3))
+            assert False
+        except ValueError:
+            pass
+
+    # test memoized sets
+    calls = []
+    counting = lambda element: calls.append(element) or element % 2 == 0
+    set = memoized(filter_set(generate_set(range(100)), counting), maxsize=3)
+    assert [contains(set, element) for element in (1, 2, 1, 2, 3, 4, 1, 200)] == \
+        [False, True, False, True, False, True, False, False]
+    assert calls == [1, 2, 3, 4, 1]
+    assert set.cache_info() == CacheInfo(hits=2, misses=6, evictions=3, maxsize=3, currsize=3)
+    assert contains(set, [2]) is False and set.cache_info().misses == 6
+    set.cache_clear()
+    assert set.cache_info() == CacheInfo(0, 0, 0, 3, 0)
+    assert contains_many(set, [2, 4, 2, 5]) == [True, True, True, False]
+    assert calls[-3:] == [2, 4, 5] and set.cache_info().hits == 1
+    if numpy is not None:
+        assert contains_many(union(set, generate_set([7])), numpy.arange(8)).tolist() == \
+            [True, False, True, False, True, False, True, True]
+    set = memoized(counting, ttl=0.05)
+    calls.clear()
+    contains(set, 1)
+    contains(set, 1)
+    sleep(0.1)
+    contains(set, 1)
+    assert calls == [1, 1] and set.cache_info().hits == 1
+    set = memoized(lambda element: element % 3 == 0, maxsize=50)
+    threads = [threading.Thread(target=lambda: [contains(set, element % 100) for element in range(2000)])
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cache_info = set.cache_info()
+    assert cache_info.hits + cache_info.misses == 8000 and cache_info.currsize == 50
+
+    # benchmark memoized expensive property with skewed repeated probes
+    pattern = re.compile(r'(\d)\1\1.*7$')
+    expensive = filter_set(lambda element: element >= 0, lambda element: bool(pattern.search(str(element ** 100))))
+    probes = [int(random.paretovariate(1)) for _ in range(200000)]
+    for description, set in (('filter_set', expensive), ('memoized filter_set', memoized(expensive, maxsize=4096))):
+        start_time = datetime.now()
+        for probe in probes:
+            contains(set, probe)
+        elapsed_time = (datetime.now() - start_time).total_seconds()
+        print('{} of {} probes: {} ({:.0f}ns per probe)'.format(
+            description, len(probes), readable_time(elapsed_time), elapsed_time / len(probes) * 10 ** 9))
+    cache_info = set.cache_info()
+    print('memoized filter_set cache: {} hits, {} misses, {} evictions, hit rate {:.1%}'.format(
+        cache_info.hits, cache_info.misses, cache_info.evictions, cache_info.hits / len(probes)))
+
+    # benchmark contains_many against contains calls, pass 10000000 as argument for 10^7 probes
+    set = filter_set(difference(union(generate_set(range(0, 10 ** 6, 3)),
+                                      vectorized(lambda element: element > 2 * 10 ** 6)),
+                                generate_set(range(0, 10 ** 6, 7))), vectorized(lambda element: element % 2 == 0))
+    for size in [int(size) for size in sys.argv[1:]] or [10 ** 5, 10 ** 6]:
+        probes = [element * 7919 % (3 * 10 ** 6) for element in range(size)]
+        benchmarks = [('contains calls', lambda: [contains(set, probe) for probe in probes]),
+                      ('contains_many of list', lambda: contains_many(set, probes))]
+        if numpy is not None:
+            array = numpy.array(probes)
+            benchmarks.append(('contains_many of NumPy array', lambda: contains_many(set, array)))
+        for description, benchmark in benchmarks:
+            start_time = datetime.now()
+            benchmark()
+            elapsed_time = (datetime.now() - start_time).total_seconds()
+            print('{} of {} probes: {} ({:.0f}ns per probe)'.format(
+                description, size, readable_time(elapsed_time), elapsed_time / size * 10 ** 9))
+
+    # benchmark contains latency
+    for size in [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]:
+        chain = empty_set()
+        for element in range(size):
+            chain = union(chain, singleton_set(element))
+        expression = filter_set(difference(union(chain, generate_set(range(size, 2 * size))), generate_set([0])),
+                                lambda element: element % 3 != 1)
+        queries = [element * 7 % (3 * size) for element in range(100000)]
+        for description, set in (('generate_set', generate_set(range(size))), ('union chain', chain),
+                                 ('composed expression', expression)):
+            start_time = datetime.now()
+            for query in queries:
+                contains(set, query)
+            elapsed_time = (datetime.now() - start_time).total_seconds()
+            print('{} of {} elements: 100 000 contains in {} ({:.0f}ns per call)'.format(
+                description, size, readable_time(elapsed_time), elapsed_time / len(queries) * 10 ** 9))
@@ -1,19 +1,46 @@
 """Linked list in object-oriented style"""
+import sys
+from datetime import datetime
+
+from utils.readable import readable_time
 
 
 class LinkedList:
     """Singly linked list realization
-    Supports index operators and iterating
+    Supports index operators and iterating. Slices are read, assigned and deleted in one pass through the list,
+    items can be inserted and removed while walking through the list with a cursor
+
+    Usage:
+        cursor = linked_list.cursor()
+        for item in cursor:
+            if item < 0:
+                cursor.remove()
 
         Attributes:
             header: header entry, only contains link to first entry
+            tail: last entry, header if list is empty
             size: size of the list
         """
 
     def __init__(self):
         self.header = Entry(None, None)
+        self.tail = self.header
         self.size = 0
 
+    @classmethod
+    def from_iterable(cls, iterable):
+        """Creates list of iterable items
+
+        Args:
+            iterable: items of new list
+
+        Returns:
+            LinkedList: new list
+        """
+        linked_list = cls()
+        linked_list.extend(iterable)
+        return linked_list
+
     def __iter__(self):
         """Iterates through list items. Starts at first item ignoring the header
 
@@ -36,10 +63,15 @@ class LinkedList:
             Any: item at given index
         """
         if isinstance(index, slice):
-            returned_list = LinkedList()
-            for slice_index in range(*index.indices(self.size)):
-                returned_list.add(self[slice_index])
-            return returned_list
+            slice_range = range(*index.indices(self.size))
+            positions = self.__ascending(slice_range)
+            items = []
+            for position, item in enumerate(self):
+                if position >= positions.stop:
+                    break
+                if position in positions:
+                    items.append(item)
+            return LinkedList.from_iterable(items if slice_range.step > 0 else reversed(items))
         else:
             if self.__bad_index(index):
                 raise IndexError("Index out of bounds:", index)
@@ -59,17 +91,28 @@ class LinkedList:
             value: item new value
         """
         if isinstance(key, slice):
-            value_index = 0
-            for slice_index in range(*key.indices(self.size)):
-                self[slice_index] = value[value_index]
-                value_index += 1
+            slice_range = range(*key.indices(self.size))
+            values = list(value)
+            if len(values) != len(slice_range):
+                raise ValueError('attempt to assign sequence of size {} to slice of size {}'.format(
+                    len(values), len(slice_range)))
+            positions = self.__ascending(slice_range)
+            values = iter(values if slice_range.step > 0 else reversed(values))
+            cursor = self.cursor()
+            for position, _ in enumerate(cursor):
+                if position >= positions.stop:
+                    break
+                if position in positions:
+                    cursor.replace(next(values))
         else:
             if self.__bad_index(key):
                 raise IndexError("Index out of bounds:", key)
+            if key < 0:
+                key += self.size
             current = self.header
             for entry_index in range(key):
                 current = current.next_item
-            current.next_item = Entry(value, current.next_item.next_item)
+            current.next_item.item = value
 
     def __delitem__(self, key):
         """Removes item at given index from the list
@@ -79,14 +122,23 @@ class LinkedList:
             index (int): item index
         """
         if isinstance(key, slice):
-            for slice_index in reversed(range(*key.indices(self.size))):
-                del self[slice_index]
+            positions = self.__ascending(range(*key.indices(self.size)))
+            cursor = self.cursor()
+            for position, _ in enumerate(cursor):
+                if position >= positions.stop:
+                    break
+                if position in positions:
+                    cursor.remove()
         else:
             if self.__bad_index(key):
                 raise IndexError("Index out of bounds:", key)
+            if key < 0:
+                key += self.size
             current = self.header
             for entry_index in range(key):
                 current = current.next_item
+            if current.next_item is self.tail:
+                self.tail = current
             current.next_item = current.next_item.next_item
             self.size -= 1
 
@@ -143,19 +195,60 @@ class LinkedList:
         """
         return not ((index >= -self.size) and (index < self.size))
 
+    @staticmethod
+    def __ascending(slice_range):
+        """Returns slice positions in ascending order
+
+        Args:
+            slice_range (range): positions of slice items
+
+        Returns:
+            range: same positions with positive step
+        """
+        return slice_range if slice_range.step > 0 else slice_range[::-1]
+
+    def cursor(self):
+        """Returns cursor positioned before the first item
+
+        Returns:
+            Cursor: list cursor
+        """
+        return Cursor(self)
+
     def add(self, item):
         """Adds item to the back of the list. Same as push
 
         Args:
             item: item value
         """
-        current = self.header
-        while current.next_item is not None:
-            current = current.next_item
         new_entry = Entry(item, None)
-        current.next_item = new_entry
+        self.tail.next_item = new_entry
+        self.tail = new_entry
         self.size += 1
 
+    def extend(self, iterable):
+        """Adds iterable items to the back of the list
+
+        Args:
+            iterable: added items
+        """
+        if iterable is self:
+            iterable = list(iterable)
+        tail = self.tail
+        added_count = 0
+        for item in iterable:
+            tail.next_item = Entry(item, None)
+            tail = tail.next_item
+            added_count += 1
+        self.tail = tail
+        self.size += added_count
+
+    def clear(self):
+        """Removes all items from the list"""
+        self.header.next_item = None
+        self.tail = self.header
+        self.size = 0
+
     def push_front(self, item):
         """Adds item to the front of the list
 
@@ -163,6 +256,8 @@ class LinkedList:
             item: item value
         """
         self.header.next_item = Entry(item, self.header.next_item)
+        if self.size == 0:
+            self.tail = self.header.next_item
         self.size += 1
 
     def pop_front(self):
@@ -174,9 +269,12 @@ class LinkedList:
         """
         if self.size == 0:
             raise IndexError('pop from empty list')
-        item = self[0]
-        del self[0]
-        return item
+        first = self.header.next_item
+        self.header.next_item = first.next_item
+        if first is self.tail:
+            self.tail = self.header
+        self.size -= 1
+        return first.item
 
     def push(self, item):
         """Adds item to the back of the list. Same as add
@@ -195,9 +293,14 @@ class LinkedList:
         """
         if self.size == 0:
             raise IndexError('pop from empty list')
-        item = self[-1]
-        del self[self.size - 1]
-        return item
+        last = self.tail
+        current = self.header
+        while current.next_item is not last:
+            current = current.next_item
+        current.next_item = None
+        self.tail = current
+        self.size -= 1
+        return last.item
 
     def index(self, item):
         """If item is present is list returns index of its first appearance
@@ -218,6 +321,85 @@ class LinkedList:
         raise ValueError('{} is not in the list'.format(item))
 
 
+class Cursor:
+    """Iterator through linked list items which can insert and remove items while walking through the list.
+    Cursor is positioned after the item returned last, removing or inserting items in other ways while cursor is used
+    leaves it in undefined state
+
+    Args:
+        linked_list (LinkedList): walked list
+
+    Attributes:
+        linked_list: walked list
+        current: entry of item returned last, list header before the first item
+        previous: entry before current
+    """
+
+    def __init__(self, linked_list):
+        self.linked_list = linked_list
+        self.current = linked_list.header
+        self.previous = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        """Moves cursor to the next item
+
+        Returns:
+            Any: next list item
+        """
+        if self.current.next_item is None:
+            raise StopIteration
+        self.previous = self.current
+        self.current = self.current.next_item
+        return self.current.item
+
+    def replace(self, item):
+        """Replaces item returned last
+        Raises ValueError if there is no such item
+
+        Args:
+            item: new item value
+        """
+        if self.previous is None:
+            raise ValueError('No item to replace')
+        self.current.item = item
+
+    def remove(self):
+        """Removes item returned last. Cursor stays positioned before the next item
+        Raises ValueError if there is no such item or it is already removed
+
+        Returns:
+            Any: removed item
+        """
+        if self.previous is None:
+            raise ValueError('No item to remove')
+        removed = self.current
+        self.previous.next_item = removed.next_item
+        if removed is self.linked_list.tail:
+            self.linked_list.tail = self.previous
+        self.linked_list.size -= 1
+        self.current = self.previous
+        self.previous = None
+        return removed.item
+
+    def insert(self, item):
+        """Inserts item after item returned last or at the front if no item was returned yet.
+        Cursor is positioned after inserted item, so it is not returned by iteration
+
+        Args:
+            item: inserted item value
+        """
+        new_entry = Entry(item, self.current.next_item)
+        self.current.next_item = new_entry
+        if self.current is self.linked_list.tail:
+            self.linked_list.tail = new_entry
+        self.linked_list.size += 1
+        self.previous = None
+        self.current = new_entry
+
+
 class Entry:
     """Linked list entry
 
@@ -229,12 +411,266 @@ class Entry:
         item: list item value
         next_item: link to the next list item
     """
+    __slots__ = ('item', 'next_item')
 
     def __init__(self, item, next_item):
         self.item = item
         self.next_item = next_item
 
 
+class DoublyLinkedList:
+    """Doubly linked list realization. Items are pushed and popped at both ends in O(1),
+    entries returned by push methods are handles which remove their item in O(1)
+    Supports index operators and iterating in both directions
+
+        Attributes:
+            header: header entry, links to first and last entries, list is circular through it
+            size: size of the list
+        """
+
+    def __init__(self):
+        self.header = DoublyLinkedEntry(None, None, None)
+        self.header.previous_item = self.header.next_item = self.header
+        self.size = 0
+
+    def __iter__(self):
+        """Iterates through list items from first to last
+
+        Returns:
+            Any: next list item
+        """
+        current = self.header.next_item
+        while current is not self.header:
+            yield current.item
+            current = current.next_item
+
+    def __reversed__(self):
+        """Iterates through list items from last to first
+
+        Returns:
+            Any: previous list item
+        """
+        current = self.header.previous_item
+        while current is not self.header:
+            yield current.item
+            current = current.previous_item
+
+    def __getitem__(self, index):
+        """Get list item by index. List is walked from the nearer end
+        Raises IndexError if index is out of bounds
+
+        Args:
+            index: item index
+
+        Returns:
+            Any: item at given index
+        """
+        return self.entry(index).item
+
+    def __setitem__(self, key, value):
+        """Set new value to list item
+        Raises IndexError if index is out of bounds
+
+        Args:
+            key: item index
+            value: item new value
+        """
+        self.entry(key).item = value
+
+    def __delitem__(self, key):
+        """Removes item at given index from the list
+        Raises IndexError if index is out of bounds
+
+        Args:
+            key (int): item index
+        """
+        self.remove_entry(self.entry(key))
+
+    def __contains__(self, item):
+        """Checks whether list contains item
+
+        Args:
+            item: checked item
+
+        Returns:
+            bool: True if list contains item, False otherwise
+        """
+        for entry in self:
+            if entry == item:
+                return True
+        return False
+
+    def __len__(self):
+        """Returns length of the list
+
+        Returns:
+            int: length of the list
+        """
+        return self.size
+
+    def __bool__(self):
+        """Returns boolean value of the list
+
+        Returns:
+            bool: False if list is empty, True otherwise
+        """
+        return self.size > 0
+
+    def __str__(self):
+        """Returns string representation of list
+
+        Returns:
+            str: list string representation. Eg: '[]', '[1, 2, 3]'
+        """
+        return '[{}]'.format(', '.join(str(item) for item in self))
+
+    def entry(self, index):
+        """Get list entry by index. List is walked from the nearer end
+        Raises IndexError if index is out of bounds
+
+        Args:
+            index (int): entry index
+
+        Returns:
+            DoublyLinkedEntry: entry at given index
+        """
+        if not -self.size <= index < self.size:
+            raise IndexError("Index out of bounds:", index)
+        if index < 0:
+            index += self.size
+        if index < self.size // 2:
+            current = self.header.next_item
+            for entry_index in range(index):
+                current = current.next_item
+        else:
+            current = self.header.previous_item
+            for entry_index in range(self.size - 1 - index):
+                current = current.previous_item
+        return current
+
+    def add(self, item):
+        """Adds item to the back of the list. Same as push
+
+        Args:
+            item: item value
+
+        Returns:
+            DoublyLinkedEntry: entry of added item
+        """
+        return self.__link(item, self.header.previous_item)
+
+    def push(self, item):
+        """Adds item to the back of the list. Same as add
+
+        Args:
+            item: item value
+
+        Returns:
+            DoublyLinkedEntry: entry of added item
+        """
+        return self.__link(item, self.header.previous_item)
+
+    def push_front(self, item):
+        """Adds item to the front of the list
+
+        Args:
+            item: item value
+
+        Returns:
+            DoublyLinkedEntry: entry of added item
+        """
+        return self.__link(item, self.header)
+
+    def pop(self):
+        """Removes last element from the list and returns its value
+        Raises IndexError if list is empty
+
+        Returns:
+            Any: original last item of the list
+        """
+        if self.size == 0:
+            raise IndexError('pop from empty list')
+        return self.remove_entry(self.header.previous_item)
+
+    def pop_front(self):
+        """Removes item from the front of the list and returns its value
+        Raises IndexError if list is empty
+
+        Returns:
+            Any: original first item of the list
+        """
+        if self.size == 0:
+            raise IndexError('pop from empty list')
+        return self.remove_entry(self.header.next_item)
+
+    def remove_entry(self, entry):
+        """Unlinks entry from the list. Entry should belong to the list and not be removed yet
+
+        Args:
+            entry (DoublyLinkedEntry): removed entry, e.g. returned by push
+
+        Returns:
+            Any: item of removed entry
+        """
+        entry.previous_item.next_item = entry.next_item
+        entry.next_item.previous_item = entry.previous_item
+        entry.previous_item = entry.next_item = None
+        self.size -= 1
+        return entry.item
+
+    def index(self, item):
+        """If item is present is list returns index of its first appearance
+        Raises ValueError if item is not in the list
+
+        Args:
+            item (Any): item to look for
+
+        Returns:
+            int: Items index in the list
+        """
+        for current_index, list_item in enumerate(self):
+            if list_item == item:
+                return current_index
+        raise ValueError('{} is not in the list'.format(item))
+
+    def __link(self, item, previous_entry):
+        """Links new entry after previous_entry
+
+        Args:
+            item: item value
+            previous_entry (DoublyLinkedEntry): entry new entry is linked after
+
+        Returns:
+            DoublyLinkedEntry: new entry
+        """
+        new_entry = DoublyLinkedEntry(item, previous_entry, previous_entry.next_item)
+        previous_entry.next_item.previous_item = new_entry
+        previous_entry.next_item = new_entry
+        self.size += 1
+        return new_entry
+
+
+class DoublyLinkedEntry:
+    """Doubly linked list entry
+
+    Args:
+        item: list item value
+        previous_item: link to the previous list item
+        next_item: link to the next list item
+
+    Attributes:
+        item: list item value
+        previous_item: link to the previous list item
+        next_item: link to the next list item
+    """
+    __slots__ = ('item', 'previous_item', 'next_item')
+
+    def __init__(self, item, previous_item, next_item):
+        self.item = item
+        self.previous_item = previous_item
+        self.next_item = next_item
+
+
 if __name__ == '__main__':
     # test if new list is empty
     linked_list = LinkedList()
@@ -358,3 +794,129 @@ if __name__ == '__main__':
     assert linked_list.pop_front() == 3
 
     assert len(linked_list) == 0
+
+    # test tail is kept by all operations
+    linked_list = LinkedList()
+    linked_list.add(1)
+    linked_list.pop_front()
+    linked_list.add(2)
+    linked_list.push_front(1)
+    linked_list.add(3)
+    assert linked_list.pop() == 3
+    linked_list.add(4)
+    del linked_list[2]
+    linked_list.add(5)
+    linked_list[2] = 6
+    linked_list.add(7)
+    assert str(linked_list) == '[1, 2, 6, 7]'
+    del linked_list[:]
+    linked_list.add(1)
+    assert str(linked_list) == '[1]'
+
+    # test slices against list
+    items = list(range(20))
+    for key in (slice(None), slice(3, 15), slice(None, None, 3), slice(15, 2, -2), slice(-5, None), slice(5, 5),
+                slice(None, None, -1), slice(2, 18, 4)):
+        linked_list = LinkedList.from_iterable(items)
+        assert list(linked_list[key]) == items[key]
+        linked_list[key] = [-item for item in items[key]]
+        expected = list(items)
+        expected[key] = [-item for item in items[key]]
+        assert list(linked_list) == expected
+        del linked_list[key]
+        del expected[key]
+        assert list(linked_list) == expected and len(linked_list) == len(expected)
+        linked_list.add(100)
+        assert linked_list[-1] == 100
+    linked_list = LinkedList.from_iterable([1, 2, 3])
+    try:
+        linked_list[:2] = [1]
+        assert False
+    except ValueError:
+        pass
+
+    # test negative indexes of __setitem__ and __delitem__
+    linked_list = LinkedList.from_iterable([1, 2, 3])
+    linked_list[-1] = 4
+    del linked_list[-3]
+    assert str(linked_list) == '[2, 4]'
+
+    # test extend and clear methods
+    linked_list = LinkedList()
+    linked_list.extend(range(3))
+    linked_list.extend(linked_list)
+    assert str(linked_list) == '[0, 1, 2, 0, 1, 2]' and len(linked_list) == 6
+    linked_list.clear()
+    assert len(linked_list) == 0 and str(linked_list) == '[]'
+    linked_list.add(1)
+    assert str(linked_list) == '[1]'
+
+    # test cursor
+    linked_list = LinkedList.from_iterable(range(10))
+    cursor = linked_list.cursor()
+    cursor.insert(-1)
+    for item in cursor:
+        if item % 2:
+            assert cursor.remove() == item
+        elif item == 4:
+            cursor.insert(5)
+        elif item == 8:
+            cursor.replace(80)
+    cursor.insert(10)
+    assert str(linked_list) == '[-1, 0, 2, 4, 5, 6, 80, 10]' and len(linked_list) == 8
+    linked_list.add(11)
+    assert linked_list[-1] == 11
+    try:
+        cursor = linked_list.cursor()
+        next(cursor)
+        cursor.remove()
+        cursor.remove()
+        assert False
+    except ValueError:
+        pass
+
+    # test DoublyLinkedList
+    doubly_linked_list = DoublyLinkedList()
+    assert str(doubly_linked_list) == '[]'
+    middle_entry = doubly_linked_list.push(2)
+    doubly_linked_list.push(3)
+    doubly_linked_list.push_front(1)
+    doubly_linked_list.add(4)
+    assert str(doubly_linked_list) == '[1, 2, 3, 4]'
+    assert list(reversed(doubly_linked_list)) == [4, 3, 2, 1]
+    assert doubly_linked_list[0] == 1 and doubly_linked_list[-1] == 4 and doubly_linked_list[2] == 3
+    assert doubly_linked_list.remove_entry(middle_entry) == 2
+    assert str(doubly_linked_list) == '[1, 3, 4]'
+    doubly_linked_list[1] = 5
+    del doubly_linked_list[-1]
+    assert str(doubly_linked_list) == '[1, 5]'
+    assert 5 in doubly_linked_list and doubly_linked_list.index(5) == 1
+    assert doubly_linked_list.pop() == 5
+    assert doubly_linked_list.pop_front() == 1
+    assert not doubly_linked_list
+    try:
+        doubly_linked_list.pop()
+        assert False
+    except IndexError:
+        pass
+
+    # benchmark slice operations which were O(n*k)
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    start_time = datetime.now()
+    linked_list = LinkedList.from_iterable(range(size))
+    copied_list = linked_list[::2]
+    linked_list[1::2] = copied_list
+    del linked_list[::3]
+    print('LinkedList slice get, set and delete of {} items:'.format(size),
+          readable_time((datetime.now() - start_time).total_seconds()))
+
+    # benchmark building list of 1 000 000 items and using it as a queue
+    for list_class in (LinkedList, DoublyLinkedList):
+        start_time = datetime.now()
+        queue = list_class()
+        for item in range(size):
+            queue.push(item)
+        while queue:
+            queue.pop_front()
+        print('{} queue of {} items:'.format(list_class.__name__, size),
+              readable_time((datetime.now() - start_time).total_seconds()))
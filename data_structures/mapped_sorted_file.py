@@ -0,0 +1,233 @@
+"""Memory-mapped view of sorted record file. Allows binary search over files without loading them into memory"""
+import mmap
+import os
+import struct
+import tempfile
+from array import array as typed_array
+
+from algorithms.binary_search import search, bisect_left, bisect_right
+
+OFFSET_FORMAT = 'Q'  # sidecar offset index stores native unsigned 64-bit record start offsets
+
+
+class MappedSortedFile:
+    """Read-only sequence of record keys of a file sorted by key. File is memory-mapped, records are read only when
+    accessed, so opening is O(1) and resident memory is proportional to pages touched.
+    Records are either fixed-width or variable-length, in which case record start offsets are taken from sidecar
+    offset index file. Key is unpacked from record with struct format or extracted with key function.
+    Mapped file should be closed after use, records returned by record method must be released before that
+
+    Usage:
+        with MappedSortedFile('keys.bin', record_size=16, key_format='>q') as keys:
+            index = keys.search(42)
+
+    Args:
+        path (str): path to sorted record file
+        record_size (int, optional): size of fixed-width records in bytes. Defaults to None
+        index_path (str, optional): path to offset index of variable-length records. Defaults to None
+        key_format (str, optional): struct format of key. Defaults to None
+        key_offset (int, optional): key offset inside record. Defaults to 0
+        key (callable, optional): function extracting key from record memoryview, used if key_format is None.
+            Defaults to bytes
+
+    Attributes:
+        size: number of records
+        view: memoryview of mapped file
+        offsets: memoryview of mapped offset index, None for fixed-width records
+    """
+
+    def __init__(self, path, record_size=None, index_path=None, key_format=None, key_offset=0, key=bytes):
+        if (record_size is None) == (index_path is None):
+            raise ValueError('Either record_size or index_path should be given')
+        self.record_size = record_size
+        self.key_struct = struct.Struct(key_format) if key_format else None
+        self.key_offset = key_offset
+        self.key = key
+        self.__mappings = []
+        self.view = self.__map(path, 'B')
+        if record_size is not None:
+            self.offsets = None
+            self.size = len(self.view) // record_size
+        else:
+            self.offsets = self.__map(index_path, OFFSET_FORMAT)
+            self.size = len(self.offsets)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.close()
+
+    def __len__(self):
+        """Returns number of records
+
+        Returns:
+            int: number of records
+        """
+        return self.size
+
+    def __getitem__(self, index):
+        """Get record key by index
+        Raises IndexError if index is out of bounds
+
+        Args:
+            index: record index
+
+        Returns:
+            Any: key of record at given index
+        """
+        start, end = self.__bounds(index)
+        if self.key_struct is not None:
+            return self.key_struct.unpack_from(self.view, start + self.key_offset)[0]
+        with self.view[start:end] as record:
+            return self.key(record)
+
+    def record(self, index):
+        """Returns record by index without copying
+        Raises IndexError if index is out of bounds
+
+        Args:
+            index: record index
+
+        Returns:
+            memoryview: record bytes view, should be released before file is closed
+        """
+        start, end = self.__bounds(index)
+        return self.view[start:end]
+
+    def search(self, key):
+        """Searches file for a record key and returns index of its leftmost occurrence
+
+        Args:
+            key: key to search for
+
+        Returns:
+            int: record index if key is found, -1 otherwise
+        """
+        return search(self, key)
+
+    def bisect_left(self, key):
+        """Finds index of first record which key is not less than key
+
+        Args:
+            key: key to search position for
+
+        Returns:
+            int: record index
+        """
+        return bisect_left(self, key)
+
+    def bisect_right(self, key):
+        """Finds index of first record which key is greater than key
+
+        Args:
+            key: key to search position for
+
+        Returns:
+            int: record index
+        """
+        return bisect_right(self, key)
+
+    def close(self):
+        """Releases views and closes mapped files"""
+        self.view.release()
+        if self.offsets is not None:
+            self.offsets.release()
+        for mapping in self.__mappings:
+            mapping.close()
+
+    def __bounds(self, index):
+        """Finds record start and end offsets in file
+
+        Args:
+            index (int): record index
+
+        Returns:
+            tuple: record start and end offsets
+        """
+        if not -self.size <= index < self.size:
+            raise IndexError('Index out of bounds:', index)
+        if index < 0:
+            index += self.size
+        if self.offsets is None:
+            start = index * self.record_size
+            return start, start + self.record_size
+        end = self.offsets[index + 1] if index + 1 < self.size else len(self.view)
+        return self.offsets[index], end
+
+    def __map(self, path, view_format):
+        """Memory-maps file for reading
+
+        Args:
+            path (str): mapped file path
+            view_format (str): memoryview format of file items
+
+        Returns:
+            memoryview: view of mapped file
+        """
+        with open(path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return memoryview(b'').cast(view_format)
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__mappings.append(mapping)
+        return memoryview(mapping).cast(view_format)
+
+
+def build_offset_index(path, index_path):
+    """Writes sidecar offset index of newline delimited records file in one streaming pass
+
+    Args:
+        path (str): path to newline delimited records file
+        index_path (str): path offset index is written to
+    """
+    offsets = typed_array(OFFSET_FORMAT)
+    offset = 0
+    with open(path, 'rb') as file, open(index_path, 'wb') as index_file:
+        for line in file:
+            offsets.append(offset)
+            offset += len(line)
+            if len(offsets) >= 65536:
+                offsets.tofile(index_file)
+                del offsets[:]
+        offsets.tofile(index_file)
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as directory:
+        # test fixed-width records with struct key
+        path = os.path.join(directory, 'fixed')
+        keys = sorted(key * 3 for key in range(1000))
+        with open(path, 'wb') as file:
+            for key in keys:
+                file.write(struct.pack('>q', key) + b'payload!')
+        with MappedSortedFile(path, record_size=16, key_format='>q') as mapped_keys:
+            assert len(mapped_keys) == 1000
+            assert mapped_keys[0] == 0
+            assert mapped_keys[-1] == 2997
+            for key in (0, 3, 1500, 2997, 1, -1, 3000):
+                assert mapped_keys.search(key) == search(keys, key)
+            assert mapped_keys.bisect_left(4) == mapped_keys.bisect_right(3) == 2
+            with mapped_keys.record(1) as record:
+                assert bytes(record) == struct.pack('>q', 3) + b'payload!'
+
+        # test variable-length records with offset index
+        path = os.path.join(directory, 'lines')
+        index_path = os.path.join(directory, 'lines.index')
+        lines = ['{:04d}:{}'.format(key, 'x' * (key % 7)).encode() for key in range(500)]
+        with open(path, 'wb') as file:
+            file.write(b'\n'.join(lines) + b'\n')
+        build_offset_index(path, index_path)
+        with MappedSortedFile(path, index_path=index_path, key=lambda record: bytes(record).split(b':')[0]) \
+                as mapped_keys:
+            assert len(mapped_keys) == 500
+            assert mapped_keys.search(b'0042') == 42
+            assert mapped_keys.search(b'0501') == -1
+            with mapped_keys.record(-1) as record:
+                assert bytes(record) == lines[-1] + b'\n'
+
+        # test empty file
+        path = os.path.join(directory, 'empty')
+        open(path, 'wb').close()
+        with MappedSortedFile(path, record_size=8, key_format='q') as mapped_keys:
+            assert len(mapped_keys) == 0
+            assert mapped_keys.search(1) == -1
@@ -0,0 +1,483 @@
+"""Indexable skip list. Linked list with additional randomly chosen express links, every link stores its width, number
+of items it skips. Positional access goes down from the highest level adding widths of passed links, so it finds
+item at any position without walking through every item before it
+Expected performance: O(lg(n)) positional get, set, insert and delete, O(n) iteration
+"""
+import random
+import sys
+from datetime import datetime
+
+from data_structures.linked_list import LinkedList
+from utils.readable import readable_time
+
+MAX_LEVEL = 32  # maximum number of levels of an entry, enough for 2^32 items
+
+
+class IndexableSkipList:
+    """Indexable skip list realization with the same interface as LinkedList and positional insert
+    Supports index operators and iterating. Links of last entries of every level lead to the end of the list,
+    their width is the distance to the position after the last item
+
+        Attributes:
+            header: header entry, contains links of all levels to first entries
+            size: size of the list
+        """
+
+    def __init__(self):
+        self.header = SkipListEntry(None, 0)
+        self.size = 0
+
+    @classmethod
+    def from_iterable(cls, iterable):
+        """Creates list of iterable items
+
+        Args:
+            iterable: items of new list
+
+        Returns:
+            IndexableSkipList: new list
+        """
+        skip_list = cls()
+        skip_list.extend(iterable)
+        return skip_list
+
+    def __iter__(self):
+        """Iterates through list items
+
+        Returns:
+            Any: next list item
+        """
+        current = self.header.next_items[0] if self.header.next_items else None
+        while current is not None:
+            yield current.item
+            current = current.next_items[0]
+
+    def __getitem__(self, index):
+        """Get list item by index
+        Raises IndexError if index is out of bounds
+
+        Args:
+            index: item index
+
+        Returns:
+            Any: item at given index
+        """
+        if isinstance(index, slice):
+            slice_range = range(*index.indices(self.size))
+            items = list(self.__walk(slice_range))
+            return IndexableSkipList.from_iterable(items if slice_range.step > 0 else reversed(items))
+        return self.__entry(index).item
+
+    def __setitem__(self, key, value):
+        """Set new value to list item
+        Raises IndexError if index is out of bounds
+
+        Args:
+            key: item index
+            value: item new value
+        """
+        if isinstance(key, slice):
+            slice_range = range(*key.indices(self.size))
+            values = list(value)
+            if len(values) != len(slice_range):
+                raise ValueError('attempt to assign sequence of size {} to slice of size {}'.format(
+                    len(values), len(slice_range)))
+            values = iter(values if slice_range.step > 0 else reversed(values))
+            for entry in self.__walk_entries(slice_range):
+                entry.item = next(values)
+        else:
+            self.__entry(key).item = value
+
+    def __delitem__(self, key):
+        """Removes item at given index from the list
+        Raises IndexError if index is out of bounds
+
+        Args:
+            key: item index
+        """
+        if isinstance(key, slice):
+            slice_range = range(*key.indices(self.size))
+            for position in sorted(slice_range, reverse=True):
+                self.__remove(position)
+        else:
+            self.__remove(self.__normalize(key))
+
+    def __contains__(self, item):
+        """Checks whether list contains item
+
+        Args:
+            item: checked item
+
+        Returns:
+            bool: True if list contains item, False otherwise
+        """
+        for entry in self:
+            if entry == item:
+                return True
+        return False
+
+    def __len__(self):
+        """Returns length of the list
+
+        Returns:
+            int: length of the list
+        """
+        return self.size
+
+    def __bool__(self):
+        """Returns boolean value of the list
+
+        Returns:
+            bool: False if list is empty, True otherwise
+        """
+        return self.size > 0
+
+    def __str__(self):
+        """Returns string representation of list
+
+        Returns:
+            str: list string representation. Eg: '[]', '[1, 2, 3]'
+        """
+        return '[{}]'.format(', '.join(str(item) for item in self))
+
+    def insert(self, index, item):
+        """Inserts item before item at given index. Index equal to list size adds item to the back
+        Raises IndexError if index is out of bounds
+
+        Args:
+            index (int): position of inserted item
+            item: item value
+        """
+        if not -self.size <= index <= self.size:
+            raise IndexError("Index out of bounds:", index)
+        if index < 0:
+            index += self.size
+        new_entry = SkipListEntry(item, random_level())
+        self.__grow(len(new_entry.next_items))
+        predecessors, positions = self.__path(index)
+        for level, (predecessor, position) in enumerate(zip(predecessors, positions)):
+            if level < len(new_entry.next_items):
+                new_entry.next_items[level] = predecessor.next_items[level]
+                new_entry.widths[level] = position + predecessor.widths[level] - index
+                predecessor.next_items[level] = new_entry
+                predecessor.widths[level] = index + 1 - position
+            else:
+                predecessor.widths[level] += 1
+        self.size += 1
+
+    def add(self, item):
+        """Adds item to the back of the list. Same as push
+
+        Args:
+            item: item value
+        """
+        self.insert(self.size, item)
+
+    def push(self, item):
+        """Adds item to the back of the list. Same as add
+
+        Args:
+            item: item value
+        """
+        self.insert(self.size, item)
+
+    def push_front(self, item):
+        """Adds item to the front of the list
+
+        Args:
+            item: item value
+        """
+        self.insert(0, item)
+
+    def extend(self, iterable):
+        """Adds iterable items to the back of the list linking them after last entries of every level
+
+        Args:
+            iterable: added items
+        """
+        if iterable is self:
+            iterable = list(iterable)
+        last_entries, last_positions = self.__path(self.size)
+        position = self.size
+        for item in iterable:
+            position += 1
+            new_entry = SkipListEntry(item, random_level())
+            height = len(new_entry.next_items)
+            if height > len(last_entries):
+                self.__grow(height)
+                last_entries.extend([self.header] * (height - len(last_entries)))
+                last_positions.extend([0] * (height - len(last_positions)))
+            for level in range(height):
+                last_entries[level].next_items[level] = new_entry
+                last_entries[level].widths[level] = position - last_positions[level]
+                last_entries[level] = new_entry
+                last_positions[level] = position
+        self.size = position
+        for level, (last_entry, last_position) in enumerate(zip(last_entries, last_positions)):
+            last_entry.widths[level] = self.size + 1 - last_position
+
+    def clear(self):
+        """Removes all items from the list"""
+        self.header = SkipListEntry(None, 0)
+        self.size = 0
+
+    def pop_front(self):
+        """Removes item from the front of the list and returns its value
+        Raises IndexError if list is empty
+
+        Returns:
+            Any: original first item of the list
+        """
+        if self.size == 0:
+            raise IndexError('pop from empty list')
+        return self.__remove(0)
+
+    def pop(self):
+        """Removes last element from the list and returns its value
+        Raises IndexError if list is empty
+
+        Returns:
+            Any: original last item of the list
+        """
+        if self.size == 0:
+            raise IndexError('pop from empty list')
+        return self.__remove(self.size - 1)
+
+    def index(self, item):
+        """If item is present is list returns index of its first appearance
+        Raises ValueError if item is not in the list
+
+        Args:
+            item (Any): item to look for
+
+        Returns:
+            int: Items index in the list
+        """
+        for current_index, list_item in enumerate(self):
+            if list_item == item:
+                return current_index
+        raise ValueError('{} is not in the list'.format(item))
+
+    def __normalize(self, index):
+        """Checks index and converts negative index to positive
+        Raises IndexError if index is out of bounds
+
+        Args:
+            index (int): item index
+
+        Returns:
+            int: non-negative item index
+        """
+        if not -self.size <= index < self.size:
+            raise IndexError("Index out of bounds:", index)
+        return index + self.size if index < 0 else index
+
+    def __entry(self, index):
+        """Finds entry by index
+        Raises IndexError if index is out of bounds
+
+        Args:
+            index (int): entry index
+
+        Returns:
+            SkipListEntry: entry at given index
+        """
+        index = self.__normalize(index)
+        current = self.header
+        position = 0  # header position, item at index i is at position i + 1
+        for level in reversed(range(len(current.next_items))):
+            while position + current.widths[level] <= index + 1:
+                position += current.widths[level]
+                current = current.next_items[level]
+        return current
+
+    def __path(self, index):
+        """Finds last entries of every level which are before position of item at index
+
+        Args:
+            index (int): item index, may be equal to list size
+
+        Returns:
+            tuple: lists of entries and their positions by level
+        """
+        height = len(self.header.next_items)
+        predecessors = [self.header] * height
+        positions = [0] * height
+        current = self.header
+        position = 0
+        for level in reversed(range(height)):
+            while position + current.widths[level] <= index:
+                position += current.widths[level]
+                current = current.next_items[level]
+            predecessors[level] = current
+            positions[level] = position
+        return predecessors, positions
+
+    def __remove(self, index):
+        """Unlinks entry at index
+
+        Args:
+            index (int): non-negative entry index
+
+        Returns:
+            Any: removed item
+        """
+        predecessors, _ = self.__path(index)
+        removed = predecessors[0].next_items[0]
+        for level, predecessor in enumerate(predecessors):
+            if predecessor.next_items[level] is removed:
+                predecessor.next_items[level] = removed.next_items[level]
+                predecessor.widths[level] += removed.widths[level] - 1
+            else:
+                predecessor.widths[level] -= 1
+        self.size -= 1
+        return removed.item
+
+    def __grow(self, height):
+        """Adds header levels up to height, links of new levels lead to the end of the list
+
+        Args:
+            height (int): required number of levels
+        """
+        while len(self.header.next_items) < height:
+            self.header.next_items.append(None)
+            self.header.widths.append(self.size + 1)
+
+    def __walk_entries(self, slice_range):
+        """Iterates through entries at slice positions in ascending order
+
+        Args:
+            slice_range (range): slice positions
+
+        Returns:
+            SkipListEntry: next entry of the slice
+        """
+        if not slice_range:
+            return
+        positions = slice_range if slice_range.step > 0 else slice_range[::-1]
+        current = self.__entry(positions[0])
+        for position in range(positions[0], positions[-1] + 1):
+            if position in positions:
+                yield current
+            current = current.next_items[0]
+
+    def __walk(self, slice_range):
+        """Iterates through items at slice positions in ascending order
+
+        Args:
+            slice_range (range): slice positions
+
+        Returns:
+            Any: next item of the slice
+        """
+        for entry in self.__walk_entries(slice_range):
+            yield entry.item
+
+
+class SkipListEntry:
+    """Skip list entry
+
+    Args:
+        item: list item value
+        height: number of entry levels
+
+    Attributes:
+        item: list item value
+        next_items: links to the next entries of every level
+        widths: distances to the next entries of every level
+    """
+    __slots__ = ('item', 'next_items', 'widths')
+
+    def __init__(self, item, height):
+        self.item = item
+        self.next_items = [None] * height
+        self.widths = [0] * height
+
+
+def random_level():
+    """Returns random entry height, height h has probability 2^-h
+
+    Returns:
+        int: entry height from 1 to MAX_LEVEL
+    """
+    bits = random.getrandbits(MAX_LEVEL - 1) | (1 << (MAX_LEVEL - 1))
+    return (bits & -bits).bit_length()
+
+
+if __name__ == '__main__':
+    # test operations against list
+    items = list(range(50))
+    skip_list = IndexableSkipList.from_iterable(items)
+    assert len(skip_list) == 50 and list(skip_list) == items
+    assert skip_list[0] == 0 and skip_list[-1] == 49 and skip_list[17] == 17
+    for key in (slice(None), slice(3, 45), slice(None, None, 3), slice(45, 2, -2), slice(-5, None), slice(5, 5)):
+        assert list(skip_list[key]) == items[key]
+    skip_list[45:2:-3] = [-item for item in items[45:2:-3]]
+    items[45:2:-3] = [-item for item in items[45:2:-3]]
+    assert list(skip_list) == items
+    for _ in range(2000):
+        operation = random.randrange(7)
+        if operation == 0:
+            position = random.randint(-len(items), len(items))
+            skip_list.insert(position, position)
+            items.insert(position, position)
+        elif operation == 1:
+            skip_list.push_front(-1)
+            items.insert(0, -1)
+        elif operation == 2:
+            skip_list.push(-2)
+            items.append(-2)
+        elif operation == 3 and items:
+            assert skip_list.pop() == items.pop()
+        elif operation == 4 and items:
+            assert skip_list.pop_front() == items.pop(0)
+        elif operation == 5 and items:
+            position = random.randrange(-len(items), len(items))
+            del skip_list[position]
+            del items[position]
+        elif operation == 6 and items:
+            position = random.randrange(-len(items), len(items))
+            skip_list[position] = -3
+            items[position] = -3
+            assert skip_list[position] == -3
+        assert len(skip_list) == len(items)
+    assert list(skip_list) == items
+    assert [skip_list[position] for position in range(len(items))] == items
+    skip_list.extend(range(100))
+    items.extend(range(100))
+    del skip_list[1::3]
+    del items[1::3]
+    assert list(skip_list) == items and [skip_list[position] for position in range(len(items))] == items
+    assert skip_list.index(items[-1]) == items.index(items[-1]) and items[-1] in skip_list
+    skip_list.clear()
+    assert str(skip_list) == '[]' and not skip_list
+    skip_list.insert(0, 1)
+    skip_list.extend(skip_list)
+    assert str(skip_list) == '[1, 1]'
+    try:
+        skip_list[2]
+        assert False
+    except IndexError:
+        pass
+
+    # benchmark random positional get, set, insert and delete against LinkedList and list
+    sizes = [int(size) for size in sys.argv[1:]] or [10 ** 5, 10 ** 6]
+    for size in sizes:
+        queries = [random.randrange(size // 2) for _ in range(10000)]
+        for description, build in (('list', lambda: list(range(size))),
+                                   ('LinkedList', lambda: LinkedList.from_iterable(range(size))),
+                                   ('IndexableSkipList', lambda: IndexableSkipList.from_iterable(range(size)))):
+            built = build()
+            operations_count = 100 if description == 'LinkedList' else len(queries)
+            start_time = datetime.now()
+            for query in queries[:operations_count]:
+                built[query] = built[query]
+                del built[query]
+                if description == 'LinkedList':
+                    built.push_front(query)
+                else:
+                    built.insert(query, query)
+            elapsed_time = (datetime.now() - start_time).total_seconds()
+            print('{} of {} items: {} rounds of get, set, delete and insert in {} ({:.0f}ns per round)'.format(
+                description, size, operations_count, readable_time(elapsed_time),
+                elapsed_time / operations_count * 10 ** 9))
@@ -0,0 +1,445 @@
+"""Unrolled linked list. Every list node stores a chunk of up to capacity items, so there are capacity times fewer
+node objects and neighbouring items are stored next to each other. Positional access uses chunk index: list of
+chunks with their start positions which is searched with binary search and rebuilt after chunks change
+Expected performance: O(1) amortized push and pop at the back, O(lg(n/B)) positional access if chunks didn't change
+since last access, O(n/B) otherwise
+"""
+import random
+import sys
+import tracemalloc
+from bisect import bisect_right
+from datetime import datetime
+
+from data_structures.linked_list import LinkedList
+from utils.readable import readable_size, readable_time
+
+CHUNK_CAPACITY = 64  # default maximum number of items in a chunk
+
+
+class UnrolledLinkedList:
+    """Unrolled linked list realization with the same interface as LinkedList
+    Supports index operators and iterating
+
+        Args:
+            capacity (int, optional): maximum number of items in a chunk. Defaults to CHUNK_CAPACITY
+
+        Attributes:
+            header: header chunk, only contains link to first chunk
+            tail: last chunk, header if list is empty
+            size: size of the list
+            capacity: maximum number of items in a chunk
+            chunks: chunk index, list of chunks, None if it should be rebuilt
+            starts: list of start positions of indexed chunks
+        """
+
+    def __init__(self, capacity=CHUNK_CAPACITY):
+        if capacity < 2:
+            raise ValueError('Chunk capacity should be at least 2')
+        self.capacity = capacity
+        self.header = UnrolledChunk([], None)
+        self.tail = self.header
+        self.size = 0
+        self.chunks = []
+        self.starts = []
+
+    @classmethod
+    def from_iterable(cls, iterable, capacity=CHUNK_CAPACITY):
+        """Creates list of iterable items
+
+        Args:
+            iterable: items of new list
+            capacity (int, optional): maximum number of items in a chunk. Defaults to CHUNK_CAPACITY
+
+        Returns:
+            UnrolledLinkedList: new list
+        """
+        linked_list = cls(capacity)
+        linked_list.extend(iterable)
+        return linked_list
+
+    def __iter__(self):
+        """Iterates through list items
+
+        Returns:
+            Any: next list item
+        """
+        chunk = self.header.next_chunk
+        while chunk is not None:
+            yield from chunk.items
+            chunk = chunk.next_chunk
+
+    def __getitem__(self, index):
+        """Get list item by index
+        Raises IndexError if index is out of bounds
+
+        Args:
+            index: item index
+
+        Returns:
+            Any: item at given index
+        """
+        if isinstance(index, slice):
+            slice_range = range(*index.indices(self.size))
+            if not slice_range:
+                return UnrolledLinkedList(self.capacity)
+            first, last = min(slice_range[0], slice_range[-1]), max(slice_range[0], slice_range[-1])
+            chunk_index, offset = self.__locate(first)
+            items = []
+            while len(items) <= last - first + offset:
+                items.extend(self.chunks[chunk_index].items)
+                chunk_index += 1
+            step = slice_range.step
+            selected = items[offset:offset + last - first + 1:abs(step)]
+            return UnrolledLinkedList.from_iterable(selected if step > 0 else reversed(selected), self.capacity)
+        chunk_index, offset = self.__locate(index)
+        return self.chunks[chunk_index].items[offset]
+
+    def __setitem__(self, key, value):
+        """Set new value to list item
+        Raises IndexError if index is out of bounds
+
+        Args:
+            key: item index
+            value: item new value
+        """
+        if isinstance(key, slice):
+            slice_range = range(*key.indices(self.size))
+            values = list(value)
+            if len(values) != len(slice_range):
+                raise ValueError('attempt to assign sequence of size {} to slice of size {}'.format(
+                    len(values), len(slice_range)))
+            for position, item in zip(slice_range, values):
+                chunk_index, offset = self.__locate(position)
+                self.chunks[chunk_index].items[offset] = item
+        else:
+            chunk_index, offset = self.__locate(key)
+            self.chunks[chunk_index].items[offset] = value
+
+    def __delitem__(self, key):
+        """Removes item at given index from the list
+        Raises IndexError if index is out of bounds
+
+        Args:
+            key: item index
+        """
+        if isinstance(key, slice):
+            positions = range(*key.indices(self.size))
+            if positions:
+                kept_items = [item for position, item in enumerate(self) if position not in positions]
+                self.clear()
+                self.extend(kept_items)
+            return
+        chunk_index, offset = self.__locate(key)
+        chunk = self.chunks[chunk_index]
+        del chunk.items[offset]
+        self.size -= 1
+        previous = self.chunks[chunk_index - 1] if chunk_index else self.header
+        self.__compact(previous, chunk)
+
+    def __contains__(self, item):
+        """Checks whether list contains item
+
+        Args:
+            item: checked item
+
+        Returns:
+            bool: True if list contains item, False otherwise
+        """
+        chunk = self.header.next_chunk
+        while chunk is not None:
+            if item in chunk.items:
+                return True
+            chunk = chunk.next_chunk
+        return False
+
+    def __len__(self):
+        """Returns length of the list
+
+        Returns:
+            int: length of the list
+        """
+        return self.size
+
+    def __bool__(self):
+        """Returns boolean value of the list
+
+        Returns:
+            bool: False if list is empty, True otherwise
+        """
+        return self.size > 0
+
+    def __str__(self):
+        """Returns string representation of list
+
+        Returns:
+            str: list string representation. Eg: '[]', '[1, 2, 3]'
+        """
+        return '[{}]'.format(', '.join(str(item) for item in self))
+
+    def add(self, item):
+        """Adds item to the back of the list. Same as push
+
+        Args:
+            item: item value
+        """
+        if len(self.tail.items) >= self.capacity or self.tail is self.header:
+            self.__append_chunk()
+        self.tail.items.append(item)
+        self.size += 1
+
+    def push(self, item):
+        """Adds item to the back of the list. Same as add
+
+        Args:
+            item: item value
+        """
+        self.add(item)
+
+    def extend(self, iterable):
+        """Adds iterable items to the back of the list
+
+        Args:
+            iterable: added items
+        """
+        if iterable is self:
+            iterable = list(iterable)
+        for item in iterable:
+            self.add(item)
+
+    def clear(self):
+        """Removes all items from the list"""
+        self.header.next_chunk = None
+        self.tail = self.header
+        self.size = 0
+        self.chunks = []
+        self.starts = []
+
+    def push_front(self, item):
+        """Adds item to the front of the list
+
+        Args:
+            item: item value
+        """
+        first = self.header.next_chunk
+        if first is None or len(first.items) >= self.capacity:
+            first = UnrolledChunk([], first)
+            self.header.next_chunk = first
+            if self.tail is self.header:
+                self.tail = first
+        first.items.insert(0, item)
+        self.size += 1
+        self.chunks = None
+
+    def pop_front(self):
+        """Removes item from the front of the list and returns its value
+        Raises IndexError if list is empty
+
+        Returns:
+            Any: original first item of the list
+        """
+        if self.size == 0:
+            raise IndexError('pop from empty list')
+        first = self.header.next_chunk
+        item = first.items.pop(0)
+        self.size -= 1
+        self.__compact(self.header, first)
+        return item
+
+    def pop(self):
+        """Removes last element from the list and returns its value
+        Raises IndexError if list is empty
+
+        Returns:
+            Any: original last item of the list
+        """
+        if self.size == 0:
+            raise IndexError('pop from empty list')
+        item = self.tail.items.pop()
+        self.size -= 1
+        if not self.tail.items:
+            if self.chunks is not None:
+                self.chunks.pop()
+                self.starts.pop()
+            self.tail = self.chunks[-1] if self.chunks else self.__previous(self.tail)
+            self.tail.next_chunk = None
+        return item
+
+    def index(self, item):
+        """If item is present is list returns index of its first appearance
+        Raises ValueError if item is not in the list
+
+        Args:
+            item (Any): item to look for
+
+        Returns:
+            int: Items index in the list
+        """
+        start = 0
+        chunk = self.header.next_chunk
+        while chunk is not None:
+            if item in chunk.items:
+                return start + chunk.items.index(item)
+            start += len(chunk.items)
+            chunk = chunk.next_chunk
+        raise ValueError('{} is not in the list'.format(item))
+
+    def __append_chunk(self):
+        """Links new empty chunk after the last chunk keeping chunk index valid"""
+        new_chunk = UnrolledChunk([], None)
+        self.tail.next_chunk = new_chunk
+        self.tail = new_chunk
+        if self.chunks is not None:
+            self.chunks.append(new_chunk)
+            self.starts.append(self.size)
+
+    def __compact(self, previous, chunk):
+        """Unlinks empty chunk or merges chunk into next chunk if it is less than quarter full and they fit into one.
+        Invalidates chunk index
+
+        Args:
+            previous (UnrolledChunk): chunk before compacted chunk or header
+            chunk (UnrolledChunk): compacted chunk
+        """
+        self.chunks = None
+        next_chunk = chunk.next_chunk
+        if not chunk.items:
+            previous.next_chunk = next_chunk
+        elif len(chunk.items) < self.capacity // 4 and next_chunk is not None and \
+                len(chunk.items) + len(next_chunk.items) <= self.capacity:
+            chunk.items.extend(next_chunk.items)
+            chunk.next_chunk = next_chunk.next_chunk
+            next_chunk = chunk.next_chunk
+        else:
+            return
+        if next_chunk is None:
+            self.tail = previous if not chunk.items else chunk
+
+    def __previous(self, chunk):
+        """Finds chunk before given chunk walking from the header
+
+        Args:
+            chunk (UnrolledChunk): chunk of the list
+
+        Returns:
+            UnrolledChunk: previous chunk or header
+        """
+        current = self.header
+        while current.next_chunk is not chunk:
+            current = current.next_chunk
+        return current
+
+    def __locate(self, index):
+        """Finds chunk containing item at index rebuilding chunk index if needed
+        Raises IndexError if index is out of bounds
+
+        Args:
+            index (int): item index
+
+        Returns:
+            tuple: index of chunk in chunk index and item offset in chunk
+        """
+        if not -self.size <= index < self.size:
+            raise IndexError("Index out of bounds:", index)
+        if index < 0:
+            index += self.size
+        if self.chunks is None:
+            self.chunks = []
+            self.starts = []
+            start = 0
+            chunk = self.header.next_chunk
+            while chunk is not None:
+                self.chunks.append(chunk)
+                self.starts.append(start)
+                start += len(chunk.items)
+                chunk = chunk.next_chunk
+        chunk_index = bisect_right(self.starts, index) - 1
+        return chunk_index, index - self.starts[chunk_index]
+
+
+class UnrolledChunk:
+    """Unrolled linked list node
+
+    Args:
+        items: list of chunk items
+        next_chunk: link to the next chunk
+
+    Attributes:
+        items: list of chunk items
+        next_chunk: link to the next chunk
+    """
+    __slots__ = ('items', 'next_chunk')
+
+    def __init__(self, items, next_chunk):
+        self.items = items
+        self.next_chunk = next_chunk
+
+
+if __name__ == '__main__':
+    # test operations against list
+    for capacity in (2, 3, 64):
+        items = list(range(50))
+        unrolled_list = UnrolledLinkedList.from_iterable(items, capacity)
+        assert len(unrolled_list) == 50 and list(unrolled_list) == items
+        assert unrolled_list[0] == 0 and unrolled_list[-1] == 49 and unrolled_list[17] == 17
+        for key in (slice(None), slice(3, 45), slice(None, None, 3), slice(45, 2, -2), slice(-5, None), slice(5, 5)):
+            assert list(unrolled_list[key]) == items[key]
+        unrolled_list[::5] = [-item for item in items[::5]]
+        items[::5] = [-item for item in items[::5]]
+        assert list(unrolled_list) == items
+        for _ in range(200):
+            operation = random.randrange(6)
+            if operation == 0:
+                item = random.randrange(100)
+                unrolled_list.push_front(item)
+                items.insert(0, item)
+            elif operation == 1:
+                item = random.randrange(100)
+                unrolled_list.push(item)
+                items.append(item)
+            elif operation == 2 and items:
+                assert unrolled_list.pop() == items.pop()
+            elif operation == 3 and items:
+                assert unrolled_list.pop_front() == items.pop(0)
+            elif operation == 4 and items:
+                position = random.randrange(-len(items), len(items))
+                del unrolled_list[position]
+                del items[position]
+            elif operation == 5 and items:
+                position = random.randrange(len(items))
+                unrolled_list[position] = -1
+                items[position] = -1
+                assert unrolled_list[position] == -1
+            assert len(unrolled_list) == len(items) and list(unrolled_list) == items
+        del unrolled_list[1::2]
+        del items[1::2]
+        assert list(unrolled_list) == items
+        for item in items:
+            assert item in unrolled_list and unrolled_list.index(item) == items.index(item)
+        assert 1000 not in unrolled_list
+    unrolled_list = UnrolledLinkedList()
+    assert str(unrolled_list) == '[]' and not unrolled_list
+    unrolled_list.extend([1, 2, 3])
+    assert str(unrolled_list) == '[1, 2, 3]'
+    try:
+        unrolled_list[3]
+        assert False
+    except IndexError:
+        pass
+
+    # benchmark memory per item and positional access against LinkedList and list
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    for description, build in (('list', lambda: list(range(size))),
+                               ('LinkedList', lambda: LinkedList.from_iterable(range(size))),
+                               ('UnrolledLinkedList', lambda: UnrolledLinkedList.from_iterable(range(size)))):
+        tracemalloc.start()
+        built = build()
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        queries = [random.randrange(size) for _ in range(100 if description == 'LinkedList' else 100000)]
+        start_time = datetime.now()
+        for query in queries:
+            built[query]
+        elapsed_time = (datetime.now() - start_time).total_seconds()
+        print('{} of {} items: {} per item, {} queries by index in {} ({:.0f}ns per query)'.format(
+            description, size, readable_size(memory // size), len(queries), readable_time(elapsed_time),
+            elapsed_time / len(queries) * 10 ** 9))
@@ -49,6 +49,13 @@ retrieve [filename] [destination] - Retrieve a file in binary transfer mode and
 
 store [filename] [origin] - Store a file located in origin using binary transfer mode.
 
+mretrieve [pattern] [destination='.'] - Retrieve files matching glob pattern concurrently over several connections and
+save them to destination folder keeping their directory tree. '**' matches any number of directories, directory path
+retrieves its whole tree. Failed transfers are retried.
+
+mstore [pattern] [directory=''] - Store local files matching glob pattern concurrently over several connections to
+remote directory keeping their directory tree. Missing remote directories are created. Failed transfers are retried.
+
 quit - Send a QUIT command to the server and close the connection.
 
 exit - Send a QUIT command to the server and close the connection. Same as quit.
@@ -59,11 +66,13 @@ help - display help
 """
 
 import os
+import posixpath
 import sys
 from ftplib import FTP, error_perm, all_errors
 from getpass import getpass
 
 from ftp.ftptracker import FTPTracker
+from ftp.ftptransfer import FTPPool, mretrieve, mstore
 
 try:
     import gnureadline as readline
@@ -97,6 +106,8 @@ except error_perm as error:
     input()
     sys.exit()
 
+pool = FTPPool(host, user, password)
+
 if readline:
     readline.set_startup_hook()  # Enables input history
 
@@ -107,6 +118,7 @@ while True:
         arguments = user_input[1:]
         if command in ('exit', 'quit', 'close'):
             print(ftp.quit())
+            pool.close()
             sys.exit()
         elif command == 'help':
             print(__doc__)
@@ -123,6 +135,14 @@ while True:
                 arguments.append(arguments[0])
             with open(arguments[1], 'rb') as file:
                     print(ftp.storbinary('STOR {}'.format(arguments[0]), file, callback=tracker.handle))
+        elif command == 'mretrieve':
+            destination = arguments[1] if len(arguments) > 1 else '.'
+            files = mretrieve(pool, posixpath.join(ftp.pwd(), arguments[0]), destination)
+            print('Retrieved {} files'.format(len(files)))
+        elif command == 'mstore':
+            directory = arguments[1] if len(arguments) > 1 else ''
+            files = mstore(pool, arguments[0], posixpath.join(ftp.pwd(), directory))
+            print('Stored {} files'.format(len(files)))
         elif not command:
             continue
         else:
@@ -1,4 +1,5 @@
 import sys
+import threading
 from datetime import datetime
 
 from utils.readable import readable_size, readable_time
@@ -76,3 +77,91 @@ class FTPTracker:
             sys.stdout.write('\n')
         sys.stdout.flush()
         sys.stdout.write('\033[K')  # Clears the end of the line to prevent output overlapping
+
+
+class AggregateFTPTracker(FTPTracker):
+    """Tracks combined progress of concurrent ftp transfers of many files. Displays one progress bar for all of them.
+    Can be handled from several threads at once
+
+    Args:
+        total_size (int): combined size of tracked files
+        files_count (int): number of tracked files
+        bar_length (int, optional): length of output bar. Defaults to 50
+
+    Attributes:
+        files_count (int): number of tracked files
+        files_done (int): number of completely transferred files
+        lock (threading.Lock): guards counters and output
+    """
+
+    def __init__(self, total_size, files_count, bar_length=50):
+        super().__init__(total_size, bar_length)
+        self.files_count = files_count
+        self.files_done = 0
+        self.lock = threading.Lock()
+
+    def percentage(self):
+        """
+        Returns:
+            str: completeness percentage in string form.
+        """
+        return super().percentage() if self.file_size else '100.0'
+
+    def bar_filled(self):
+        """
+        Returns:
+            int: rounded value of how much bar is filled
+        """
+        return super().bar_filled() if self.file_size else self.bar_length
+
+    def rate(self):
+        """
+        Returns:
+             float: transfer rate measured in bytes per second
+         """
+        return self.size_written / max((datetime.now() - self.start_time).total_seconds(), 1e-6)
+
+    def eta(self):
+        """
+        Returns:
+             float: approximately how much time is left
+        """
+        rate = self.rate()
+        return (self.file_size - self.size_written) / rate if rate else 0
+
+    def bar_string(self):
+        """
+        Returns:
+            str: bar string format
+        """
+        return '{} {}/{} files'.format(super().bar_string(), self.files_done, self.files_count)
+
+    def handle(self, block):
+        """Handles bar output"""
+        with self.lock:
+            self.size_written += len(block)
+            self.__write()
+
+    def rollback(self, size):
+        """Discards bytes of failed transfer attempt which will be transferred again
+
+        Args:
+            size (int): number of discarded bytes
+        """
+        with self.lock:
+            self.size_written -= size
+            self.__write()
+
+    def file_done(self):
+        """Marks one file as completely transferred"""
+        with self.lock:
+            self.files_done += 1
+            self.__write()
+
+    def __write(self):
+        """Writes bar, moves to the next line when all files are transferred"""
+        sys.stdout.write(self.bar_string())
+        if self.files_done == self.files_count:
+            sys.stdout.write('\n')
+        sys.stdout.flush()
+        sys.stdout.write('\033[K')  # Clears the end of the line to prevent output overlapping
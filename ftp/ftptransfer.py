@@ -0,0 +1,693 @@
+"""Concurrent transfers of many files over a bounded pool of logged-in ftplib connections.
+Single connection transfers files one by one and spends most of the time of small files waiting for command replies,
+pool keeps several transfers in flight so round trip latencies overlap. Files are expanded from glob patterns, '**'
+matches any number of directories, directory path matches its whole tree. Failed transfers are retried over fresh
+connections, combined progress of all files is displayed by AggregateFTPTracker
+"""
+import glob
+import os
+import posixpath
+import queue
+import re
+import shutil
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime
+from fnmatch import fnmatchcase
+from ftplib import FTP, Error, all_errors, error_perm
+from io import StringIO
+from time import monotonic, sleep
+
+from ftp.ftptracker import AggregateFTPTracker
+from utils.readable import readable_time
+
+DEFAULT_WORKERS = 4
+DEFAULT_RETRIES = 3
+RETRY_DELAY = 0.5
+IDLE_CHECK = 10  # seconds of idleness after which pooled connection is checked with NOOP before reuse
+MAGIC = re.compile('[*?[]')
+
+
+class TransferError(Error):
+    """Raised when some files are not transferred after all retries
+
+    Args:
+        failures (dict): last error by path of failed file
+
+    Attributes:
+        failures (dict): last error by path of failed file
+    """
+
+    def __init__(self, failures):
+        super().__init__('{} files failed: {}'.format(
+            len(failures), ', '.join('{} ({})'.format(path, error) for path, error in sorted(failures.items()))))
+        self.failures = failures
+
+
+class FTPPool:
+    """Bounded pool of logged-in FTP connections. Connections are opened on demand and reused, at most size of them are
+    in use at once. Servers drop idle control connections, so connection which has been idle for longer than idle_check
+    seconds is checked with NOOP before reuse and is closed if the check fails
+
+    Usage:
+        with FTPPool('ftp.example.com', 'user', 'password') as pool:
+            with pool.connection() as ftp:
+                ftp.nlst()
+
+    Args:
+        host (str): FTP host
+        user (str, optional): user name. Defaults to ''
+        password (str, optional): password. Defaults to ''
+        size (int, optional): maximum number of connections. Defaults to DEFAULT_WORKERS
+        port (int, optional): FTP port, 0 for default port. Defaults to 0
+        timeout (float, optional): connection timeout in seconds. Defaults to None
+        idle_check (float, optional): idle seconds after which connection is checked before reuse.
+            Defaults to IDLE_CHECK
+
+    Attributes:
+        size: maximum number of connections
+        idle: queue of (connection, release time) tuples of logged-in connections which are not in use
+        slots: semaphore which bounds number of connections in use
+        connections_opened: number of connections opened so far
+        lock: guards connections_opened
+    """
+
+    def __init__(self, host, user='', password='', size=DEFAULT_WORKERS, port=0, timeout=None, idle_check=IDLE_CHECK):
+        self.host = host
+        self.user = user
+        self.password = password
+        self.size = size
+        self.port = port
+        self.timeout = timeout
+        self.idle_check = idle_check
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+        self.connections_opened = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.close()
+
+    def acquire(self):
+        """Takes idle connection or opens a new one, waits while size connections are in use.
+        Connections which have been idle for too long and don't answer NOOP are closed and skipped
+
+        Returns:
+            FTP: logged-in connection
+        """
+        self.slots.acquire()
+        try:
+            while True:
+                try:
+                    ftp, release_time = self.idle.get_nowait()
+                except queue.Empty:
+                    break
+                if monotonic() - release_time < self.idle_check:
+                    return ftp
+                try:
+                    ftp.voidcmd('NOOP')
+                except all_errors:
+                    ftp.close()
+                else:
+                    return ftp
+            ftp = FTP(timeout=self.timeout)
+            ftp.connect(self.host, self.port)
+            ftp.login(self.user, self.password)
+        except BaseException:
+            self.slots.release()
+            raise
+        with self.lock:
+            self.connections_opened += 1
+        return ftp
+
+    def release(self, ftp, broken=False):
+        """Returns connection to the pool
+
+        Args:
+            ftp (FTP): released connection
+            broken (bool, optional): closes connection instead of reusing it. Defaults to False
+        """
+        if broken:
+            ftp.close()
+        else:
+            self.idle.put((ftp, monotonic()))
+        self.slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Context manager which acquires connection and releases it on exit. Connection is closed if anything but
+        permanent error reply is raised, because it may be left in unknown state
+
+        Returns:
+            FTP: logged-in connection
+        """
+        ftp = self.acquire()
+        try:
+            yield ftp
+        except error_perm:
+            self.release(ftp)
+            raise
+        except BaseException:
+            self.release(ftp, broken=True)
+            raise
+        else:
+            self.release(ftp)
+
+    def close(self):
+        """Quits all idle connections"""
+        while True:
+            try:
+                ftp, _ = self.idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                ftp.quit()
+            except all_errors:
+                ftp.close()
+
+
+def split_pattern(pattern):
+    """Splits glob pattern into base directory without wildcards and the rest of the pattern.
+    Last component always goes to the rest, so matched paths are relative to the directory containing them
+
+    Args:
+        pattern (str): glob pattern with '/' separators
+
+    Returns:
+        tuple: base directory, list of rest pattern components
+    """
+    parts = pattern.rstrip('/').split('/')
+    index = 0
+    while index < len(parts) - 1 and not MAGIC.search(parts[index]):
+        index += 1
+    base = '/'.join(parts[:index])
+    if not base and pattern.startswith('/'):
+        base = '/'
+    return base, parts[index:]
+
+
+def match_parts(parts, patterns):
+    """Checks whether path components match pattern components, '**' matches any number of components
+
+    Args:
+        parts (list): path components
+        patterns (list): pattern components
+
+    Returns:
+        bool: True if path matches the pattern
+    """
+    if not patterns:
+        return not parts
+    if patterns[0] == '**':
+        return any(match_parts(parts[index:], patterns[1:]) for index in range(len(parts) + 1))
+    return bool(parts) and fnmatchcase(parts[0], patterns[0]) and match_parts(parts[1:], patterns[1:])
+
+
+def remote_files(ftp, directory, depth=None):
+    """Lists files of remote directory tree. Uses MLSD, falls back to NLST and SIZE for servers which don't support it
+
+    Args:
+        ftp (FTP): logged-in connection
+        directory (str): listed directory
+        depth (int, optional): maximum depth of listed files, 1 lists directory itself. Defaults to None for any depth
+
+    Returns:
+        list: (path, size) tuples of files
+    """
+    try:
+        entries = [(name, facts.get('type'), facts.get('size')) for name, facts in ftp.mlsd(directory)]
+    except error_perm:
+        entries = []
+        for name in ftp.nlst(directory):
+            name = posixpath.basename(name)
+            try:
+                entries.append((name, 'file', ftp.size(posixpath.join(directory, name))))
+            except error_perm:
+                entries.append((name, 'dir', None))
+    files = []
+    for name, kind, size in entries:
+        path = posixpath.join(directory, name)
+        if kind == 'file':
+            files.append((path, int(size) if size is not None else ftp.size(path)))
+        elif kind == 'dir' and name not in ('.', '..') and (depth is None or depth > 1):
+            files.extend(remote_files(ftp, path, None if depth is None else depth - 1))
+    return files
+
+
+def expand_remote(ftp, patterns):
+    """Expands remote glob patterns into files. Raises FileNotFoundError if a pattern matches nothing
+
+    Args:
+        ftp (FTP): logged-in connection
+        patterns (list): glob patterns of remote files and directories
+
+    Returns:
+        list: (path, path relative to pattern base directory, size) tuples of matched files
+    """
+    files = {}
+    for pattern in patterns:
+        base, rest = split_pattern(pattern)
+        try:
+            if MAGIC.search(pattern):
+                depth = None if '**' in rest else len(rest)
+                matched = [(path, size) for path, size in remote_files(ftp, base or '.', depth)
+                           if match_parts(posixpath.relpath(path, base or '.').split('/'), rest)]
+            else:
+                try:
+                    matched = [(pattern, ftp.size(pattern))]
+                except error_perm:
+                    matched = remote_files(ftp, pattern)
+        except error_perm:
+            matched = []
+        if not matched:
+            raise FileNotFoundError('No remote files match {}'.format(pattern))
+        for path, size in matched:
+            files[path] = (path, posixpath.relpath(path, base or '.'), size)
+    return list(files.values())
+
+
+def expand_local(patterns):
+    """Expands local glob patterns into files. Raises FileNotFoundError if a pattern matches nothing
+
+    Args:
+        patterns (list): glob patterns of local files and directories with '/' separators
+
+    Returns:
+        list: (path, path relative to pattern base directory, size) tuples of matched files
+    """
+    files = {}
+    for pattern in patterns:
+        base, _ = split_pattern(pattern)
+        matched = []
+        for path in sorted(glob.glob(pattern, recursive=True)):
+            if os.path.isdir(path):
+                for directory, _, names in os.walk(path):
+                    matched.extend(os.path.join(directory, name) for name in sorted(names))
+            else:
+                matched.append(path)
+        if not matched:
+            raise FileNotFoundError('No local files match {}'.format(pattern))
+        for path in matched:
+            relative_path = os.path.relpath(path, base or '.').replace(os.sep, '/')
+            files[path] = (path, relative_path, os.path.getsize(path))
+    return list(files.values())
+
+
+def check_targets(jobs, normalize):
+    """Checks that no two files are transferred to the same target. Raises FileExistsError otherwise
+
+    Args:
+        jobs (list): (source path, target path) tuples
+        normalize (function): normalizes target path, e.g. os.path.normpath
+    """
+    sources = {}
+    for source, target in jobs:
+        other_source = sources.setdefault(normalize(target), source)
+        if other_source != source:
+            raise FileExistsError('{} and {} are both transferred to {}'.format(other_source, source, target))
+
+
+def call_with_retries(pool, function, retries, retry_delay):
+    """Calls function with pool connection, retries it over fresh connection after any error but permanent error reply
+
+    Args:
+        pool (FTPPool): connection pool
+        function (function): function(ftp) which is called
+        retries (int): number of retries
+        retry_delay (float): delay before first retry in seconds, doubled for every next retry
+
+    Returns:
+        function result
+    """
+    for attempt in range(retries + 1):
+        if attempt:
+            sleep(retry_delay * 2 ** (attempt - 1))
+        try:
+            with pool.connection() as ftp:
+                return function(ftp)
+        except error_perm:
+            raise
+        except all_errors:
+            if attempt == retries:
+                raise
+
+
+def transfer_file(pool, transfer, job, retries, retry_delay, tracker):
+    """Transfers one file, retries it over fresh connection after any error but permanent error reply
+
+    Args:
+        pool (FTPPool): connection pool
+        transfer (function): transfer(ftp, job, callback) which calls callback with every transferred block
+        job (tuple): transferred file description, its first element is file path
+        retries (int): number of retries
+        retry_delay (float): delay before first retry in seconds, doubled for every next retry
+        tracker (AggregateFTPTracker): progress tracker
+
+    Returns:
+        Exception: last error, None if file is transferred
+    """
+    error = None
+    for attempt in range(retries + 1):
+        if attempt:
+            sleep(retry_delay * 2 ** (attempt - 1))
+        written = 0
+
+        def callback(block):
+            nonlocal written
+            written += len(block)
+            tracker.handle(block)
+
+        try:
+            with pool.connection() as ftp:
+                transfer(ftp, job, callback)
+        except error_perm as permanent_error:
+            tracker.rollback(written)
+            return permanent_error
+        except all_errors as transfer_error:
+            tracker.rollback(written)
+            error = transfer_error
+        else:
+            tracker.file_done()
+            return None
+    return error
+
+
+def transfer_all(pool, transfer, jobs, retries, retry_delay, tracker):
+    """Transfers files concurrently over pool connections. Raises TransferError if some files fail
+
+    Args:
+        pool (FTPPool): connection pool
+        transfer (function): transfer(ftp, job, callback) which calls callback with every transferred block
+        jobs (list): transferred file descriptions, first element of each is file path
+        retries (int): number of retries of every file
+        retry_delay (float): delay before first retry in seconds
+        tracker (AggregateFTPTracker): progress tracker
+    """
+    with ThreadPoolExecutor(max_workers=pool.size) as executor:
+        errors = list(executor.map(lambda job: transfer_file(pool, transfer, job, retries, retry_delay, tracker), jobs))
+    failures = {job[0]: error for job, error in zip(jobs, errors) if error is not None}
+    if failures:
+        raise TransferError(failures)
+
+
+def retrieve_file(ftp, job, callback):
+    """Retrieves remote file in binary mode. File is written to temporary file next to local path, which replaces
+    local path only once transfer is complete, so failed transfer leaves neither partial file nor truncated old file
+
+    Args:
+        ftp (FTP): logged-in connection
+        job (tuple): remote path, local path
+        callback (function): called with every retrieved block
+    """
+    remote_path, local_path = job
+    file_descriptor, temp_path = tempfile.mkstemp(suffix='.part', prefix='.' + os.path.basename(local_path),
+                                                  dir=os.path.dirname(local_path) or '.')
+    try:
+        with open(file_descriptor, 'wb') as file:
+            ftp.retrbinary('RETR {}'.format(remote_path), lambda block: (file.write(block), callback(block)))
+        os.replace(temp_path, local_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def store_file(ftp, job, callback):
+    """Stores local file in binary mode
+
+    Args:
+        ftp (FTP): logged-in connection
+        job (tuple): local path, remote path
+        callback (function): called with every stored block
+    """
+    local_path, remote_path = job
+    with open(local_path, 'rb') as file:
+        ftp.storbinary('STOR {}'.format(remote_path), file, callback=callback)
+
+
+def make_directories(ftp, directories):
+    """Creates remote directories, parents first, skips existing ones.
+    Raises error_perm if directory can't be created and doesn't exist, e.g. permission is denied
+
+    Args:
+        ftp (FTP): logged-in connection
+        directories (set): created directories
+    """
+    for directory in sorted(directories, key=lambda directory: directory.count('/')):
+        try:
+            ftp.mkd(directory)
+        except error_perm:
+            if not is_remote_directory(ftp, directory):
+                raise
+
+
+def is_remote_directory(ftp, path):
+    """Checks whether remote path is a directory by changing into it, current directory is restored afterwards
+
+    Args:
+        ftp (FTP): logged-in connection
+        path (str): checked remote path
+
+    Returns:
+        bool: True if path is an existing directory
+    """
+    current_directory = ftp.pwd()
+    try:
+        ftp.cwd(path)
+    except error_perm:
+        return False
+    ftp.cwd(current_directory)
+    return True
+
+
+def mretrieve(pool, patterns, destination='.', retries=DEFAULT_RETRIES, retry_delay=RETRY_DELAY, tracker=None):
+    """Retrieves remote files matching glob patterns concurrently, keeps their directory tree relative to pattern base
+    directory. Largest files are started first, so a big file doesn't trail alone at the end.
+    Raises FileExistsError before transferring anything if two remote files map to the same local path
+
+    Args:
+        pool (FTPPool): connection pool
+        patterns (str or list): glob patterns of remote files and directories
+        destination (str, optional): local destination directory. Defaults to '.'
+        retries (int, optional): number of retries of every file. Defaults to DEFAULT_RETRIES
+        retry_delay (float, optional): delay before first retry in seconds. Defaults to RETRY_DELAY
+        tracker (AggregateFTPTracker, optional): progress tracker. Defaults to a new tracker of all matched files
+
+    Returns:
+        list: local paths of retrieved files
+    """
+    patterns = [patterns] if isinstance(patterns, str) else patterns
+    files = call_with_retries(pool, lambda ftp: expand_remote(ftp, patterns), retries, retry_delay)
+    files.sort(key=lambda file: file[2], reverse=True)
+    jobs = [(remote_path, os.path.join(destination, *relative_path.split('/')))
+            for remote_path, relative_path, _ in files]
+    check_targets(jobs, os.path.normpath)
+    for directory in {os.path.dirname(local_path) for _, local_path in jobs}:
+        os.makedirs(directory or '.', exist_ok=True)
+    if tracker is None:
+        tracker = AggregateFTPTracker(sum(file[2] for file in files), len(files))
+    transfer_all(pool, retrieve_file, jobs, retries, retry_delay, tracker)
+    return [local_path for _, local_path in jobs]
+
+
+def mstore(pool, patterns, remote_directory='', retries=DEFAULT_RETRIES, retry_delay=RETRY_DELAY, tracker=None):
+    """Stores local files matching glob patterns concurrently, keeps their directory tree relative to pattern base
+    directory. Missing remote directories are created first, largest files are started first.
+    Raises FileExistsError before transferring anything if two local files map to the same remote path
+
+    Args:
+        pool (FTPPool): connection pool
+        patterns (str or list): glob patterns of local files and directories
+        remote_directory (str, optional): remote destination directory. Defaults to '' for current directory
+        retries (int, optional): number of retries of every file. Defaults to DEFAULT_RETRIES
+        retry_delay (float, optional): delay before first retry in seconds. Defaults to RETRY_DELAY
+        tracker (AggregateFTPTracker, optional): progress tracker. Defaults to a new tracker of all matched files
+
+    Returns:
+        list: remote paths of stored files
+    """
+    files = expand_local([patterns] if isinstance(patterns, str) else patterns)
+    files.sort(key=lambda file: file[2], reverse=True)
+    jobs = [(local_path, posixpath.join(remote_directory, relative_path)) for local_path, relative_path, _ in files]
+    check_targets(jobs, posixpath.normpath)
+    directories = set()
+    for _, remote_path in jobs:
+        directory = posixpath.dirname(remote_path)
+        while directory not in ('', '/') and directory not in directories:
+            directories.add(directory)
+            directory = posixpath.dirname(directory)
+    call_with_retries(pool, lambda ftp: make_directories(ftp, directories), retries, retry_delay)
+    if tracker is None:
+        tracker = AggregateFTPTracker(sum(file[2] for file in files), len(files))
+    transfer_all(pool, store_file, jobs, retries, retry_delay, tracker)
+    return [remote_path for _, remote_path in jobs]
+
+
+def write_tree(root, paths):
+    """Writes files with random content
+
+    Args:
+        root (str): root directory
+        paths (dict): file size by path relative to root
+    """
+    for path, size in paths.items():
+        path = os.path.join(root, *path.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(os.urandom(size))
+
+
+def read_tree(root):
+    """Reads files of directory tree
+
+    Args:
+        root (str): root directory
+
+    Returns:
+        dict: file content by path relative to root
+    """
+    contents = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            with open(os.path.join(directory, name), 'rb') as file:
+                contents[os.path.relpath(os.path.join(directory, name), root).replace(os.sep, '/')] = file.read()
+    return contents
+
+
+if __name__ == '__main__':
+    from ftp.local_server import LocalFTPServer
+
+    assert split_pattern('logs/2020/*.txt') == ('logs/2020', ['*.txt'])
+    assert split_pattern('logs/**/*.txt') == ('logs', ['**', '*.txt'])
+    assert split_pattern('/logs/*/a.txt') == ('/logs', ['*', 'a.txt'])
+    assert split_pattern('logs/') == ('', ['logs'])
+    assert match_parts(['a', 'b', 'c.txt'], ['**', '*.txt'])
+    assert match_parts(['c.txt'], ['**', '*.txt'])
+    assert not match_parts(['a', 'c.txt'], ['*.txt'])
+
+    working_directory = tempfile.mkdtemp()
+    try:
+        served = os.path.join(working_directory, 'served')
+        local = os.path.join(working_directory, 'local')
+        tree = {'logs/a.txt': 1000, 'logs/b.bin': 70000, 'logs/2020/c.txt': 0, 'logs/2020/deep/d.txt': 300,
+                'readme.txt': 50}
+        write_tree(served, tree)
+        expected = read_tree(served)
+        with LocalFTPServer(served) as server, redirect_stdout(StringIO()):
+            with FTPPool(server.host, server.user, server.password, size=3, port=server.port) as pool:
+                # directory trees and glob patterns
+                retrieved = mretrieve(pool, 'logs', local)
+                assert len(retrieved) == 4
+                assert read_tree(local) == {path: content for path, content in expected.items()
+                                            if path.startswith('logs/')}
+                shutil.rmtree(local)
+                mretrieve(pool, ['logs/*.txt', 'logs/**/d.txt', '/readme.txt'], local)
+                assert read_tree(local) == {'a.txt': expected['logs/a.txt'], 'readme.txt': expected['readme.txt'],
+                                            '2020/deep/d.txt': expected['logs/2020/deep/d.txt']}
+                shutil.rmtree(local)
+                mretrieve(pool, ['**/*.txt'], local)
+                assert read_tree(local) == {path: content for path, content in expected.items()
+                                            if path.endswith('.txt')}
+
+                # store into new remote directories and back
+                stored = mstore(pool, os.path.join(local, 'logs').replace(os.sep, '/'), 'copy/nested')
+                assert sorted(stored) == ['copy/nested/logs/2020/c.txt', 'copy/nested/logs/2020/deep/d.txt',
+                                          'copy/nested/logs/a.txt']
+                assert read_tree(os.path.join(served, 'copy')) == {
+                    'nested/' + path: content for path, content in read_tree(local).items() if path.startswith('logs/')}
+                assert pool.connections_opened <= 3
+                mstore(pool, os.path.join(local, 'logs', 'a.txt'), 'copy/nested/logs')  # directories exist already
+                try:
+                    mstore(pool, os.path.join(local, 'logs', 'a.txt'), 'readme.txt/logs')  # file blocks directory
+                    assert False
+                except error_perm:
+                    pass
+                assert read_tree(served)['readme.txt'] == expected['readme.txt']
+
+                # failed transfers are retried, tracker discards partially transferred bytes
+                server.failing_transfers = 3
+                shutil.rmtree(local)
+                tracker = AggregateFTPTracker(sum(tree[path] for path in tree if path.startswith('logs/')), 4)
+                mretrieve(pool, 'logs', local, retry_delay=0, tracker=tracker)
+                assert server.failing_transfers == 0
+                assert tracker.size_written == tracker.file_size and tracker.files_done == 4
+                assert read_tree(os.path.join(local, 'logs')) == {
+                    path[len('logs/'):]: content for path, content in expected.items() if path.startswith('logs/')}
+                server.failing_transfers = 10
+                try:
+                    mstore(pool, os.path.join(local, 'logs', 'a.txt'), retries=1, retry_delay=0)
+                    assert False
+                except TransferError as error:
+                    assert list(error.failures) == [os.path.join(local, 'logs', 'a.txt')]
+                write_tree(local, {'readme.txt': 10})
+                old_content = read_tree(local)['readme.txt']
+                server.failing_transfers = 10
+                try:
+                    mretrieve(pool, 'readme.txt', local, retries=1, retry_delay=0)
+                    assert False
+                except TransferError:
+                    pass
+                assert read_tree(local)['readme.txt'] == old_content  # failed transfer doesn't touch local file
+                assert not [name for name in os.listdir(local) if name.endswith('.part')]
+                server.failing_transfers = 0
+
+                # files of different directories which map to the same target
+                write_tree(served, {'first/x.txt': 10, 'second/x.txt': 20})
+                for call in (lambda: mretrieve(pool, ['first/*.txt', 'second/*.txt'], local),
+                             lambda: mstore(pool, [os.path.join(served, 'first', 'x.txt').replace(os.sep, '/'),
+                                                   os.path.join(served, 'second', '*.txt').replace(os.sep, '/')])):
+                    try:
+                        call()
+                        assert False
+                    except FileExistsError:
+                        pass
+                assert not os.path.exists(os.path.join(local, 'x.txt'))
+                assert not os.path.exists(os.path.join(served, 'x.txt'))
+                mretrieve(pool, ['first', 'second'], local)
+                assert os.path.getsize(os.path.join(local, 'second', 'x.txt')) == 20
+
+                # idle connections dropped by server are replaced, not counted as failed attempts
+                pool.idle_check = 0
+                opened_count = pool.connections_opened
+                server.drop_connections()
+                shutil.rmtree(local)
+                mretrieve(pool, 'logs', local, retries=0)
+                assert read_tree(os.path.join(local, 'logs')) == {
+                    path[len('logs/'):]: content for path, content in expected.items() if path.startswith('logs/')}
+                assert pool.connections_opened > opened_count
+
+                # missing files
+                for call in (lambda: mretrieve(pool, 'missing/*', local), lambda: mretrieve(pool, 'missing', local),
+                             lambda: mstore(pool, os.path.join(local, 'missing*'))):
+                    try:
+                        call()
+                        assert False
+                    except FileNotFoundError:
+                        pass
+    finally:
+        shutil.rmtree(working_directory)
+
+    # benchmark many small files over simulated round trip latency against number of pool connections
+    files_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
+    working_directory = tempfile.mkdtemp()
+    try:
+        served = os.path.join(working_directory, 'served')
+        write_tree(served, {'sync/{}/{}.dat'.format(index % 10, index): 4096 for index in range(files_count)})
+        with LocalFTPServer(served, latency=latency) as server:
+            for workers in (1, 2, 4, 8, 16):
+                local = os.path.join(working_directory, 'local{}'.format(workers))
+                with FTPPool(server.host, server.user, server.password, size=workers, port=server.port) as pool:
+                    start_time = datetime.now()
+                    with redirect_stdout(StringIO()):
+                        mretrieve(pool, 'sync', local)
+                    print('mretrieve of {} files with {} ms latency over {} connections:'.format(
+                        files_count, latency * 1000, workers),
+                        readable_time((datetime.now() - start_time).total_seconds()))
+    finally:
+        shutil.rmtree(working_directory)
@@ -0,0 +1,302 @@
+"""Minimal in-process FTP server serving a local directory. Stand-in for real FTP server in tests and benchmarks of
+ftp package. Supports login, passive mode transfers and commands used by ftplib to retrieve, store and list files.
+Every command reply can be delayed to simulate network round trips, transfers can be made to fail to test retries
+"""
+import os
+import socket
+import socketserver
+import threading
+from time import sleep
+
+
+class LocalFTPServer:
+    """FTP server serving root directory on localhost in background threads
+
+    Usage:
+        with LocalFTPServer('/tmp/files') as server:
+            ftp = FTP()
+            ftp.connect(server.host, server.port)
+
+    Args:
+        root (str): served directory
+        user (str, optional): accepted user name. Defaults to 'user'
+        password (str, optional): accepted password. Defaults to 'password'
+        latency (float, optional): seconds every command reply is delayed for. Defaults to 0
+        failing_transfers (int, optional): number of first transfers which are aborted with 451 reply. Defaults to 0
+
+    Attributes:
+        host: server host
+        port: server port
+        logins_count: number of successful logins
+        sessions: sockets of open control connections
+    """
+
+    def __init__(self, root, user='user', password='password', latency=0, failing_transfers=0):
+        self.root = os.path.realpath(root)
+        self.user = user
+        self.password = password
+        self.latency = latency
+        self.failing_transfers = failing_transfers
+        self.logins_count = 0
+        self.sessions = set()
+        self.lock = threading.Lock()
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), FTPSessionHandler, bind_and_activate=True)
+        self.server.daemon_threads = True
+        self.server.ftp_server = self
+        self.host, self.port = self.server.server_address
+        self.thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.stop()
+
+    def start(self):
+        """Starts serving in background thread"""
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stops serving and closes server socket"""
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def drop_connections(self):
+        """Closes all open control connections like server dropping idle clients"""
+        with self.lock:
+            sessions = list(self.sessions)
+        for session in sessions:
+            try:
+                session.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def should_fail(self):
+        """Decides whether next transfer fails
+
+        Returns:
+            bool: True if transfer should be aborted
+        """
+        with self.lock:
+            if self.failing_transfers > 0:
+                self.failing_transfers -= 1
+                return True
+            return False
+
+
+class FTPSessionHandler(socketserver.StreamRequestHandler):
+    """Handles commands of one FTP control connection"""
+
+    def setup(self):
+        super().setup()
+        self.ftp_server = self.server.ftp_server
+        self.user = None
+        self.logged_in = False
+        self.directory = '/'
+        self.passive_socket = None
+        with self.ftp_server.lock:
+            self.ftp_server.sessions.add(self.request)
+
+    def finish(self):
+        with self.ftp_server.lock:
+            self.ftp_server.sessions.discard(self.request)
+        super().finish()
+
+    def handle(self):
+        try:
+            self.serve_commands()
+        except ConnectionError:
+            pass  # Client dropped connection
+        self.close_passive_socket()
+
+    def serve_commands(self):
+        """Replies to commands until client quits or closes connection"""
+        self.reply('220 Local FTP server ready')
+        for line in self.rfile:
+            command, _, argument = line.decode('utf-8', 'surrogateescape').rstrip('\r\n').partition(' ')
+            command = command.upper()
+            if self.ftp_server.latency:
+                sleep(self.ftp_server.latency)
+            if command == 'QUIT':
+                self.reply('221 Goodbye')
+                break
+            handler = getattr(self, 'command_' + command.lower(), None)
+            if handler is None:
+                self.reply('502 Command not implemented')
+            elif not self.logged_in and command not in ('USER', 'PASS'):
+                self.reply('530 Not logged in')
+            else:
+                try:
+                    handler(argument)
+                except ConnectionError:
+                    raise
+                except OSError as error:
+                    self.reply('451 {}'.format(error))
+
+    def reply(self, message):
+        """Sends reply line
+
+        Args:
+            message (str): reply with code
+        """
+        self.wfile.write((message + '\r\n').encode('utf-8', 'surrogateescape'))
+
+    def local_path(self, path):
+        """Converts server path to local path inside served directory
+
+        Args:
+            path (str): absolute or relative server path
+
+        Returns:
+            str: local path, None if path leads outside served directory
+        """
+        server_path = os.path.normpath(os.path.join(self.directory, path or '.')).replace(os.sep, '/')
+        local_path = os.path.realpath(os.path.join(self.ftp_server.root, server_path.lstrip('/')))
+        if local_path != self.ftp_server.root and not local_path.startswith(self.ftp_server.root + os.sep):
+            return None
+        return local_path
+
+    def open_data_connection(self):
+        """Accepts data connection on passive socket
+
+        Returns:
+            socket.socket: data connection, None if passive mode wasn't entered
+        """
+        if self.passive_socket is None:
+            self.reply('425 Use PASV first')
+            return None
+        self.reply('150 Opening data connection')
+        connection, _ = self.passive_socket.accept()
+        self.close_passive_socket()
+        return connection
+
+    def close_passive_socket(self):
+        """Closes passive socket if it is open"""
+        if self.passive_socket is not None:
+            self.passive_socket.close()
+            self.passive_socket = None
+
+    def send_lines(self, lines):
+        """Sends lines over data connection
+
+        Args:
+            lines (list): sent lines
+        """
+        connection = self.open_data_connection()
+        if connection is None:
+            return
+        with connection:
+            connection.sendall(''.join(line + '\r\n' for line in lines).encode('utf-8', 'surrogateescape'))
+        self.reply('226 Transfer complete')
+
+    def command_user(self, argument):
+        self.user = argument
+        self.reply('331 Password required')
+
+    def command_pass(self, argument):
+        if self.user == self.ftp_server.user and argument == self.ftp_server.password:
+            self.logged_in = True
+            with self.ftp_server.lock:
+                self.ftp_server.logins_count += 1
+            self.reply('230 Logged in')
+        else:
+            self.reply('530 Login incorrect')
+
+    def command_type(self, argument):
+        self.reply('200 Type set to {}'.format(argument))
+
+    def command_pasv(self, argument):
+        self.close_passive_socket()
+        self.passive_socket = socket.socket()
+        self.passive_socket.bind((self.ftp_server.host, 0))
+        self.passive_socket.listen(1)
+        self.passive_socket.settimeout(10)
+        port = self.passive_socket.getsockname()[1]
+        self.reply('227 Entering Passive Mode ({},{},{})'.format(
+            self.ftp_server.host.replace('.', ','), port >> 8, port & 255))
+
+    def command_pwd(self, argument):
+        self.reply('257 "{}"'.format(self.directory))
+
+    def command_cwd(self, argument):
+        local_path = self.local_path(argument)
+        if local_path is None or not os.path.isdir(local_path):
+            self.reply('550 No such directory')
+            return
+        self.directory = '/' + os.path.relpath(local_path, self.ftp_server.root).replace(os.sep, '/').lstrip('.')
+        self.reply('250 Directory changed')
+
+    def command_mkd(self, argument):
+        local_path = self.local_path(argument)
+        if local_path is None or os.path.exists(local_path):
+            self.reply('550 Directory exists')
+            return
+        os.mkdir(local_path)
+        self.reply('257 "{}" created'.format(argument))
+
+    def command_size(self, argument):
+        local_path = self.local_path(argument)
+        if local_path is None or not os.path.isfile(local_path):
+            self.reply('550 No such file')
+            return
+        self.reply('213 {}'.format(os.path.getsize(local_path)))
+
+    def command_nlst(self, argument):
+        local_path = self.local_path(argument)
+        if local_path is None or not os.path.isdir(local_path):
+            self.reply('550 No such directory')
+            return
+        self.send_lines(sorted(os.listdir(local_path)))
+
+    def command_mlsd(self, argument):
+        local_path = self.local_path(argument)
+        if local_path is None or not os.path.isdir(local_path):
+            self.reply('550 No such directory')
+            return
+        lines = []
+        for name in sorted(os.listdir(local_path)):
+            path = os.path.join(local_path, name)
+            if os.path.isdir(path):
+                lines.append('type=dir; {}'.format(name))
+            else:
+                lines.append('type=file;size={}; {}'.format(os.path.getsize(path), name))
+        self.send_lines(lines)
+
+    def command_retr(self, argument):
+        local_path = self.local_path(argument)
+        if local_path is None or not os.path.isfile(local_path):
+            self.reply('550 No such file')
+            return
+        connection = self.open_data_connection()
+        if connection is None:
+            return
+        with connection, open(local_path, 'rb') as file:
+            if self.ftp_server.should_fail():
+                connection.sendall(file.read(os.path.getsize(local_path) // 2))
+                failed = True
+            else:
+                connection.sendfile(file)
+                failed = False
+        self.reply('451 Transfer aborted' if failed else '226 Transfer complete')
+
+    def command_stor(self, argument):
+        local_path = self.local_path(argument)
+        if local_path is None or not os.path.isdir(os.path.dirname(local_path)):
+            self.reply('553 Bad file name')
+            return
+        connection = self.open_data_connection()
+        if connection is None:
+            return
+        with connection:
+            blocks = []
+            for block in iter(lambda: connection.recv(65536), b''):
+                blocks.append(block)
+        if self.ftp_server.should_fail():
+            self.reply('451 Transfer aborted')
+            return
+        with open(local_path, 'wb') as file:
+            file.write(b''.join(blocks))
+        self.reply('226 Transfer complete')